@@ -0,0 +1,443 @@
+from __future__ import annotations
+
+import io
+import logging
+import math
+import os
+import re
+import wave
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from langchain_core.document_loaders import BaseBlobParser, Blob
+from langchain_core.documents import Document
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+try:
+    from pydub import AudioSegment
+except ImportError:  # Only 16-bit PCM WAV files can be read without pydub (and ffmpeg)
+    AudioSegment = None
+
+logger = logging.getLogger(__name__)
+
+# Whisper works on 16 kHz mono audio, so nothing is lost by uploading it at that rate
+SAMPLE_RATE = 16000
+# The transcription API rejects uploads above 25 MB
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+_WAV_HEADER_BYTES = 44
+# Fast speech, about 240 words a minute: sizes the window in which overlapping transcripts can meet
+MAX_WORDS_PER_SECOND = 4.0
+_FRAME_SECONDS = 0.02
+_READ_SECONDS = 30
+
+
+@dataclass
+class AudioChunk:
+    """
+    A section of the audio, in seconds. Chunks overlap their neighbours by overlap_seconds.
+    """
+
+    index: int
+    start: float
+    end: float
+    at_silence: bool = False  # Whether the chunk ends in a pause rather than at a hard cut
+
+
+def _resample(blocks: Iterable[np.ndarray], rate: int, target: int) -> Iterator[np.ndarray]:
+    """
+    Linearly resample a stream of mono float32 blocks, carrying the last sample over between blocks.
+    """
+    if rate == target:
+        yield from blocks
+        return
+    step = rate / target
+    previous: Optional[np.ndarray] = None
+    offset = 0  # Input index of the first sample of the current buffer
+    position = 0.0  # Input position of the next output sample
+    for block in blocks:
+        buffer = block if previous is None else np.concatenate([previous, block])
+        last = offset + len(buffer) - 1
+        count = int(np.floor((last - position) / step)) + 1 if position <= last else 0
+        positions = position + step * np.arange(count)
+        yield np.interp(positions - offset, np.arange(len(buffer)), buffer).astype(np.float32)
+        position += step * count
+        previous = buffer[-1:]
+        offset = last
+
+
+def load_audio(source: Union[str, bytes, os.PathLike]) -> np.ndarray:
+    """
+    Read audio as 16 kHz mono 16-bit samples.
+
+    WAV files are read with the standard library, a block at a time, so long recordings are
+    never held in memory at their original rate. Other formats need pydub and ffmpeg.
+
+    Args:
+        source (Union[str, bytes, os.PathLike]): A file path, or the file contents.
+
+    Returns:
+        np.ndarray: The int16 samples at SAMPLE_RATE.
+    """
+    file = io.BytesIO(source) if isinstance(source, bytes) else source
+    try:
+        with wave.open(file) as f:
+            if f.getsampwidth() not in (1, 2, 4):
+                raise ValueError(f"Unsupported WAV sample width: {f.getsampwidth()} bytes.")
+            channels, width, rate = f.getnchannels(), f.getsampwidth(), f.getframerate()
+            dtype, scale = {1: ("u1", 128.0), 2: ("<i2", 32768.0), 4: ("<i4", 2147483648.0)}[width]
+
+            def blocks() -> Iterator[np.ndarray]:
+                while True:
+                    raw = f.readframes(rate * _READ_SECONDS)
+                    if not raw:
+                        return
+                    samples = np.frombuffer(raw, dtype=dtype).astype(np.float32)
+                    if width == 1:
+                        samples -= 128.0
+                    yield samples.reshape(-1, channels).mean(axis=1) / scale
+
+            parts = [np.clip(np.round(block * 32767.0), -32768, 32767).astype(np.int16)
+                     for block in _resample(blocks(), rate, SAMPLE_RATE)]
+    except wave.Error:
+        if AudioSegment is None:
+            raise ValueError("Only WAV audio can be read without pydub; install pydub and ffmpeg for other formats.")
+        if isinstance(file, io.BytesIO):
+            file.seek(0)
+        segment = AudioSegment.from_file(file).set_channels(1).set_frame_rate(SAMPLE_RATE).set_sample_width(2)
+        return np.frombuffer(segment.raw_data, dtype="<i2")
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int16)
+
+
+def encode_wav(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """
+    Encode mono int16 samples as a WAV file.
+    """
+    output = io.BytesIO()
+    with wave.open(output, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(np.ascontiguousarray(samples, dtype="<i2").tobytes())
+    return output.getvalue()
+
+
+def plan_chunks(
+    samples: np.ndarray,
+    chunk_seconds: float = 600.0,
+    overlap_seconds: float = 2.0,
+    search_seconds: float = 30.0,
+    silence_threshold: float = 0.01,
+    sample_rate: int = SAMPLE_RATE
+) -> List[AudioChunk]:
+    """
+    Split audio into overlapping chunks that end in pauses where possible.
+
+    Each chunk ends at the quietest stretch (a 0.3 second moving average of the frame energy)
+    of the last search_seconds before chunk_seconds, when that stretch is below
+    silence_threshold; otherwise at chunk_seconds. The next chunk starts overlap_seconds
+    earlier, so a word cut at the boundary is heard whole in one of the two chunks.
+
+    Args:
+        samples (np.ndarray): The int16 samples.
+        chunk_seconds (float, optional): The maximum length of a chunk.
+        overlap_seconds (float, optional): How much consecutive chunks overlap.
+        search_seconds (float, optional): How far before chunk_seconds to look for a pause.
+        silence_threshold (float, optional): The RMS level, relative to full scale, of a pause.
+        sample_rate (int, optional): The sample rate of samples.
+
+    Returns:
+        List[AudioChunk]: The chunks, in order.
+    """
+    if overlap_seconds >= chunk_seconds - search_seconds:
+        raise ValueError("overlap_seconds must be shorter than chunk_seconds - search_seconds.")
+
+    frame = int(_FRAME_SECONDS * sample_rate)
+    frames = len(samples) // frame
+    energy = np.empty(frames, dtype=np.float32)
+    block = int(_READ_SECONDS / _FRAME_SECONDS)
+    for i in range(0, frames, block):
+        # A block at a time, so the float copy stays small
+        part = samples[i * frame:min(frames, i + block) * frame].astype(np.float32) / 32768.0
+        energy[i:i + block] = np.sqrt((part.reshape(-1, frame) ** 2).mean(axis=1))
+    width = max(1, int(0.3 / _FRAME_SECONDS))
+    smoothed = np.convolve(energy, np.ones(width) / width, mode="same") if frames else energy
+
+    total = len(samples) / sample_rate
+    chunks: List[AudioChunk] = []
+    start = 0.0
+    while True:
+        if total - start <= chunk_seconds:
+            chunks.append(AudioChunk(len(chunks), start, total, at_silence=True))
+            return chunks
+        limit = start + chunk_seconds
+        first = int((limit - search_seconds) / _FRAME_SECONDS)
+        last = int(limit / _FRAME_SECONDS)
+        window = smoothed[first:last]
+        quietest = int(np.argmin(window)) if len(window) else 0
+        at_silence = bool(len(window)) and bool(window[quietest] < silence_threshold)
+        end = (first + quietest + 0.5) * _FRAME_SECONDS if at_silence else limit
+        chunks.append(AudioChunk(len(chunks), start, end, at_silence))
+        start = end - overlap_seconds
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+class TranscriptStitcher:
+    """
+    Joins the transcripts of overlapping chunks, dropping the words heard twice.
+
+    The last max_overlap_words words of each transcript are held back until the next one
+    arrives. The two transcripts meet at the longest run of words (ignoring case and punctuation)
+    shared by that tail and the start of the next transcript, as long as the overlap the run
+    implies, from its start in the tail to its end in the next transcript, is at most
+    max_overlap_words long. The text is taken from the first transcript up to the end of the
+    run, and from the second after it. Without such a run of at least min_match_words words the
+    transcripts are simply joined, so a phrase repeated away from the boundary is not mistaken
+    for the overlap. Size max_overlap_words to the audio overlap with for_overlap.
+    """
+
+    def __init__(self, max_overlap_words: int = 40, min_match_words: int = 2) -> None:
+        self.max_overlap_words = max_overlap_words
+        self.min_match_words = min_match_words
+        self._tail: List[str] = []
+
+    @classmethod
+    def for_overlap(cls, overlap_seconds: float, min_match_words: int = 2) -> "TranscriptStitcher":
+        """
+        A stitcher for chunks that overlap by overlap_seconds: its window holds the words of that
+        much fast speech, plus one word cut at each end of the overlap.
+        """
+        max_overlap_words = max(min_match_words, math.ceil(overlap_seconds * MAX_WORDS_PER_SECOND)) + 2
+        return cls(max_overlap_words=max_overlap_words, min_match_words=min_match_words)
+
+    def _find_overlap(self, head: List[str]) -> Tuple[int, int, int]:
+        """
+        Find the longest run of words shared by the tail and the head whose implied overlap fits
+        in the window.
+
+        Returns:
+            Tuple[int, int, int]: The run's end (exclusive) in the tail and in the head, and its length.
+        """
+        tail = [_normalize_word(w) for w in self._tail]
+        head = [_normalize_word(w) for w in head]
+        best = (0, 0, 0)
+        # lengths[j] is the length of the run ending at the current tail word and head word j
+        lengths = [0] * (len(head) + 1)
+        for i, word in enumerate(tail):
+            previous, lengths = lengths, [0] * (len(head) + 1)
+            for j, other in enumerate(head):
+                if word != other:
+                    continue
+                lengths[j + 1] = previous[j] + 1
+                # The tail words after the run and the head words up to its end are the overlap
+                if len(tail) - (i + 1) + (j + 1) <= self.max_overlap_words and lengths[j + 1] > best[2]:
+                    best = (i + 1, j + 1, lengths[j + 1])
+        return best
+
+    def add(self, text: str) -> str:
+        """
+        Add the transcript of the next chunk.
+
+        Returns:
+            str: The text that is now final, possibly empty.
+        """
+        words = text.split()
+        output: List[str] = []
+        if self._tail:
+            tail_end, head_end, size = self._find_overlap(words[:self.max_overlap_words])
+            if size >= self.min_match_words:
+                output = self._tail[:tail_end]
+                words = words[head_end:]
+            else:
+                output = self._tail
+
+        keep = max(0, len(words) - self.max_overlap_words)
+        output.extend(words[:keep])
+        self._tail = words[keep:]
+        return " ".join(output)
+
+    def finish(self) -> str:
+        """
+        Release the words held back from the last transcript.
+        """
+        output, self._tail = " ".join(self._tail), []
+        return output
+
+
+class ChunkedTranscriber:
+    """
+    Transcribes long audio with the OpenAI transcription API, chunk by chunk in parallel.
+
+    The audio is converted to 16 kHz mono, split into overlapping chunks that end in pauses
+    where possible (see plan_chunks), and up to max_workers chunks are encoded and uploaded at
+    a time. The transcripts are stitched together in order (see TranscriptStitcher) and yielded
+    as soon as each one, and every one before it, is done.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        *,
+        base_url: Optional[str] = None,
+        model: str = "whisper-1",
+        language: Optional[str] = None,
+        prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        chunk_seconds: float = 600.0,
+        overlap_seconds: float = 2.0,
+        search_seconds: float = 30.0,
+        max_workers: int = 4,
+        client: Any = None
+    ) -> None:
+        """
+        Initialize the transcriber. The arguments up to temperature are those of OpenAIWhisperParser.
+
+        Args:
+            api_key (Optional[str], optional): The OpenAI API key, OPENAI_API_KEY by default.
+            base_url (Optional[str], optional): The API base URL, OPENAI_API_BASE by default.
+            model (str, optional): The transcription model.
+            language (Optional[str], optional): The language of the audio, as an ISO-639-1 code.
+            prompt (Optional[str], optional): Text to guide the style or vocabulary of each chunk.
+            temperature (Optional[float], optional): The sampling temperature.
+            chunk_seconds (float, optional): The maximum length of a chunk. At 16 kHz mono, the
+                25 MB upload limit allows about 13 minutes.
+            overlap_seconds (float, optional): How much consecutive chunks overlap.
+            search_seconds (float, optional): How far before chunk_seconds to look for a pause.
+            max_workers (int, optional): The maximum number of chunks transcribed at once.
+            client (Any, optional): An OpenAI (or AzureOpenAI) client to use instead of creating one.
+        """
+        if (chunk_seconds + overlap_seconds) * SAMPLE_RATE * 2 + _WAV_HEADER_BYTES > MAX_UPLOAD_BYTES:
+            raise ValueError("chunk_seconds is too long for the 25 MB upload limit.")
+        if max_workers <= 0:
+            raise ValueError("max_workers must be a positive integer.")
+
+        self.model = model
+        self.language = language
+        self.prompt = prompt
+        self.temperature = temperature
+        self.chunk_seconds = chunk_seconds
+        self.overlap_seconds = overlap_seconds
+        self.search_seconds = search_seconds
+        self.max_workers = max_workers
+        if client is None:
+            import openai
+
+            client = openai.OpenAI(api_key=api_key, base_url=base_url or os.environ.get("OPENAI_API_BASE"))
+        self.client = client
+
+    @property
+    def _create_params(self) -> dict:
+        params = {"language": self.language, "prompt": self.prompt, "temperature": self.temperature}
+        return {k: v for k, v in params.items() if v is not None}
+
+    def split(self, source: Union[str, bytes, os.PathLike]) -> Tuple[np.ndarray, List[AudioChunk]]:
+        """
+        Load audio and plan its chunks.
+
+        Returns:
+            Tuple[np.ndarray, List[AudioChunk]]: The 16 kHz mono samples and the chunks.
+        """
+        samples = load_audio(source)
+        return samples, plan_chunks(samples, self.chunk_seconds, self.overlap_seconds, self.search_seconds)
+
+    def _transcribe_chunk(self, samples: np.ndarray, chunk: AudioChunk) -> str:
+        data = encode_wav(samples[int(chunk.start * SAMPLE_RATE):int(chunk.end * SAMPLE_RATE)])
+        try:
+            transcript = self.client.audio.transcriptions.create(
+                model=self.model, file=(f"part_{chunk.index}.wav", data, "audio/wav"), **self._create_params
+            )
+        except Exception as e:
+            logger.error(f"Transcribing chunk {chunk.index} failed: {str(e)}")
+            raise RuntimeError(f"Error transcribing chunk {chunk.index} ({chunk.start:.1f}s-{chunk.end:.1f}s): {e}")
+        return transcript if isinstance(transcript, str) else transcript.text
+
+    def iter_chunks(self, source: Union[str, bytes, os.PathLike]) -> Iterator[Tuple[AudioChunk, str]]:
+        """
+        Transcribe audio, yielding the stitched text of each chunk in order as it becomes final.
+
+        Args:
+            source (Union[str, bytes, os.PathLike]): A file path, or the file contents.
+
+        Returns:
+            Iterator[Tuple[AudioChunk, str]]: Each chunk with its text, minus the words already
+            yielded with the chunk before it. The text may be empty.
+        """
+        samples, chunks = self.split(source)
+        stitcher = TranscriptStitcher.for_overlap(self.overlap_seconds)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Only the samples are shared; each worker encodes its own chunk, so at most
+            # max_workers chunks are held as WAV files at once
+            futures: List[Future] = [executor.submit(self._transcribe_chunk, samples, chunk) for chunk in chunks]
+            try:
+                for chunk, future in zip(chunks, futures):
+                    text = stitcher.add(future.result())
+                    if chunk is chunks[-1]:
+                        text = " ".join(part for part in (text, stitcher.finish()) if part)
+                    yield chunk, text
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def iter_transcript(self, source: Union[str, bytes, os.PathLike]) -> Iterator[str]:
+        """
+        Transcribe audio, yielding the transcript in pieces, in order, as they become final.
+        """
+        for _, text in self.iter_chunks(source):
+            if text:
+                yield text
+
+    def transcribe(self, source: Union[str, bytes, os.PathLike]) -> str:
+        """
+        Transcribe audio into a single text.
+        """
+        return " ".join(self.iter_transcript(source))
+
+
+class ChunkedWhisperParser(BaseBlobParser):
+    """
+    A drop-in replacement for OpenAIWhisperParser that transcribes chunks in parallel.
+
+    Yields one Document per chunk, as soon as it is ready, with the chunk's start and end
+    times in its metadata. Takes the arguments of ChunkedTranscriber.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, **kwargs: Any) -> None:
+        self.transcriber = ChunkedTranscriber(api_key, **kwargs)
+
+    def lazy_parse(self, blob: Blob) -> Iterator[Document]:
+        """
+        Lazily parse the blob.
+        """
+        source = blob.path if blob.data is None and blob.path is not None else blob.as_bytes()
+        for chunk, text in self.transcriber.iter_chunks(source):
+            if text:
+                yield Document(
+                    page_content=text,
+                    metadata={"source": blob.source, "chunk": chunk.index, "start": chunk.start, "end": chunk.end},
+                )
+
+
+def stream_to_chat(
+    chat_model: Any, pieces: Iterable[str], instructions: str, history: Sequence[BaseMessage] = ()
+) -> Iterator[Tuple[str, BaseMessage]]:
+    """
+    Send each piece of a transcript to a chat model as soon as it arrives.
+
+    With the pieces of ChunkedTranscriber.iter_transcript, the model works on the start of a
+    recording while the rest is still being transcribed.
+
+    Args:
+        chat_model (Any): A LangChain chat model, e.g. AzureChatOpenAI.
+        pieces (Iterable[str]): The transcript pieces.
+        instructions (str): The system message, e.g. "Summarize this part of a meeting."
+        history (Sequence[BaseMessage], optional): Messages to put between the instructions and each piece.
+
+    Returns:
+        Iterator[Tuple[str, BaseMessage]]: Each piece with the model's response.
+    """
+    for piece in pieces:
+        yield piece, chat_model.invoke([SystemMessage(content=instructions), *history, HumanMessage(content=piece)])
@@ -0,0 +1,77 @@
+"""
+Recall@k and queries per second of IVFIndex against the exact EmbeddingIndex scan.
+
+Real embeddings are clustered by topic, so the corpus is drawn around random cluster centres
+rather than uniformly; on uniform random vectors no approximate index does well.
+Recall@k is the fraction of the exact top k that the approximate search also returns.
+
+Usage:
+    python benchmark_ann.py [--size 200000] [--dim 256] [--nprobe 1 4 16 64]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from embedding_index import EmbeddingIndex
+from ivf_index import IVFIndex
+
+
+def clustered_vectors(rng: np.random.Generator, size: int, dim: int, clusters: int = 1000) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    assignment = rng.integers(clusters, size=size)
+    return centers[assignment] + 1.5 * rng.standard_normal((size, dim), dtype=np.float32)
+
+
+def recall(expected: List[List[tuple]], found: List[List[tuple]]) -> float:
+    hits = sum(len({i for i, _ in e} & {i for i, _ in f}) for e, f in zip(expected, found))
+    return hits / sum(len(e) for e in expected)
+
+
+def run_benchmark(
+    size: int = 200000, dim: int = 256, queries: int = 200, k: int = 10, nprobes: List[int] = (1, 4, 16, 64)
+) -> List[Dict[str, float]]:
+    """
+    Time the exact scan and IVFIndex at every nprobe.
+
+    Returns:
+        List[Dict[str, float]]: One row per method with its recall@k and queries per second.
+    """
+    rng = np.random.default_rng(0)
+    vectors = clustered_vectors(rng, size, dim)
+    query_vectors = vectors[rng.choice(size, queries, replace=False)] + \
+        1.5 * rng.standard_normal((queries, dim), dtype=np.float32)
+
+    exact = EmbeddingIndex.from_vectors(vectors)
+    start = time.perf_counter()
+    expected = [exact.search(query, k) for query in query_vectors]
+    rows = [{"method": "exact", "recall": 1.0, "qps": queries / (time.perf_counter() - start)}]
+
+    start = time.perf_counter()
+    index = IVFIndex()
+    index.add(vectors)
+    print(f"Built IVFIndex with {index.n_lists} lists in {time.perf_counter() - start:.1f}s")
+    for nprobe in nprobes:
+        start = time.perf_counter()
+        found = index.search_batch(query_vectors, k, nprobe=nprobe)
+        qps = queries / (time.perf_counter() - start)
+        rows.append({"method": f"ivf nprobe={nprobe}", "recall": recall(expected, found), "qps": qps})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    rows = run_benchmark(args.size, args.dim, args.queries, args.k, args.nprobe)
+    print(f"{'method':>16} {'recall@' + str(args.k):>10} {'qps':>10} {'speedup':>8}")
+    for row in rows:
+        print(f"{row['method']:>16} {row['recall']:10.3f} {row['qps']:10.0f} {row['qps'] / rows[0]['qps']:7.1f}x")
@@ -0,0 +1,93 @@
+"""
+Query latency of EmbeddingIndex against the DataFrame apply-based search in getting_started.ipynb.
+
+Random unit vectors stand in for AzureOpenAIEmbeddings output. The apply baseline keeps
+the vectors as Python lists in a pandas column, as the notebook does, and is skipped above
+--baseline-max vectors because it gets too slow and too large.
+Note that 1M vectors of dimension 1536 need about 6 GB for the index alone.
+
+Usage:
+    python benchmark_embeddings.py [--sizes 10000 100000 1000000] [--dim 256] [--queries 20]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from embedding_index import EmbeddingIndex
+
+
+def cosine_similarity(text, query):
+    return np.dot(text, query) / (np.linalg.norm(text) * np.linalg.norm(query))
+
+
+def bench_apply(vectors: np.ndarray, queries: np.ndarray, k: int) -> float:
+    """
+    Seconds per query of the notebook's apply + sort_values search.
+    """
+    df_text = pd.DataFrame({"Embeddings": list(vectors.tolist())})
+    start = time.perf_counter()
+    for query_embedding in queries:
+        similarity = df_text["Embeddings"].apply(lambda text_embedding: cosine_similarity(text_embedding, query_embedding))
+        similarity.sort_values(ascending=False).head(k)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def bench_index(vectors: np.ndarray, queries: np.ndarray, k: int) -> Dict[str, float]:
+    """
+    Seconds per query of EmbeddingIndex.search and EmbeddingIndex.search_batch.
+    """
+    index = EmbeddingIndex.from_vectors(vectors)
+
+    start = time.perf_counter()
+    for query in queries:
+        index.search(query, k)
+    single = (time.perf_counter() - start) / len(queries)
+
+    start = time.perf_counter()
+    index.search_batch(queries, k)
+    batch = (time.perf_counter() - start) / len(queries)
+    return {"search": single, "search_batch": batch}
+
+
+def run_benchmark(
+    sizes: List[int], dim: int = 256, queries: int = 20, k: int = 10, baseline_max: int = 100000
+) -> List[Dict[str, Optional[float]]]:
+    """
+    Time every search method at every corpus size.
+
+    Returns:
+        List[Dict[str, Optional[float]]]: One row per size with seconds per query of each method
+        (apply is None when skipped).
+    """
+    rng = np.random.default_rng(0)
+    query_vectors = rng.standard_normal((queries, dim), dtype=np.float32)
+    rows = []
+    for size in sizes:
+        vectors = rng.standard_normal((size, dim), dtype=np.float32)
+        row: Dict[str, Optional[float]] = {"vectors": size}
+        row.update(bench_index(vectors, query_vectors, k))
+        row["apply"] = bench_apply(vectors, query_vectors[:max(1, queries // 10)], k) if size <= baseline_max else None
+        rows.append(row)
+        del vectors
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--baseline-max", type=int, default=100000, help="Largest size the apply baseline runs at")
+    args = parser.parse_args()
+
+    print(f"{'vectors':>10} {'apply ms':>10} {'search ms':>10} {'batch ms':>10} {'speedup':>8}")
+    for row in run_benchmark(args.sizes, args.dim, args.queries, args.k, args.baseline_max):
+        apply_ms = f"{row['apply'] * 1000:10.2f}" if row["apply"] is not None else f"{'skipped':>10}"
+        speedup = f"{row['apply'] / row['search']:7.0f}x" if row["apply"] is not None else f"{'-':>8}"
+        print(f"{row['vectors']:>10} {apply_ms} {row['search'] * 1000:10.2f} {row['search_batch'] * 1000:10.2f} {speedup}")
@@ -0,0 +1,211 @@
+"""
+Cold start benchmark for AzureTranslateTool, run against a local fake Translator endpoint.
+
+Every measurement runs in a fresh interpreter, so nothing is already imported or connected:
+
+- import: the cumulative import time of translate_tool as reported by ``python -X importtime``,
+  and its heaviest direct imports
+- startup: the time to import the module, construct the tool and make the first and second
+  translation, without and with prewarm. Between construction and the first call the process
+  sleeps for --idle seconds, standing in for the rest of the application's startup, which is
+  when a pre-warm does its work.
+
+Each figure is the median of --runs processes. Results can be saved as JSON and compared with
+an earlier run to spot startup regressions.
+
+Usage:
+    python benchmark_startup.py [--runs 5] [--latency 0.0] [--idle 0.2]
+                                [--json startup.json] [--compare baseline.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+from benchmark_translate import compare
+from fake_translator import FakeTranslatorServer
+
+# Bumped when the meaning of a result changes, so old and new files are not compared by mistake
+RESULTS_VERSION = 1
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Run in a fresh interpreter as: python -c _STARTUP_SCRIPT <endpoint> <prewarm 0|1> <idle seconds>
+_STARTUP_SCRIPT = """
+import json, sys, time
+endpoint, prewarm, idle = sys.argv[1], sys.argv[2] == "1", float(sys.argv[3])
+start = time.perf_counter()
+from translate_tool import AzureTranslateTool
+imported = time.perf_counter()
+tool = AzureTranslateTool(translate_key="benchmark", translate_endpoint=endpoint, prewarm=prewarm)
+constructed = time.perf_counter()
+time.sleep(idle)
+called = time.perf_counter()
+tool._translate_text("Hello, world.", "fr")
+first = time.perf_counter()
+tool._translate_text("Hello again.", "fr")
+second = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "construct_ms": (constructed - imported) * 1000,
+    "first_call_ms": (first - called) * 1000,
+    "second_call_ms": (second - first) * 1000,
+}))
+"""
+
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Parse the report that ``python -X importtime`` writes to stderr.
+
+    Args:
+        output (str): The stderr of the interpreter.
+
+    Returns:
+        List[Tuple[str, int, int, int]]: (module, self microseconds, cumulative microseconds,
+        nesting depth) for every import, in the order the report lists them.
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # The header line
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        imports.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return imports
+
+
+def measure_import(module: str = "translate_tool", runs: int = 5, top: int = 8) -> Dict[str, Any]:
+    """
+    Time the import of a module in fresh interpreters with ``python -X importtime``.
+
+    Returns:
+        Dict[str, Any]: The median cumulative import time in milliseconds (import_ms), and the
+        heaviest direct imports of the module with their median cumulative milliseconds (heaviest).
+    """
+    totals = []
+    children: Dict[str, List[float]] = {}
+    for _ in range(runs):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=_HERE, capture_output=True, text=True, check=True,
+        )
+        imports = parse_importtime(process.stderr)
+        top_level = [entry for entry in imports if entry[0] == module and entry[3] == 0]
+        if not top_level:
+            raise RuntimeError(f"{module} is missing from the importtime report.")
+        totals.append(top_level[-1][2] / 1000)
+        # The report lists a module after everything it imported, so its direct imports are the
+        # depth 1 entries since the previous top-level one
+        direct: List[Tuple[str, int]] = []
+        for name, _, cumulative_us, depth in imports:
+            if depth == 1:
+                direct.append((name, cumulative_us))
+            elif depth == 0:
+                if name == module:
+                    break
+                direct = []
+        for name, cumulative_us in direct:
+            children.setdefault(name, []).append(cumulative_us / 1000)
+
+    heaviest = sorted(((name, statistics.median(values)) for name, values in children.items()),
+                      key=lambda item: item[1], reverse=True)
+    return {"import_ms": statistics.median(totals), "heaviest": heaviest[:top]}
+
+
+def measure_startup(endpoint: str, prewarm: bool = False, idle: float = 0.2, runs: int = 5) -> Dict[str, float]:
+    """
+    Time import, construction and the first calls of the tool in fresh interpreters.
+
+    Args:
+        endpoint (str): The Translator endpoint to call.
+        prewarm (bool, optional): Construct the tool with prewarm=True.
+        idle (float, optional): Seconds between construction and the first call.
+        runs (int, optional): The number of processes to take the median of.
+
+    Returns:
+        Dict[str, float]: The median import, construction, first call and second call times in milliseconds.
+    """
+    samples: Dict[str, List[float]] = {}
+    for _ in range(runs):
+        process = subprocess.run(
+            [sys.executable, "-c", _STARTUP_SCRIPT, endpoint, "1" if prewarm else "0", str(idle)],
+            cwd=_HERE, capture_output=True, text=True, check=True,
+        )
+        for name, value in json.loads(process.stdout.strip().splitlines()[-1]).items():
+            samples.setdefault(name, []).append(value)
+    return {name: statistics.median(values) for name, values in samples.items()}
+
+
+def run_suite(runs: int = 5, latency: float = 0.0, idle: float = 0.2) -> Dict[str, Any]:
+    """
+    Run the import and startup benchmarks.
+
+    Args:
+        runs (int, optional): The number of processes each figure is the median of.
+        latency (float, optional): Simulated service latency per request, in seconds.
+        idle (float, optional): Seconds between construction and the first call.
+
+    Returns:
+        Dict[str, Any]: The results with the settings and environment they were measured in,
+        ready to be saved as JSON.
+    """
+    imports = measure_import(runs=runs)
+    with FakeTranslatorServer(latency=latency) as server:
+        startup = measure_startup(server.endpoint, prewarm=False, idle=idle, runs=runs)
+        prewarmed = measure_startup(server.endpoint, prewarm=True, idle=idle, runs=runs)
+
+    return {
+        "version": RESULTS_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"runs": runs, "latency": latency, "idle": idle},
+        "heaviest_imports": imports["heaviest"],
+        "results": {
+            "import": {"translate_tool_ms": imports["import_ms"]},
+            "startup": startup,
+            "startup_prewarm": prewarmed,
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Processes per measurement")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated latency per request (s)")
+    parser.add_argument("--idle", type=float, default=0.2, help="Seconds between construction and the first call")
+    parser.add_argument("--json", help="Save the results to this JSON file")
+    parser.add_argument("--compare", help="Compare the results with an earlier JSON file")
+    args = parser.parse_args()
+
+    suite = run_suite(args.runs, args.latency, args.idle)
+    results = suite["results"]
+    print(f"Import of translate_tool: {results['import']['translate_tool_ms']:.1f} ms")
+    for name, milliseconds in suite["heaviest_imports"]:
+        print(f"  {name:<50} {milliseconds:>8.1f} ms")
+    print(f"\n{'':<16} {'import':>8} {'construct':>10} {'1st call':>9} {'2nd call':>9}")
+    for label, key in (("cold", "startup"), ("prewarm", "startup_prewarm")):
+        row = results[key]
+        print(f"{label:<16} {row['import_ms']:>8.1f} {row['construct_ms']:>10.2f} "
+              f"{row['first_call_ms']:>9.2f} {row['second_call_ms']:>9.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(suite, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\n{'metric':<42} {'baseline':>12} {'current':>12} {'change':>8}")
+        for row in compare(baseline, suite):
+            change = f"{row['change']:+8.1%}" if row["change"] is not None else f"{'-':>8}"
+            print(f"{row['metric']:<42} {row['baseline']:>12.2f} {row['current']:>12.2f} {change}")
@@ -0,0 +1,307 @@
+"""
+Offline benchmark suite for AzureTranslateTool, run against a local fake Translator endpoint.
+
+Measures:
+
+- latency: single-call latency percentiles of the synchronous tool
+- batch: throughput of translate_batch over many distinct sentences
+- concurrency: the synchronous tool (one thread per caller, over a connection pool of the
+  same size) against the async tool (one task per caller on a single event loop) at 1, 10
+  and 100 concurrent callers, with the connections the synchronous tool opened
+- memory: peak and retained Python allocations per request, traced with tracemalloc
+
+Latency, batch and memory run against a server that answers immediately, so they measure
+the tool's own overhead plus a local round trip; concurrency adds --latency per request.
+Results can be saved as JSON and compared with an earlier run to spot regressions.
+
+Usage:
+    python benchmark_translate.py [--latency 0.05] [--calls-per-caller 10] [--only latency batch]
+                                  [--json results.json] [--compare baseline.json]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Sequence, Tuple
+
+from fake_translator import FakeTranslatorServer
+from translate_tool import AzureTranslateTool
+from translator_clients import TranslatorClientRegistry
+
+CONCURRENCY_LEVELS = (1, 10, 100)
+BENCHMARKS = ("latency", "batch", "concurrency", "memory")
+
+# Bumped when the meaning of a result changes, so old and new files are not compared by mistake
+RESULTS_VERSION = 1
+
+
+def bench_sync(endpoint: str, callers: int, calls_per_caller: int) -> Tuple[float, int]:
+    """
+    Translate with the synchronous tool from several threads.
+
+    The tool gets its own client registry with a connection pool as large as the number of
+    callers, so no thread has to open a connection that the pool then discards.
+
+    Returns:
+        Tuple[float, int]: Translations per second, and the number of connections opened.
+    """
+    with TranslatorClientRegistry(pool_size=callers) as registry:
+        tool = AzureTranslateTool(translate_key="benchmark", translate_endpoint=endpoint, client_registry=registry)
+
+        def caller(n: int) -> None:
+            for i in range(calls_per_caller):
+                tool._translate_text(f"Caller {n} sentence {i}.", "fr")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=callers) as pool:
+            list(pool.map(caller, range(callers)))
+        elapsed = time.perf_counter() - start
+        return callers * calls_per_caller / elapsed, registry.stats()["connections_opened"]
+
+
+def bench_async(endpoint: str, callers: int, calls_per_caller: int) -> float:
+    """
+    Translate with the async tool from several tasks on one event loop.
+
+    Returns:
+        float: Translations per second.
+    """
+    tool = AzureTranslateTool(
+        translate_key="benchmark",
+        translate_endpoint=endpoint,
+        max_concurrent_requests=callers,
+    )
+
+    async def caller(n: int) -> None:
+        for i in range(calls_per_caller):
+            await tool._arun(f"Caller {n} sentence {i}.")
+
+    async def run() -> float:
+        try:
+            start = time.perf_counter()
+            await asyncio.gather(*(caller(n) for n in range(callers)))
+            return time.perf_counter() - start
+        finally:
+            await tool.aclose()
+
+    elapsed = asyncio.run(run())
+    return callers * calls_per_caller / elapsed
+
+
+def run_benchmark(latency: float = 0.05, calls_per_caller: int = 10) -> List[Dict[str, float]]:
+    """
+    Run the sync and async benchmarks at every concurrency level.
+
+    Args:
+        latency (float, optional): Simulated service latency per request, in seconds.
+        calls_per_caller (int, optional): Translations made by each caller.
+
+    Returns:
+        List[Dict[str, float]]: One row per concurrency level with sync and async throughput,
+        and the connections the sync tool opened.
+    """
+    rows = []
+    with FakeTranslatorServer(latency=latency) as server:
+        for callers in CONCURRENCY_LEVELS:
+            sync_per_second, sync_connections = bench_sync(server.endpoint, callers, calls_per_caller)
+            rows.append({
+                "callers": callers,
+                "sync_per_second": sync_per_second,
+                "sync_connections": sync_connections,
+                "async_per_second": bench_async(server.endpoint, callers, calls_per_caller),
+            })
+    return rows
+
+
+def bench_latency(endpoint: str, calls: int = 200) -> Dict[str, float]:
+    """
+    Time sequential single-text translations.
+
+    Returns:
+        Dict[str, float]: The mean, p50, p95 and p99 latency in milliseconds.
+    """
+    tool = AzureTranslateTool(translate_key="benchmark", translate_endpoint=endpoint)
+    tool._translate_text("Warm up the connection.", "fr")
+
+    timings = []
+    for i in range(calls):
+        start = time.perf_counter()
+        tool._translate_text(f"Single call number {i}.", "fr")
+        timings.append((time.perf_counter() - start) * 1000)
+
+    percentiles = statistics.quantiles(timings, n=100)
+    return {
+        "mean_ms": statistics.fmean(timings),
+        "p50_ms": percentiles[49],
+        "p95_ms": percentiles[94],
+        "p99_ms": percentiles[98],
+    }
+
+
+def bench_batch(endpoint: str, texts: int = 5000) -> Dict[str, float]:
+    """
+    Translate many distinct sentences with one translate_batch call.
+
+    Returns:
+        Dict[str, float]: Texts and characters per second, and the total seconds.
+    """
+    tool = AzureTranslateTool(translate_key="benchmark", translate_endpoint=endpoint)
+    batch = [f"Support ticket {i} was closed after the customer confirmed the fix." for i in range(texts)]
+
+    start = time.perf_counter()
+    tool.translate_batch(batch, "fr")
+    elapsed = time.perf_counter() - start
+    return {
+        "texts_per_second": texts / elapsed,
+        "characters_per_second": sum(len(text) for text in batch) / elapsed,
+        "seconds": elapsed,
+    }
+
+
+def bench_memory(server: FakeTranslatorServer, calls: int = 200) -> Dict[str, float]:
+    """
+    Trace Python allocations while translating one text per request.
+
+    The fake server runs in the same process, so its request log is cleared and garbage is
+    collected before the retained memory is measured.
+
+    Returns:
+        Dict[str, float]: The largest peak allocation of a single request, and the memory
+        still allocated per request after all of them (which should stay near zero).
+    """
+    tool = AzureTranslateTool(translate_key="benchmark", translate_endpoint=server.endpoint)
+    tool._translate_text("Warm up the connection.", "fr")
+    server.reset()
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        peak = 0
+        for i in range(calls):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            tool._translate_text(f"Memory check number {i}.", "fr")
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+        server.reset()
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    return {"peak_bytes_per_request": peak, "retained_bytes_per_request": retained / calls}
+
+
+def run_suite(
+    benchmarks: Sequence[str] = BENCHMARKS, latency: float = 0.05, calls_per_caller: int = 10
+) -> Dict[str, Any]:
+    """
+    Run the selected benchmarks.
+
+    Args:
+        benchmarks (Sequence[str], optional): Which of BENCHMARKS to run.
+        latency (float, optional): Simulated service latency per request of the concurrency benchmark.
+        calls_per_caller (int, optional): Translations made by each caller of the concurrency benchmark.
+
+    Returns:
+        Dict[str, Any]: The results with the settings and environment they were measured in,
+        ready to be saved as JSON.
+    """
+    results: Dict[str, Any] = {}
+    with FakeTranslatorServer() as server:
+        if "latency" in benchmarks:
+            results["latency"] = bench_latency(server.endpoint)
+        if "batch" in benchmarks:
+            results["batch"] = bench_batch(server.endpoint)
+        if "memory" in benchmarks:
+            results["memory"] = bench_memory(server)
+    if "concurrency" in benchmarks:
+        results["concurrency"] = run_benchmark(latency, calls_per_caller)
+
+    return {
+        "version": RESULTS_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"latency": latency, "calls_per_caller": calls_per_caller},
+        "results": results,
+    }
+
+
+def flatten_results(results: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Flatten suite results into "benchmark.metric" keys, e.g. "latency.p50_ms" or
+    "concurrency.callers=10.async_per_second".
+    """
+    flat: Dict[str, float] = {}
+    for benchmark, values in results.items():
+        rows = values if isinstance(values, list) else [values]
+        for row in rows:
+            prefix = f"{benchmark}.callers={row['callers']}" if "callers" in row else benchmark
+            for metric, value in row.items():
+                if metric != "callers":
+                    flat[f"{prefix}.{metric}"] = value
+    return flat
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compare two saved suite runs metric by metric.
+
+    Returns:
+        List[Dict[str, Any]]: For each metric in both runs, its baseline and current values
+        and the relative change.
+    """
+    if baseline.get("version") != current.get("version"):
+        raise ValueError("The results were saved by different versions of the benchmark suite.")
+    old = flatten_results(baseline["results"])
+    new = flatten_results(current["results"])
+    return [
+        {"metric": key, "baseline": old[key], "current": new[key],
+         "change": (new[key] - old[key]) / old[key] if old[key] else None}
+        for key in new if key in old
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated latency per request (s)")
+    parser.add_argument("--calls-per-caller", type=int, default=10, help="Translations made by each caller")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS), help="Benchmarks to run")
+    parser.add_argument("--json", help="Save the results to this JSON file")
+    parser.add_argument("--compare", help="Compare the results with an earlier JSON file")
+    args = parser.parse_args()
+
+    suite = run_suite(args.only, args.latency, args.calls_per_caller)
+    results = suite["results"]
+    if "latency" in results:
+        print("Latency (ms): " + ", ".join(f"{name[:-3]} {value:.2f}" for name, value in results["latency"].items()))
+    if "batch" in results:
+        batch = results["batch"]
+        print(f"Batch: {batch['texts_per_second']:.0f} texts/s, {batch['characters_per_second']:.0f} characters/s")
+    if "memory" in results:
+        memory = results["memory"]
+        print(f"Memory per request: peak {memory['peak_bytes_per_request'] / 1024:.1f} KiB, "
+              f"retained {memory['retained_bytes_per_request']:.0f} B")
+    if "concurrency" in results:
+        print(f"{'callers':>8} {'sync/s':>10} {'sync conns':>11} {'async/s':>10}")
+        for row in results["concurrency"]:
+            print(f"{row['callers']:>8} {row['sync_per_second']:>10.1f} {row['sync_connections']:>11} "
+                  f"{row['async_per_second']:>10.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(suite, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\n{'metric':<42} {'baseline':>12} {'current':>12} {'change':>8}")
+        for row in compare(baseline, suite):
+            change = f"{row['change']:+8.1%}" if row["change"] is not None else f"{'-':>8}"
+            print(f"{row['metric']:<42} {row['baseline']:>12.2f} {row['current']:>12.2f} {change}")
@@ -0,0 +1,340 @@
+"""
+Translate a column of a large JSONL, CSV or Parquet file with AzureTranslateTool.
+
+Rows are read as a stream, grouped into chunks and translated by worker processes, each with
+its own AzureTranslateTool and pooled client. Translated rows are appended to the output
+(JSONL or CSV) in input order as soon as their chunk is done. A checkpoint file records how
+many rows and output bytes are complete, so a crashed or throttled run started again with the
+same arguments continues where it stopped without translating finished rows again.
+
+Usage:
+    python bulk_translate.py input.jsonl output.jsonl --field text --to fr [--workers 4]
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Only needed to read Parquet input
+    pq = None
+
+from translate_tool import AzureTranslateTool
+
+logger = logging.getLogger(__name__)
+
+INPUT_FORMATS = ("jsonl", "csv", "parquet")
+OUTPUT_FORMATS = ("jsonl", "csv")
+
+# The tool of the current worker process, created once by _init_worker
+_worker_tool: Optional[AzureTranslateTool] = None
+
+
+@dataclass
+class BulkProgress:
+    """
+    Progress of a bulk translation run.
+    """
+
+    rows: int = 0
+    characters: int = 0
+    skipped_rows: int = 0  # Rows finished by an earlier run and skipped on resume
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    @property
+    def characters_per_second(self) -> float:
+        return self.characters / self.seconds if self.seconds else 0.0
+
+
+def detect_format(path: str) -> str:
+    """
+    The file format implied by a path's extension: "jsonl", "csv" or "parquet".
+    """
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension in ("jsonl", "ndjson", "json"):
+        return "jsonl"
+    if extension in ("csv", "parquet"):
+        return extension
+    raise ValueError(f"Cannot tell the format of {path}, expected one of {INPUT_FORMATS}.")
+
+
+def read_rows(path: str, file_format: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the rows of a JSONL, CSV or Parquet file as dicts.
+
+    Args:
+        path (str): The file to read.
+        file_format (Optional[str], optional): One of INPUT_FORMATS, detected from the extension when None.
+
+    Yields:
+        Dict[str, Any]: One dict per row.
+    """
+    file_format = file_format or detect_format(path)
+    if file_format == "jsonl":
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif file_format == "csv":
+        with open(path, encoding="utf-8", newline="") as f:
+            yield from csv.DictReader(f)
+    elif file_format == "parquet":
+        if pq is None:
+            raise ImportError("Reading Parquet files requires pyarrow: pip install pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches():
+            yield from batch.to_pylist()
+    else:
+        raise ValueError(f"Unsupported input format {file_format}, expected one of {INPUT_FORMATS}.")
+
+
+def _init_worker(translate_key: str, translate_endpoint: str, tool_kwargs: Dict[str, Any]) -> None:
+    global _worker_tool
+    _worker_tool = AzureTranslateTool(
+        translate_key=translate_key, translate_endpoint=translate_endpoint, **tool_kwargs
+    )
+
+
+def _translate_chunk(
+    rows: List[Dict[str, Any]], text_field: str, output_field: str, to_language: str
+) -> List[Dict[str, Any]]:
+    """
+    Translate the text field of a chunk of rows in the worker process.
+    """
+    texts = [row.get(text_field) or "" for row in rows]
+    for row, translation in zip(rows, _worker_tool.translate_batch(texts, to_language)):
+        row[output_field] = translation
+    return rows
+
+
+class _OutputWriter:
+    """
+    Appends rows to a JSONL or CSV file, resuming after the last checkpointed byte.
+    """
+
+    def __init__(self, path: str, file_format: str, resume_bytes: int) -> None:
+        self.file_format = file_format
+        self._file = open(path, "a+b")
+        # Drop rows written after the last checkpoint: they are translated again
+        self._file.truncate(resume_bytes)
+        self._file.seek(resume_bytes)
+        self._columns: Optional[List[str]] = None
+        if file_format == "csv" and resume_bytes:
+            self._file.seek(0)
+            self._columns = next(csv.reader(io.TextIOWrapper(io.BytesIO(self._file.readline()), encoding="utf-8")))
+            self._file.seek(resume_bytes)
+
+    def write(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Append rows, flush them to disk and return the new size of the file.
+        """
+        if not rows:
+            return self._file.tell()
+        if self.file_format == "jsonl":
+            data = "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+        else:
+            buffer = io.StringIO()
+            if self._columns is None:
+                self._columns = list(rows[0])
+                csv.writer(buffer).writerow(self._columns)
+            csv.DictWriter(buffer, self._columns, extrasaction="ignore").writerows(rows)
+            data = buffer.getvalue()
+        self._file.write(data.encode("utf-8"))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _read_checkpoint(path: str, input_path: str, output_path: str) -> Tuple[int, int]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return 0, 0
+    if checkpoint["input"] != os.path.abspath(input_path) or checkpoint["output"] != os.path.abspath(output_path):
+        raise ValueError(f"The checkpoint {path} belongs to another job ({checkpoint['input']}).")
+    return checkpoint["rows"], checkpoint["output_bytes"]
+
+
+def _write_checkpoint(path: str, input_path: str, output_path: str, rows: int, output_bytes: int) -> None:
+    # Written next to the checkpoint and moved into place, so a crash never leaves half a checkpoint
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({
+            "input": os.path.abspath(input_path),
+            "output": os.path.abspath(output_path),
+            "rows": rows,
+            "output_bytes": output_bytes,
+        }, f)
+    os.replace(path + ".tmp", path)
+
+
+def translate_file(
+    input_path: str,
+    output_path: str,
+    to_language: str,
+    text_field: str = "text",
+    output_field: Optional[str] = None,
+    translate_key: Optional[str] = None,
+    translate_endpoint: Optional[str] = None,
+    workers: int = 4,
+    chunk_rows: int = 500,
+    checkpoint_path: Optional[str] = None,
+    input_format: Optional[str] = None,
+    output_format: Optional[str] = None,
+    tool_kwargs: Optional[Dict[str, Any]] = None,
+    progress: Optional[Callable[[BulkProgress], None]] = None,
+    progress_interval: float = 5.0
+) -> BulkProgress:
+    """
+    Translate one field of every row of a file, resuming from a checkpoint if there is one.
+
+    Args:
+        input_path (str): The JSONL, CSV or Parquet file to read.
+        output_path (str): The JSONL or CSV file to write the rows to, with the translation added.
+        to_language (str): The target language.
+        text_field (str, optional): The field holding the text to translate.
+        output_field (Optional[str], optional): The field to write the translation to,
+            "<text_field>_<to_language>" when None.
+        translate_key (Optional[str], optional): The Translator key, taken from the environment when None.
+        translate_endpoint (Optional[str], optional): The Translator endpoint, taken from the environment when None.
+        workers (int, optional): The number of worker processes. 0 translates in this process,
+            on a single thread.
+        chunk_rows (int, optional): The number of rows each worker translates at a time.
+        checkpoint_path (Optional[str], optional): The checkpoint file, "<output_path>.checkpoint" when None.
+        input_format (Optional[str], optional): One of INPUT_FORMATS, detected from the extension when None.
+        output_format (Optional[str], optional): One of OUTPUT_FORMATS, detected from the extension when None.
+        tool_kwargs (Optional[Dict[str, Any]], optional): Extra AzureTranslateTool fields for every worker.
+        progress (Optional[Callable[[BulkProgress], None]], optional): Called with the progress so far
+            at most every progress_interval seconds, and once at the end.
+        progress_interval (float, optional): Seconds between progress reports.
+
+    Returns:
+        BulkProgress: The rows and characters translated by this run, and how long it took.
+    """
+    translate_key = translate_key or os.environ.get("AZURE_OPENAI_TRANSLATE_API_KEY")
+    translate_endpoint = translate_endpoint or os.environ.get("AZURE_OPENAI_TRANSLATE_ENDPOINT")
+    if not translate_key or not translate_endpoint:
+        raise ValueError("Missing API key or endpoint for Azure Translator API.")
+    output_format = output_format or detect_format(output_path)
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format {output_format}, expected one of {OUTPUT_FORMATS}.")
+    output_field = output_field or f"{text_field}_{to_language}"
+    checkpoint_path = checkpoint_path or output_path + ".checkpoint"
+
+    done_rows, done_bytes = _read_checkpoint(checkpoint_path, input_path, output_path)
+    if done_rows:
+        logger.info(f"Resuming {input_path} after {done_rows} translated rows.")
+    rows = islice(read_rows(input_path, input_format), done_rows, None)
+
+    executor: Executor
+    if workers > 0:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(translate_key, translate_endpoint, tool_kwargs or {}),
+        )
+    else:
+        _init_worker(translate_key, translate_endpoint, tool_kwargs or {})
+        executor = ThreadPoolExecutor(max_workers=1)
+
+    result = BulkProgress(skipped_rows=done_rows)
+    writer = _OutputWriter(output_path, output_format, done_bytes)
+    start = last_report = time.perf_counter()
+    # Two chunks per worker keep every worker busy while bounding the rows held in memory
+    in_flight: Deque[Tuple[Future, int]] = deque()
+    max_in_flight = 2 * max(workers, 1)
+
+    def finish_oldest() -> None:
+        nonlocal done_rows, done_bytes, last_report
+        future, characters = in_flight.popleft()
+        translated = future.result()
+        done_bytes = writer.write(translated)
+        done_rows += len(translated)
+        _write_checkpoint(checkpoint_path, input_path, output_path, done_rows, done_bytes)
+
+        result.rows += len(translated)
+        result.characters += characters
+        now = time.perf_counter()
+        result.seconds = now - start
+        if progress is not None and now - last_report >= progress_interval:
+            last_report = now
+            progress(result)
+
+    try:
+        while True:
+            chunk = list(islice(rows, chunk_rows))
+            if not chunk:
+                break
+            characters = sum(len(row.get(text_field) or "") for row in chunk)
+            in_flight.append((executor.submit(_translate_chunk, chunk, text_field, output_field, to_language),
+                              characters))
+            while len(in_flight) >= max_in_flight:
+                finish_oldest()
+        while in_flight:
+            finish_oldest()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        writer.close()
+
+    result.seconds = time.perf_counter() - start
+    if progress is not None:
+        progress(result)
+    return result
+
+
+def print_progress(progress: BulkProgress) -> None:
+    """
+    Print a progress line to stderr.
+    """
+    print(
+        f"{progress.rows + progress.skipped_rows} rows done ({progress.skipped_rows} from an earlier run), "
+        f"{progress.rows_per_second:.1f} rows/s, {progress.characters_per_second:.0f} chars/s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL, CSV or Parquet file to translate")
+    parser.add_argument("output", help="JSONL or CSV file to write")
+    parser.add_argument("--to", required=True, help="Target language code, e.g. fr")
+    parser.add_argument("--field", default="text", help="Field holding the text to translate")
+    parser.add_argument("--output-field", help="Field to write the translation to (default <field>_<to>)")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes (0 runs in this process)")
+    parser.add_argument("--chunk-rows", type=int, default=500, help="Rows per worker task")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default <output>.checkpoint)")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress lines")
+    args = parser.parse_args()
+
+    summary = translate_file(
+        args.input,
+        args.output,
+        args.to,
+        text_field=args.field,
+        output_field=args.output_field,
+        workers=args.workers,
+        chunk_rows=args.chunk_rows,
+        checkpoint_path=args.checkpoint,
+        progress=print_progress,
+        progress_interval=args.progress_interval,
+    )
+    print(json.dumps({**asdict(summary), "rows_per_second": summary.rows_per_second,
+                      "characters_per_second": summary.characters_per_second}))
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from translation_cache import TwoTierCache
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken ships with langchain-openai, but token counts can be estimated without it
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Azure OpenAI embeddings accept at most 2048 inputs and 300k tokens per request
+MAX_BATCH_INPUTS = 2048
+MAX_BATCH_TOKENS = 300000
+
+
+def as_float32(vector: Any) -> np.ndarray:
+    """
+    The float32 array an embedding vector is cached as.
+    """
+    return np.asarray(vector, dtype=np.float32)
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens of a text with tiktoken, or estimate them at 4 characters per token.
+    """
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4)
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> Any:
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # The encoding is downloaded on first use, which fails on machines without network access
+        logger.warning(f"Could not load the tiktoken encoding, estimating token counts instead: {e}")
+        return None
+
+
+class EmbeddingCache(TwoTierCache):
+    """
+    A thread-safe, two-tier cache of embedding vectors.
+
+    Vectors are kept as float32 bytes in memory and on disk, which halves their size, and come
+    back as new lists of those float32 values from either tier.
+    """
+
+    _table = "embeddings"
+    _column = "vector BLOB"
+
+    def _encode(self, vector: List[float]) -> bytes:
+        return as_float32(vector).tobytes()
+
+    def _decode(self, stored: bytes) -> List[float]:
+        return np.frombuffer(stored, dtype=np.float32).tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    A drop-in replacement for AzureOpenAIEmbeddings (or any LangChain Embeddings) that
+    never pays for the same text twice.
+
+    Each call deduplicates its texts, looks them up in a content-hash keyed cache, and sends
+    only the misses to the wrapped model, in batches bounded by input count and tokens.
+    The vectors come back in input order. embed_query goes through the same cache, so a
+    query that was already embedded as a document is free.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        cache: Optional[EmbeddingCache] = None,
+        namespace: Optional[str] = None,
+        batch_size: int = MAX_BATCH_INPUTS,
+        max_batch_tokens: int = MAX_BATCH_TOKENS
+    ) -> None:
+        """
+        Wrap an embeddings model.
+
+        Args:
+            embeddings (Embeddings): The model to send misses to, e.g. AzureOpenAIEmbeddings.
+            cache (Optional[EmbeddingCache], optional): The cache, an in-memory one when None.
+            namespace (Optional[str], optional): Separates the cache entries of different models.
+                Defaults to the model's model/deployment and dimensions.
+            batch_size (int, optional): The maximum number of texts per request.
+            max_batch_tokens (int, optional): The maximum number of tokens per request.
+        """
+        self.embeddings = embeddings
+        self.cache = cache if cache is not None else EmbeddingCache()
+        if namespace is None:
+            namespace = ":".join(
+                str(getattr(embeddings, name, None))
+                for name in ("model", "deployment", "dimensions")
+            )
+        self.namespace = namespace
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+        self.requests = 0
+        self.saved_tokens = 0
+        self.sent_tokens = 0
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _plan(self, texts: List[str]) -> Tuple[List[str], Dict[str, List[float]], List[str], List[int]]:
+        """
+        Deduplicate texts and look them up in the cache.
+
+        Returns:
+            Tuple[List[str], Dict[str, List[float]], List[str], List[int]]: The key of each text,
+            the cached vectors by key, and the distinct texts to embed with their token counts.
+        """
+        keys = [self._key(text) for text in texts]
+        distinct: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            distinct.setdefault(key, text)
+        occurrences = Counter(keys)
+        token_counts = {key: count_tokens(text) for key, text in distinct.items()}
+
+        found = self.cache.get_many(distinct)
+        missing_keys = [key for key in distinct if key not in found]
+
+        # Hits save every occurrence, misses save all but the one occurrence that is sent
+        saved = sum(token_counts[key] * occurrences[key] for key in found)
+        saved += sum(token_counts[key] * (occurrences[key] - 1) for key in missing_keys)
+        with self._lock:
+            self.hits += sum(occurrences[key] for key in found)
+            self.misses += len(missing_keys)
+            self.deduplicated += len(texts) - len(distinct)
+            self.saved_tokens += saved
+            self.sent_tokens += sum(token_counts[key] for key in missing_keys)
+        return keys, found, [distinct[key] for key in missing_keys], [token_counts[key] for key in missing_keys]
+
+    def _batches(self, texts: List[str], tokens: List[int]) -> List[List[str]]:
+        # Greedy packing in order, like pack_requests in translate_tool
+        batches: List[List[str]] = []
+        current: List[str] = []
+        current_tokens = 0
+        for text, count in zip(texts, tokens):
+            if current and (len(current) >= self.batch_size or current_tokens + count > self.max_batch_tokens):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += count
+        if current:
+            batches.append(current)
+        return batches
+
+    def _store(self, found: Dict[str, List[float]], batch: List[str], vectors: List[List[float]]) -> None:
+        if len(vectors) != len(batch):
+            raise ValueError(f"Expected {len(batch)} embeddings but received {len(vectors)}.")
+        items = [(self._key(text), vector) for text, vector in zip(batch, vectors)]
+        self.cache.put_many(items)
+        # Returned as the cache will return them later
+        found.update((key, as_float32(vector).tolist()) for key, vector in items)
+        with self._lock:
+            self.requests += 1
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts, sending only those that are not cached, each once.
+
+        Args:
+            texts (List[str]): The texts to embed.
+
+        Returns:
+            List[List[float]]: One vector per text, in input order.
+        """
+        keys, found, missing, tokens = self._plan(list(texts))
+        for batch in self._batches(missing, tokens):
+            self._store(found, batch, self.embeddings.embed_documents(batch))
+        return [list(found[key]) for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query through the same cache as the documents.
+        """
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Async version of embed_documents.
+        """
+        keys, found, missing, tokens = self._plan(list(texts))
+        for batch in self._batches(missing, tokens):
+            self._store(found, batch, await self.embeddings.aembed_documents(batch))
+        return [list(found[key]) for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """
+        Async version of embed_query.
+        """
+        return (await self.aembed_documents([text]))[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the cache counters.
+
+        Returns:
+            Dict[str, Any]: hits, misses, in-batch duplicates, requests sent, tokens sent,
+            tokens saved by hits and deduplication, and the hit rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "deduplicated": self.deduplicated,
+                "requests": self.requests,
+                "sent_tokens": self.sent_tokens,
+                "saved_tokens": self.saved_tokens,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Upper bound on the (queries x vectors) score matrix built by one search_batch step
+_MAX_SCORE_MATRIX = 1 << 24
+
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the k highest scores of each row without sorting the whole row.
+
+    Args:
+        scores (np.ndarray): A (rows, n) or (n,) array of scores.
+        k (int): The number of results per row.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The positions and the scores of the top k of each row,
+        best first.
+    """
+    if k <= 0:
+        raise ValueError("k must be a positive integer.")
+    squeeze = scores.ndim == 1
+    scores = np.atleast_2d(scores)
+    k = min(k, scores.shape[1])
+
+    if k < scores.shape[1]:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    positions = np.take_along_axis(candidates, order, axis=1)
+    best = np.take_along_axis(candidate_scores, order, axis=1)
+    return (positions[0], best[0]) if squeeze else (positions, best)
+
+
+class EmbeddingIndex:
+    """
+    An exact cosine-similarity search index over embedding vectors.
+
+    Vectors are kept in one contiguous float32 matrix together with their inverse norms,
+    so a query is a single matrix-vector product followed by a partial sort (argpartition)
+    instead of a Python-level loop over a DataFrame column.
+    """
+
+    def __init__(self, dim: Optional[int] = None, dtype: Any = np.float32) -> None:
+        """
+        Initialize an empty index.
+
+        Args:
+            dim (Optional[int], optional): The vector dimension, taken from the first vectors added when None.
+            dtype (Any, optional): The storage dtype of the vectors.
+        """
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self._vectors = np.empty((0, dim or 0), dtype=self.dtype)
+        self._inverse_norms = np.empty(0, dtype=np.float32)
+        self._size = 0
+        self.ids: List[Any] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """
+        The stored vectors as a (len(index), dim) array view.
+        """
+        return self._vectors[:self._size]
+
+    @classmethod
+    def from_vectors(cls, vectors: Any, ids: Optional[Sequence[Any]] = None, dtype: Any = np.float32) -> "EmbeddingIndex":
+        """
+        Build an index from existing vectors, e.g. the output of embed_documents or an Embeddings column.
+
+        Args:
+            vectors (Any): A 2D array, or a sequence of equally long vectors.
+            ids (Optional[Sequence[Any]], optional): An id for each vector, its position when None.
+            dtype (Any, optional): The storage dtype of the vectors.
+
+        Returns:
+            EmbeddingIndex: The index.
+        """
+        index = cls(dtype=dtype)
+        index.add(vectors, ids)
+        return index
+
+    def add(self, vectors: Any, ids: Optional[Sequence[Any]] = None) -> None:
+        """
+        Append vectors to the index.
+
+        Args:
+            vectors (Any): A 2D array, or a sequence of equally long vectors.
+            ids (Optional[Sequence[Any]], optional): An id for each vector, its position when None.
+        """
+        # A pandas column of lists has to be unpacked before numpy sees it as a matrix
+        matrix = np.asarray(vectors if isinstance(vectors, np.ndarray) else list(vectors), dtype=self.dtype)
+        if matrix.ndim == 1:
+            matrix = matrix[np.newaxis, :]
+        if matrix.ndim != 2:
+            raise ValueError("Vectors must be a 2D array or a sequence of vectors.")
+        if ids is not None and len(ids) != matrix.shape[0]:
+            raise ValueError("The number of ids must match the number of vectors.")
+        if self.dim is None:
+            self.dim = matrix.shape[1]
+            self._vectors = np.empty((0, self.dim), dtype=self.dtype)
+        if matrix.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dimension {self.dim}, got {matrix.shape[1]}.")
+
+        count = matrix.shape[0]
+        self._reserve(self._size + count)
+        self._vectors[self._size:self._size + count] = matrix
+        norms = np.linalg.norm(matrix.astype(np.float32, copy=False), axis=1)
+        with np.errstate(divide="ignore"):
+            # Zero vectors get an inverse norm of 0, so they score 0 against every query
+            self._inverse_norms[self._size:self._size + count] = np.where(norms > 0, 1.0 / norms, 0.0)
+        self.ids.extend(ids if ids is not None else range(self._size, self._size + count))
+        self._size += count
+
+    def _reserve(self, capacity: int) -> None:
+        # Grow the buffers geometrically so repeated add() calls stay amortized O(1) per vector
+        if capacity <= self._vectors.shape[0]:
+            return
+        new_capacity = max(capacity, 2 * self._vectors.shape[0], 16)
+        vectors = np.empty((new_capacity, self.dim), dtype=self.dtype)
+        vectors[:self._size] = self._vectors[:self._size]
+        inverse_norms = np.empty(new_capacity, dtype=np.float32)
+        inverse_norms[:self._size] = self._inverse_norms[:self._size]
+        self._vectors, self._inverse_norms = vectors, inverse_norms
+
+    def _prepare_queries(self, queries: Any) -> np.ndarray:
+        matrix = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if matrix.shape[1] != self.dim:
+            raise ValueError(f"Expected queries of dimension {self.dim}, got {matrix.shape[1]}.")
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def scores(self, query: Any) -> np.ndarray:
+        """
+        Cosine similarity of the query to every stored vector.
+
+        Args:
+            query (Any): The query vector.
+
+        Returns:
+            np.ndarray: One score per stored vector, in insertion order.
+        """
+        query = self._prepare_queries(query)[0]
+        return (self.vectors @ query.astype(self.dtype, copy=False)).astype(np.float32) * \
+            self._inverse_norms[:self._size]
+
+    def search(self, query: Any, k: int = 5) -> List[Tuple[Any, float]]:
+        """
+        Find the k stored vectors most similar to the query.
+
+        Args:
+            query (Any): The query vector, e.g. the output of embed_query.
+            k (int, optional): The number of results.
+
+        Returns:
+            List[Tuple[Any, float]]: (id, cosine similarity) pairs, most similar first.
+        """
+        if self._size == 0:
+            return []
+        positions, best = top_k(self.scores(query), k)
+        return [(self.ids[p], float(s)) for p, s in zip(positions, best)]
+
+    def search_batch(self, queries: Any, k: int = 5) -> List[List[Tuple[Any, float]]]:
+        """
+        Search for several queries at once with matrix-matrix products.
+
+        Args:
+            queries (Any): A 2D array, or a sequence of query vectors.
+            k (int, optional): The number of results per query.
+
+        Returns:
+            List[List[Tuple[Any, float]]]: The results of each query, as returned by search.
+        """
+        if self._size == 0:
+            # Like search, an empty index has no results, whatever the dimension of the queries
+            return [[] for _ in range(np.atleast_2d(np.asarray(queries)).shape[0])]
+        matrix = self._prepare_queries(queries).astype(self.dtype, copy=False)
+
+        results: List[List[Tuple[Any, float]]] = []
+        step = max(1, _MAX_SCORE_MATRIX // self._size)
+        for start in range(0, matrix.shape[0], step):
+            scores = (matrix[start:start + step] @ self.vectors.T).astype(np.float32)
+            scores *= self._inverse_norms[:self._size]
+            positions, best = top_k(scores, k)
+            for row_positions, row_scores in zip(positions, best):
+                results.append([(self.ids[p], float(s)) for p, s in zip(row_positions, row_scores)])
+        return results
@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from embedding_index import top_k
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_DTYPES = ("float32", "float16")
+
+# Rows scored per step of a search, bounding the memory a search needs whatever the store size
+SEARCH_CHUNK_ROWS = 65536
+
+
+class EmbeddingStore:
+    """
+    A persistent, append-only store of embedding vectors backed by memory-mapped files.
+
+    A store is a directory holding:
+
+    - vectors.bin: the vectors as one fixed-dimension float32 (or float16) row-major matrix
+    - norms.f32: the inverse norm of each vector, so searches do not recompute them
+    - records.jsonl: one {"id", "text"} line per vector
+    - deleted.txt: the row numbers of deleted or replaced vectors
+    - meta.json: the dimension, dtype and the next default id
+
+    Appends only write to the end of the files, and searches read the vectors through
+    np.memmap in fixed-size chunks, so a store does not have to fit in memory.
+    Only the ids and the byte offsets of the records are kept in memory; texts are read on demand.
+    """
+
+    def __init__(self, path: str, dim: Optional[int] = None, dtype: str = "float32") -> None:
+        """
+        Open a store, creating it if the directory does not hold one yet.
+
+        Args:
+            path (str): The store directory.
+            dim (Optional[int], optional): The vector dimension, taken from the first vectors appended when None.
+            dtype (str, optional): "float32", or "float16" to halve the size on disk.
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        meta = self._read_meta()
+        if meta is not None:
+            if dim is not None and dim != meta["dim"]:
+                raise ValueError(f"The store at {path} holds vectors of dimension {meta['dim']}, not {dim}.")
+            dim, dtype = meta["dim"], meta["dtype"]
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"dtype must be one of {SUPPORTED_DTYPES}.")
+
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.ids: List[Any] = []
+        self._offsets: List[int] = []
+        self._positions: Dict[Any, int] = {}
+        self._deleted: set = set()
+        # Default ids are never reused, even after the rows holding them are compacted away
+        self._next_id = meta.get("next_id", 0) if meta is not None else 0
+        if meta is None and dim is not None:
+            self._write_meta()
+        self._load()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._file("meta.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self) -> None:
+        with open(self._file("meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "dtype": self.dtype.name, "next_id": self._next_id}, f)
+
+    @property
+    def _row_bytes(self) -> int:
+        return self.dim * self.dtype.itemsize
+
+    def _load(self) -> None:
+        """
+        Read the ids and record offsets, and drop any partly written rows left by a crash.
+        """
+        offset = 0
+        records_path = self._file("records.jsonl")
+        if os.path.exists(records_path):
+            with open(records_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    self.ids.append(json.loads(line)["id"])
+                    self._offsets.append(offset)
+                    offset += len(line)
+
+        rows = len(self.ids)
+        if self.dim is not None:
+            rows = min(
+                rows,
+                self._file_size("vectors.bin") // self._row_bytes,
+                self._file_size("norms.f32") // 4,
+            )
+            self._truncate(rows, offset if rows == len(self.ids) else self._offsets[rows])
+        del self.ids[rows:]
+        del self._offsets[rows:]
+
+        deleted_path = self._file("deleted.txt")
+        if os.path.exists(deleted_path):
+            with open(deleted_path, encoding="utf-8") as f:
+                self._deleted = {int(line) for line in f if line.strip() and int(line) < rows}
+        self._positions = {
+            record_id: position for position, record_id in enumerate(self.ids) if position not in self._deleted
+        }
+        self._next_id = max(self._next_id, self._after_integer_ids(self.ids))
+
+    @staticmethod
+    def _after_integer_ids(ids: Sequence[Any]) -> int:
+        return max((record_id + 1 for record_id in ids if type(record_id) is int), default=0)
+
+    def _file_size(self, name: str) -> int:
+        try:
+            return os.path.getsize(self._file(name))
+        except FileNotFoundError:
+            return 0
+
+    def _truncate(self, rows: int, records_size: int) -> None:
+        for name, size in (
+            ("vectors.bin", rows * self._row_bytes),
+            ("norms.f32", rows * 4),
+            ("records.jsonl", records_size),
+        ):
+            if self._file_size(name) > size:
+                logger.warning(f"Truncating {name} in {self.path} to {rows} complete rows.")
+                with open(self._file(name), "r+b") as f:
+                    f.truncate(size)
+
+    def __len__(self) -> int:
+        return len(self.ids) - len(self._deleted)
+
+    def append(self, vectors: Any, ids: Optional[Sequence[Any]] = None, texts: Optional[Sequence[str]] = None) -> None:
+        """
+        Append vectors, e.g. the output of AzureOpenAIEmbeddings.embed_documents, to the store.
+
+        Appending an id that is already stored replaces the old vector.
+
+        Args:
+            vectors (Any): A 2D array, or a sequence of equally long vectors.
+            ids (Optional[Sequence[Any]], optional): A JSON-serializable id for each vector. When None,
+                new integer ids are used, above every integer id the store has held.
+            texts (Optional[Sequence[str]], optional): The text each vector was embedded from.
+        """
+        matrix = np.asarray(vectors if isinstance(vectors, np.ndarray) else list(vectors), dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[np.newaxis, :]
+        if matrix.ndim != 2:
+            raise ValueError("Vectors must be a 2D array or a sequence of vectors.")
+        count = matrix.shape[0]
+        if ids is not None and len(ids) != count:
+            raise ValueError("The number of ids must match the number of vectors.")
+        if texts is not None and len(texts) != count:
+            raise ValueError("The number of texts must match the number of vectors.")
+        if matrix.shape[1] != (self.dim or matrix.shape[1]):
+            raise ValueError(f"Expected vectors of dimension {self.dim}, got {matrix.shape[1]}.")
+
+        start = len(self.ids)
+        ids = list(ids) if ids is not None else list(range(self._next_id, self._next_id + count))
+        next_id = max(self._next_id, self._after_integer_ids(ids))
+        if self.dim is None or next_id != self._next_id:
+            # Saved before the rows, so a crash can skip ids but never hand them out twice
+            self.dim = matrix.shape[1]
+            self._next_id = next_id
+            self._write_meta()
+        norms = np.linalg.norm(matrix, axis=1)
+        with np.errstate(divide="ignore"):
+            inverse_norms = np.where(norms > 0, 1.0 / norms, 0.0).astype(np.float32)
+
+        # Vectors and norms go first: on open, rows without a complete record are dropped
+        with open(self._file("vectors.bin"), "ab") as f:
+            f.write(matrix.astype(self.dtype).tobytes())
+        with open(self._file("norms.f32"), "ab") as f:
+            f.write(inverse_norms.tobytes())
+
+        replaced = []
+        offset = self._file_size("records.jsonl")
+        lines = []
+        for i, record_id in enumerate(ids):
+            line = json.dumps({"id": record_id, "text": texts[i] if texts is not None else None},
+                              ensure_ascii=False).encode("utf-8") + b"\n"
+            lines.append(line)
+            self._offsets.append(offset)
+            offset += len(line)
+            if record_id in self._positions:
+                replaced.append(self._positions[record_id])
+            self._positions[record_id] = start + i
+        with open(self._file("records.jsonl"), "ab") as f:
+            f.write(b"".join(lines))
+        self.ids.extend(ids)
+        self._mark_deleted(replaced)
+
+    def delete(self, ids: Sequence[Any]) -> None:
+        """
+        Delete vectors by id. Their space is reclaimed by compact().
+        """
+        self._mark_deleted([self._positions.pop(record_id) for record_id in ids if record_id in self._positions])
+
+    def _mark_deleted(self, positions: List[int]) -> None:
+        if not positions:
+            return
+        with open(self._file("deleted.txt"), "a", encoding="utf-8") as f:
+            f.write("".join(f"{position}\n" for position in positions))
+        self._deleted.update(positions)
+
+    def vectors(self) -> np.ndarray:
+        """
+        All stored rows, including deleted ones, as a read-only memory-mapped (rows, dim) array.
+        """
+        if not self.ids:
+            return np.empty((0, self.dim or 0), dtype=self.dtype)
+        return np.memmap(self._file("vectors.bin"), dtype=self.dtype, mode="r", shape=(len(self.ids), self.dim))
+
+    def _inverse_norms(self) -> np.ndarray:
+        return np.memmap(self._file("norms.f32"), dtype=np.float32, mode="r", shape=(len(self.ids),))
+
+    def get_text(self, record_id: Any) -> Optional[str]:
+        """
+        Read the text stored with an id.
+        """
+        position = self._positions[record_id]
+        with open(self._file("records.jsonl"), "rb") as f:
+            f.seek(self._offsets[position])
+            return json.loads(f.readline())["text"]
+
+    def search(self, query: Any, k: int = 5) -> List[Tuple[Any, float]]:
+        """
+        Find the k stored vectors most similar (by cosine similarity) to the query.
+
+        The memory-mapped vectors are scored in chunks of SEARCH_CHUNK_ROWS rows, converted to
+        float32 one chunk at a time.
+
+        Args:
+            query (Any): The query vector, e.g. the output of embed_query.
+            k (int, optional): The number of results.
+
+        Returns:
+            List[Tuple[Any, float]]: (id, cosine similarity) pairs, most similar first.
+        """
+        if len(self) == 0:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        if query.shape != (self.dim,):
+            raise ValueError(f"Expected a query of dimension {self.dim}, got shape {query.shape}.")
+        query_norm = np.linalg.norm(query)
+        if query_norm > 0:
+            query = query / query_norm
+
+        vectors = self.vectors()
+        inverse_norms = self._inverse_norms()
+        deleted = np.fromiter(self._deleted, dtype=np.intp, count=len(self._deleted))
+        candidate_positions = []
+        candidate_scores = []
+        for start in range(0, len(self.ids), SEARCH_CHUNK_ROWS):
+            stop = min(start + SEARCH_CHUNK_ROWS, len(self.ids))
+            scores = (np.asarray(vectors[start:stop], dtype=np.float32) @ query) * inverse_norms[start:stop]
+            chunk_deleted = deleted[(deleted >= start) & (deleted < stop)] - start
+            scores[chunk_deleted] = -np.inf
+            positions, best = top_k(scores, k)
+            candidate_positions.append(positions + start)
+            candidate_scores.append(best)
+
+        positions, best = top_k(np.concatenate(candidate_scores), k)
+        positions = np.concatenate(candidate_positions)[positions]
+        return [(self.ids[p], float(s)) for p, s in zip(positions, best) if np.isfinite(s)]
+
+    def compact(self) -> None:
+        """
+        Rewrite the store without its deleted and replaced rows.
+
+        The new files are written next to the old ones and then moved into place.
+        """
+        if not self._deleted:
+            return
+
+        live = np.array([p for p in range(len(self.ids)) if p not in self._deleted], dtype=np.intp)
+        vectors = self.vectors()
+        inverse_norms = self._inverse_norms()
+        with open(self._file("vectors.bin.tmp"), "wb") as f:
+            for start in range(0, len(live), SEARCH_CHUNK_ROWS):
+                f.write(np.ascontiguousarray(vectors[live[start:start + SEARCH_CHUNK_ROWS]]).tobytes())
+        with open(self._file("norms.f32.tmp"), "wb") as f:
+            f.write(np.ascontiguousarray(inverse_norms[live]).tobytes())
+        with open(self._file("records.jsonl"), "rb") as source, open(self._file("records.jsonl.tmp"), "wb") as f:
+            for position in live:
+                source.seek(self._offsets[position])
+                f.write(source.readline())
+        del vectors, inverse_norms
+
+        for name in ("vectors.bin", "norms.f32", "records.jsonl"):
+            os.replace(self._file(name + ".tmp"), self._file(name))
+        os.remove(self._file("deleted.txt"))
+
+        self.ids, self._offsets, self._deleted = [], [], set()
+        self._load()
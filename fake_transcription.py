@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import argparse
+import email
+import email.policy
+import io
+import json
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# The fake "speech": each word is a tone burst at its own frequency, separated by silence
+VOCABULARY = (
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet", "kilo", "lima",
+    "mike", "november", "oscar", "papa", "quebec", "romeo", "sierra", "tango", "uniform", "victor", "whiskey",
+    "xray", "yankee", "zulu",
+)
+BASE_FREQUENCY = 300.0
+FREQUENCY_STEP = 50.0
+
+
+def synthesize_speech(
+    words: Sequence[str],
+    sample_rate: int = 16000,
+    word_seconds: float = 0.3,
+    gap_seconds: float = 0.2,
+    pauses: Optional[Dict[int, float]] = None
+) -> np.ndarray:
+    """
+    Build audio the fake service can transcribe: one tone burst per word of VOCABULARY, each
+    followed by silence.
+
+    Args:
+        words (Sequence[str]): The words to "say".
+        sample_rate (int, optional): The sample rate of the audio.
+        word_seconds (float, optional): The length of each word.
+        gap_seconds (float, optional): The silence after each word.
+        pauses (Optional[Dict[int, float]], optional): Longer silences, in seconds, after the
+            words at these positions.
+
+    Returns:
+        np.ndarray: Mono float32 samples in [-1, 1].
+    """
+    t = np.arange(int(word_seconds * sample_rate)) / sample_rate
+    # Fade in and out so the bursts have no clicks
+    envelope = np.minimum(1.0, np.minimum(t, t[::-1]) / 0.02)
+    parts = [np.zeros(int(gap_seconds * sample_rate))]
+    for i, word in enumerate(words):
+        frequency = BASE_FREQUENCY + FREQUENCY_STEP * VOCABULARY.index(word)
+        parts.append(0.5 * envelope * np.sin(2 * np.pi * frequency * t))
+        parts.append(np.zeros(int((pauses or {}).get(i, gap_seconds) * sample_rate)))
+    return np.concatenate(parts).astype(np.float32)
+
+
+def transcribe_tones(samples: np.ndarray, sample_rate: int) -> str:
+    """
+    The deterministic "transcription" of the fake service.
+
+    Every tone burst that lies entirely within the audio becomes the word of its frequency;
+    bursts cut off at either end are left out, as a word cut in half would be.
+    """
+    frame = max(1, sample_rate // 100)
+    frames = len(samples) // frame
+    loud = np.sqrt((samples[:frames * frame].reshape(frames, frame) ** 2).mean(axis=1)) > 0.05 if frames else []
+
+    words = []
+    start = None
+    for i, is_loud in enumerate([*loud, False]):
+        if is_loud and start is None:
+            start = i
+        elif not is_loud and start is not None:
+            if start > 0 and i < frames:
+                burst = samples[start * frame:i * frame]
+                spectrum = np.abs(np.fft.rfft(burst))
+                frequency = np.argmax(spectrum) * sample_rate / len(burst)
+                index = int(round((frequency - BASE_FREQUENCY) / FREQUENCY_STEP))
+                if 0 <= index < len(VOCABULARY):
+                    words.append(VOCABULARY[index])
+            start = None
+    return " ".join(words)
+
+
+def _read_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    with wave.open(io.BytesIO(data)) as f:
+        if f.getsampwidth() != 2:
+            raise ValueError("Only 16-bit PCM audio is supported.")
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype="<i2").astype(np.float32) / 32768.0
+        return samples.reshape(-1, f.getnchannels()).mean(axis=1), f.getframerate()
+
+
+class _TranscriptionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_TranscriptionHTTPServer"
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        raw_body = self.rfile.read(length)
+        if self.path.split("?")[0].rstrip("/") != "/v1/audio/transcriptions":
+            self._send_json(404, {"error": {"message": "Not found.", "type": "invalid_request_error"}})
+            return
+
+        # Parse the multipart form with the e-mail parser, which understands the same format
+        message = email.message_from_bytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("latin-1") + raw_body,
+            policy=email.policy.HTTP,
+        )
+        fields = {part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+                  for part in message.iter_parts()}
+
+        owner = self.server.owner
+        owner._enter()
+        try:
+            if owner.latency:
+                time.sleep(owner.latency)
+            try:
+                samples, sample_rate = _read_wav(fields.get("file") or b"")
+            except Exception as e:
+                self._send_json(400, {"error": {"message": f"Invalid file: {e}", "type": "invalid_request_error"}})
+                return
+            text = transcribe_tones(samples, sample_rate)
+            owner._record({"model": (fields.get("model") or b"").decode(), "seconds": len(samples) / sample_rate,
+                           "bytes": len(fields.get("file") or b""), "text": text})
+            self._send_json(200, {"text": text})
+        finally:
+            owner._leave()
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _TranscriptionHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    owner: "FakeTranscriptionServer"
+
+
+class FakeTranscriptionServer:
+    """
+    A local HTTP stand-in for the OpenAI ``/audio/transcriptions`` operation.
+
+    It accepts 16-bit PCM WAV uploads and "transcribes" the tone bursts made by
+    synthesize_speech back into words, so tests can check what a transcription
+    pipeline sends and how it puts the text back together. Point an OpenAI client
+    at ``base_url``.
+
+    Run ``python fake_transcription.py --port 8081`` to use it as a standalone endpoint.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0) -> None:
+        """
+        Initialize the server without starting it.
+
+        Args:
+            host (str, optional): The interface to listen on.
+            port (int, optional): The port to listen on, 0 picks a free one.
+            latency (float, optional): Seconds to wait before answering each request.
+        """
+        self._httpd = _TranscriptionHTTPServer((host, port), _TranscriptionHandler)
+        self._httpd.owner = self
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.requests: List[Dict[str, Any]] = []
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def reset(self) -> None:
+        """
+        Forget all recorded requests.
+        """
+        with self._lock:
+            self.requests.clear()
+            self.max_in_flight = 0
+
+    def _record(self, request: Dict[str, Any]) -> None:
+        with self._lock:
+            self.requests.append(request)
+
+    def _enter(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _leave(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def start(self) -> "FakeTranscriptionServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "FakeTranscriptionServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a fake OpenAI /audio/transcriptions endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per request")
+    args = parser.parse_args()
+
+    server = FakeTranscriptionServer(args.host, args.port, args.latency)
+    print(f"Fake transcription service listening on {server.base_url}, press Ctrl+C to stop")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
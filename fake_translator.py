@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+def fake_translation(text: str, to_language: str) -> str:
+    """
+    The deterministic "translation" returned by the fake service.
+
+    Args:
+        text (str): The source text.
+        to_language (str): The target language code.
+
+    Returns:
+        str: The text prefixed with the target language, e.g. "[fr] Hello".
+    """
+    return f"[{to_language}] {text}"
+
+
+# Returned by the languages operation
+_LANGUAGES = {"de": "German", "en": "English", "es": "Spanish", "fr": "French", "ja": "Japanese"}
+
+
+class _TranslatorHandler(BaseHTTPRequestHandler):
+    # Keep connections open between requests, like the real service
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "_TranslatorHTTPServer"
+
+    def do_GET(self) -> None:
+        # The unauthenticated languages operation, which clients may call to open a connection early
+        if urlparse(self.path).path.rstrip("/") != "/languages":
+            self._send_json(404, {"error": {"code": 404000, "message": "The requested resource was not found."}})
+            return
+        self._send_json(200, {"translation": {
+            code: {"name": name, "nativeName": name, "dir": "ltr"} for code, name in _LANGUAGES.items()
+        }})
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        raw_body = self.rfile.read(length)
+
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/translate":
+            self._send_json(404, {"error": {"code": 404000, "message": "The requested resource was not found."}})
+            return
+
+        query = parse_qs(url.query)
+        to_languages = query.get("to", [])
+        from_language = (query.get("from") or [None])[0]
+        body = json.loads(raw_body or b"[]")
+
+        owner = self.server.owner
+        owner._record(body, to_languages, from_language)
+
+        rejection = owner._admit()
+        if rejection is not None:
+            status, retry_after = rejection
+            headers = {"Retry-After": f"{retry_after:.3f}"} if retry_after is not None else {}
+            self._send_json(status, {"error": {"code": status * 1000 + 1, "message": "Injected error."}}, headers)
+            return
+
+        owner._enter()
+        try:
+            delay = owner._delay(body)
+            if delay:
+                time.sleep(delay)
+            self._translate(body, to_languages, from_language)
+        finally:
+            owner._leave()
+
+    def _translate(self, body: List[Dict[str, Any]], to_languages: List[str], from_language: Optional[str]) -> None:
+        if not to_languages:
+            self._send_json(400, {"error": {"code": 400036, "message": "The target language is not valid."}})
+            return
+
+        result = []
+        for item in body:
+            text = item.get("Text", item.get("text", ""))
+            entry: Dict[str, Any] = {
+                "translations": [{"text": fake_translation(text, lang), "to": lang} for lang in to_languages]
+            }
+            if from_language is None:
+                entry["detectedLanguage"] = {"language": "en", "score": 1.0}
+            result.append(entry)
+        self._send_json(200, result)
+
+    def _send_json(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        if self.close_connection:
+            # Confirm the close the client asked for, so it does not put the connection back in its pool
+            self.send_header("Connection", "close")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Keep test and benchmark output quiet
+        pass
+
+
+class _TranslatorHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+    owner: "FakeTranslatorServer"
+
+
+class FakeTranslatorServer:
+    """
+    A local HTTP stand-in for the Azure Translator v3 ``/translate`` operation (and a
+    minimal ``/languages``).
+
+    The server runs on a background thread and records every request it receives,
+    so tests can point an AzureTranslateTool at ``endpoint`` and assert on how many
+    round trips were made. It can also throttle like the real service, answering
+    429 with a Retry-After header once more than requests_per_second requests
+    arrive within a second, and fail requests on demand with inject_errors, or at
+    random with error_rate.
+
+    Run ``python fake_translator.py --port 8080`` to use it as a standalone endpoint.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        requests_per_second: Optional[int] = None,
+        latency_jitter: float = 0.0,
+        latency_per_character: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        seed: Optional[int] = None
+    ) -> None:
+        """
+        Initialize the server without starting it.
+
+        Args:
+            host (str, optional): The interface to listen on.
+            port (int, optional): The port to listen on, 0 picks a free one.
+            latency (float, optional): Seconds to wait before answering each request.
+            requests_per_second (Optional[int], optional): Throttle above this many requests per second.
+            latency_jitter (float, optional): Up to this many extra seconds, at random, per request.
+            latency_per_character (float, optional): Extra seconds per character of each request body.
+            error_rate (float, optional): The fraction of requests that fail with error_status.
+            error_status (int, optional): The HTTP status of the random failures.
+            seed (Optional[int], optional): Seed for the jitter and random failures.
+        """
+        self._httpd = _TranslatorHTTPServer((host, port), _TranslatorHandler)
+        self._httpd.owner = self
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.requests: List[Dict[str, Any]] = []
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.latency_per_character = latency_per_character
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests_per_second = requests_per_second
+        self.throttled_count = 0
+        self._accepted: Deque[float] = deque()
+        self._injected: Deque[Tuple[int, Optional[float]]] = deque()
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def request_count(self) -> int:
+        with self._lock:
+            return len(self.requests)
+
+    def reset(self) -> None:
+        """
+        Forget all recorded requests.
+        """
+        with self._lock:
+            self.requests.clear()
+            self.max_in_flight = 0
+            self.throttled_count = 0
+            self._accepted.clear()
+            self._injected.clear()
+
+    def inject_errors(self, status: int, count: int = 1, retry_after: Optional[float] = None) -> None:
+        """
+        Make the next count requests fail.
+
+        Args:
+            status (int): The HTTP status of the failures, e.g. 429 or 503.
+            count (int, optional): How many requests fail.
+            retry_after (Optional[float], optional): The Retry-After value to send, in seconds.
+        """
+        with self._lock:
+            self._injected.extend([(status, retry_after)] * count)
+
+    def _admit(self) -> Optional[Tuple[int, Optional[float]]]:
+        # Returns the (status, retry_after) to reject the request with, or None to serve it
+        with self._lock:
+            if self._injected:
+                return self._injected.popleft()
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self.error_status, None
+            if self.requests_per_second is None:
+                return None
+
+            now = time.monotonic()
+            while self._accepted and now - self._accepted[0] >= 1.0:
+                self._accepted.popleft()
+            if len(self._accepted) >= self.requests_per_second:
+                self.throttled_count += 1
+                return 429, 1.0 - (now - self._accepted[0])
+            self._accepted.append(now)
+            return None
+
+    def _delay(self, body: List[Dict[str, Any]]) -> float:
+        delay = self.latency
+        if self.latency_per_character:
+            delay += self.latency_per_character * sum(len(item.get("Text", item.get("text", ""))) for item in body)
+        if self.latency_jitter:
+            with self._lock:
+                delay += self._random.uniform(0, self.latency_jitter)
+        return delay
+
+    def _record(self, body: List[Dict[str, Any]], to_languages: List[str], from_language: Optional[str]) -> None:
+        with self._lock:
+            self.requests.append({"body": body, "to": to_languages, "from": from_language})
+
+    def _enter(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _leave(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def start(self) -> "FakeTranslatorServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "FakeTranslatorServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a fake Azure Translator v3 /translate endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per request")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="Up to this many extra seconds per request")
+    parser.add_argument("--latency-per-character", type=float, default=0.0, help="Extra seconds per character")
+    parser.add_argument("--requests-per-second", type=int, default=None, help="Answer 429 above this rate")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=500)
+    args = parser.parse_args()
+
+    server = FakeTranslatorServer(
+        args.host, args.port, args.latency, args.requests_per_second, args.latency_jitter,
+        args.latency_per_character, args.error_rate, args.error_status
+    )
+    print(f"Fake Translator listening on {server.endpoint}, press Ctrl+C to stop")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
@@ -0,0 +1,483 @@
+from __future__ import annotations
+
+import asyncio
+import binascii
+import hashlib
+import io
+import logging
+import math
+import struct
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import httpx
+
+try:
+    from PIL import ExifTags, Image, ImageOps
+except ImportError:  # Without Pillow, images are sent as they are
+    ExifTags = Image = ImageOps = None
+
+logger = logging.getLogger(__name__)
+
+# The image formats the chat completions API accepts, by the magic bytes they start with
+SUPPORTED_MIME_TYPES = ("image/png", "image/jpeg", "image/gif", "image/webp")
+
+# How the service sizes images before counting their tokens: "high" detail fits the image in
+# 2048x2048 and then scales its shortest side down to 768; "low" detail uses 512x512 at most.
+HIGH_DETAIL_MAX_SIDE = 2048
+HIGH_DETAIL_SHORT_SIDE = 768
+LOW_DETAIL_MAX_SIDE = 512
+TILE_SIZE = 512
+BASE_TOKENS = 85
+TILE_TOKENS = 170
+
+# A multiple of 3, so each chunk encodes to base64 without padding
+_BASE64_CHUNK = 3 * 16384
+
+
+def sniff_image(data: bytes) -> Tuple[Optional[str], Optional[Tuple[int, int]]]:
+    """
+    Find the format and dimensions of an image from its header, without decoding it.
+
+    Args:
+        data (bytes): The image file contents.
+
+    Returns:
+        Tuple[Optional[str], Optional[Tuple[int, int]]]: The MIME type, or None when it is not one
+        of SUPPORTED_MIME_TYPES, and the (width, height), or None when the header cannot be read.
+    """
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png", struct.unpack(">II", data[16:24]) if len(data) >= 24 else None
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif", struct.unpack("<HH", data[6:10]) if len(data) >= 10 else None
+    if data.startswith(b"\xff\xd8"):
+        return "image/jpeg", _jpeg_size(data)
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp", _webp_size(data)
+    return None, None
+
+
+def _jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    # Walk the segments up to the start-of-frame marker, which holds the dimensions
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        length = struct.unpack(">H", data[i + 2:i + 4])[0]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return width, height
+        i += 2 + length
+    return None
+
+
+def _webp_size(data: bytes) -> Optional[Tuple[int, int]]:
+    chunk = data[12:16]
+    if chunk == b"VP8X" and len(data) >= 30:
+        return 1 + int.from_bytes(data[24:27], "little"), 1 + int.from_bytes(data[27:30], "little")
+    if chunk == b"VP8 " and len(data) >= 30:
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and len(data) >= 25:
+        b0, b1, b2, b3 = data[21:25]
+        return 1 + (((b1 & 0x3F) << 8) | b0), 1 + (((b3 & 0x0F) << 10) | (b2 << 2) | ((b1 & 0xC0) >> 6))
+    return None
+
+
+def fit_image_size(width: int, height: int, detail: str = "high") -> Tuple[int, int]:
+    """
+    Compute the largest size of an image that the model makes use of.
+
+    Args:
+        width (int): The image width.
+        height (int): The image height.
+        detail (str, optional): The image_url detail level: "low", "high" or "auto" (sized as "high").
+
+    Returns:
+        Tuple[int, int]: The (width, height) the service would scale the image down to. Images
+        are never scaled up.
+    """
+    scale = 1.0
+    if detail == "low":
+        scale = min(scale, LOW_DETAIL_MAX_SIDE / max(width, height))
+    else:
+        scale = min(scale, HIGH_DETAIL_MAX_SIDE / max(width, height), HIGH_DETAIL_SHORT_SIDE / min(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def image_tokens(width: int, height: int, detail: str = "high") -> int:
+    """
+    Estimate the prompt tokens of an image: a base cost plus a cost per 512px tile at "high" detail.
+    """
+    if detail == "low":
+        return BASE_TOKENS
+    width, height = fit_image_size(width, height, detail)
+    return BASE_TOKENS + TILE_TOKENS * math.ceil(width / TILE_SIZE) * math.ceil(height / TILE_SIZE)
+
+
+def encode_data_url(data: Union[bytes, bytearray, memoryview], mime_type: str) -> str:
+    """
+    Build the base64 data URL of an image.
+
+    The URL is encoded chunk by chunk into a buffer allocated once at its final size, so the
+    only full-size copies are that buffer and the returned string.
+
+    Args:
+        data (Union[bytes, bytearray, memoryview]): The image file contents.
+        mime_type (str): The MIME type of the image.
+
+    Returns:
+        str: The "data:<mime type>;base64,..." URL.
+    """
+    prefix = f"data:{mime_type};base64,".encode("ascii")
+    view = memoryview(data)
+    buffer = bytearray(len(prefix) + 4 * ((len(view) + 2) // 3))
+    buffer[:len(prefix)] = prefix
+    position = len(prefix)
+    for start in range(0, len(view), _BASE64_CHUNK):
+        encoded = binascii.b2a_base64(view[start:start + _BASE64_CHUNK], newline=False)
+        buffer[position:position + len(encoded)] = encoded
+        position += len(encoded)
+    return buffer.decode("ascii")
+
+
+def prepare_image(
+    data: bytes, detail: str = "high", quality: int = 85
+) -> Tuple[bytes, str, Optional[Tuple[int, int]]]:
+    """
+    Downscale an image to the size the model uses and re-encode it, when Pillow is installed.
+
+    Images that already fit are kept byte for byte. Larger ones are scaled down to
+    fit_image_size and saved as JPEG, or as PNG when they have transparency. JPEGs are decoded
+    at a reduced scale to begin with, which saves most of the decoding time and memory.
+    Images with an EXIF orientation (e.g. phone photos) are turned upright first, and sized
+    as they are displayed.
+
+    Args:
+        data (bytes): The image file contents.
+        detail (str, optional): The image_url detail level the image is sized for.
+        quality (int, optional): The JPEG quality of re-encoded images.
+
+    Returns:
+        Tuple[bytes, str, Optional[Tuple[int, int]]]: The image to send, its MIME type and its
+        (width, height), when known.
+    """
+    mime_type, size = sniff_image(data)
+    if Image is None:
+        if mime_type is None:
+            raise ValueError("Unsupported image format; install Pillow to convert it.")
+        return data, mime_type, size
+
+    with Image.open(io.BytesIO(data)) as image:
+        orientation = image.getexif().get(ExifTags.Base.Orientation, 1)
+        # Orientations 5 to 8 turn the image by a quarter, swapping its width and height
+        rotated = orientation in (5, 6, 7, 8)
+        width, height = image.size[::-1] if rotated else image.size
+        target = fit_image_size(width, height, detail)
+        if mime_type is not None and target == (width, height) and orientation == 1:
+            return data, mime_type, image.size
+
+        transparent = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        # Only JPEG supports this; other formats ignore it
+        image.draft("RGB", target[::-1] if rotated else target)
+        converted = ImageOps.exif_transpose(image).convert("RGBA" if transparent else "RGB")
+    if converted.size != target:
+        converted = converted.resize(target, Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+    output = io.BytesIO()
+    if transparent:
+        converted.save(output, "PNG", optimize=True)
+        mime_type = "image/png"
+    else:
+        converted.save(output, "JPEG", quality=quality, optimize=True)
+        mime_type = "image/jpeg"
+    return output.getvalue(), mime_type, converted.size
+
+
+@dataclass
+class LoadedImage:
+    """
+    An image ready to be sent to a vision model.
+    """
+
+    source: str
+    data_url: str
+    mime_type: str
+    content_hash: str  # SHA-256 of the original file contents
+    original_bytes: int
+    encoded_bytes: int  # The size of the image sent, before base64
+    size: Optional[Tuple[int, int]] = None
+    detail: str = "auto"
+
+    @property
+    def tokens(self) -> Optional[int]:
+        """
+        The estimated prompt tokens of the image, when its size is known.
+        """
+        return image_tokens(*self.size, self.detail) if self.size is not None else None
+
+    def to_message_part(self) -> Dict[str, Any]:
+        """
+        The image_url content part of a chat message, e.g. for HumanMessage(content=[...]).
+        """
+        return {"type": "image_url", "image_url": {"url": self.data_url, "detail": self.detail}}
+
+
+class ImageLoader:
+    """
+    Loads images from URLs or files into image_url message parts, concurrently and with little memory.
+
+    URLs are fetched with one pooled async httpx client, at most max_concurrency at a time, and
+    streamed into a buffer sized from the Content-Length. Each image is downscaled to the
+    resolution the model actually uses (see prepare_image) in a worker thread and base64-encoded
+    into a preallocated buffer (see encode_data_url). The results are kept in an LRU cache keyed
+    by the SHA-256 of the file contents, so the same image found at several URLs, or loaded
+    again, is only processed once.
+    """
+
+    def __init__(
+        self,
+        detail: str = "auto",
+        max_concurrency: int = 16,
+        max_image_bytes: int = 20 * 1024 * 1024,
+        timeout: float = 30.0,
+        quality: int = 85,
+        max_cache_entries: int = 256,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> None:
+        """
+        Initialize the loader.
+
+        Args:
+            detail (str, optional): The image_url detail level: "low", "high" or "auto".
+            max_concurrency (int, optional): The maximum number of downloads in flight.
+            max_image_bytes (int, optional): Images larger than this are rejected.
+            timeout (float, optional): The HTTP timeout, in seconds.
+            quality (int, optional): The JPEG quality of downscaled images.
+            max_cache_entries (int, optional): The number of encoded images kept in memory.
+            client (Optional[httpx.AsyncClient], optional): An httpx client to use instead of the
+                loader's own. It is not closed by aclose.
+        """
+        if detail not in ("low", "high", "auto"):
+            raise ValueError("detail must be 'low', 'high' or 'auto'.")
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be a positive integer.")
+
+        self.detail = detail
+        self.max_concurrency = max_concurrency
+        self.max_image_bytes = max_image_bytes
+        self.timeout = timeout
+        self.quality = quality
+        self.max_cache_entries = max_cache_entries
+        self._external_client = client
+        # The HTTP client and download semaphore of each event loop the loader is used from
+        self._clients: "weakref.WeakKeyDictionary[Any, Tuple[httpx.AsyncClient, asyncio.Semaphore]]" = \
+            weakref.WeakKeyDictionary()
+        self._encoding: Dict[str, "asyncio.Future[LoadedImage]"] = {}
+
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, LoadedImage]" = OrderedDict()
+        self.fetched = 0
+        self.fetched_bytes = 0
+        self.cache_hits = 0
+        self.resized = 0
+        self.sent_bytes = 0
+
+    async def _aget_client(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        # Clients and semaphores belong to the event loop that created them. Each loop gets its own,
+        # and the clients of loops that have been closed since are closed here
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(loop)
+        if entry is None:
+            entry = self._clients[loop] = (
+                self._external_client or httpx.AsyncClient(
+                    timeout=self.timeout,
+                    follow_redirects=True,
+                    limits=httpx.Limits(
+                        max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency
+                    ),
+                ),
+                asyncio.Semaphore(self.max_concurrency),
+            )
+            await self._aclose_closed_loop_clients()
+        return entry
+
+    async def _aclose_closed_loop_clients(self) -> None:
+        for loop in [loop for loop in list(self._clients.keys()) if loop.is_closed()]:
+            client, _ = self._clients.pop(loop)
+            if client is self._external_client:
+                continue
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.debug(f"Closing the HTTP client of a closed event loop failed: {str(e)}")
+
+    async def _fetch(self, url: str) -> bytearray:
+        client, semaphore = await self._aget_client()
+        async with semaphore:
+            async with client.stream("GET", url) as response:
+                response.raise_for_status()
+                length = int(response.headers.get("Content-Length") or 0)
+                if length > self.max_image_bytes:
+                    raise ValueError(f"The image is larger than {self.max_image_bytes} bytes.")
+
+                # Slice assignment writes into the preallocated buffer, and grows it if the length was wrong
+                data = bytearray(length)
+                position = 0
+                async for chunk in response.aiter_bytes():
+                    data[position:position + len(chunk)] = chunk
+                    position += len(chunk)
+                    if position > self.max_image_bytes:
+                        raise ValueError(f"The image is larger than {self.max_image_bytes} bytes.")
+                del data[position:]
+        with self._lock:
+            self.fetched += 1
+            self.fetched_bytes += position
+        return data
+
+    async def _read(self, source: str) -> Union[bytes, bytearray]:
+        if source.startswith(("http://", "https://")):
+            return await self._fetch(source)
+        path = Path(source)
+        if path.stat().st_size > self.max_image_bytes:
+            raise ValueError(f"The image is larger than {self.max_image_bytes} bytes.")
+        return await asyncio.to_thread(path.read_bytes)
+
+    def _encode(self, source: str, data: Union[bytes, bytearray], content_hash: str) -> LoadedImage:
+        prepared, mime_type, size = prepare_image(data, self.detail, self.quality)
+        image = LoadedImage(
+            source=source,
+            data_url=encode_data_url(prepared, mime_type),
+            mime_type=mime_type,
+            content_hash=content_hash,
+            original_bytes=len(data),
+            encoded_bytes=len(prepared),
+            size=size,
+            detail=self.detail,
+        )
+        with self._lock:
+            if prepared is not data:
+                self.resized += 1
+        return image
+
+    async def aload(self, source: str) -> LoadedImage:
+        """
+        Load one image.
+
+        Args:
+            source (str): An http(s) URL or a file path.
+
+        Returns:
+            LoadedImage: The encoded image. Call to_message_part() for the message content part.
+        """
+        try:
+            data = await self._read(source)
+            content_hash = hashlib.sha256(data).hexdigest()
+            with self._lock:
+                cached = self._cache.get(content_hash)
+                if cached is not None:
+                    self._cache.move_to_end(content_hash)
+                encoding = self._encoding.get(content_hash)
+                if cached is not None or encoding is not None:
+                    self.cache_hits += 1
+            if cached is None:
+                # Images with the same contents that arrive together share one encoding
+                if encoding is None:
+                    encoding = asyncio.ensure_future(asyncio.to_thread(self._encode, source, data, content_hash))
+                    self._encoding[content_hash] = encoding
+                    try:
+                        cached = await encoding
+                    finally:
+                        del self._encoding[content_hash]
+                    with self._lock:
+                        self._cache[content_hash] = cached
+                        while len(self._cache) > self.max_cache_entries:
+                            self._cache.popitem(last=False)
+                else:
+                    cached = await asyncio.shield(encoding)
+        except Exception as e:
+            logger.error(f"Loading image {source} failed: {str(e)}")
+            raise RuntimeError(f"Error loading image {source}: {e}")
+
+        with self._lock:
+            self.sent_bytes += cached.encoded_bytes
+        if cached.source != source:
+            cached = replace(cached, source=source)
+        return cached
+
+    async def aload_many(
+        self, sources: Sequence[str], return_exceptions: bool = False
+    ) -> List[Union[LoadedImage, BaseException]]:
+        """
+        Load several images concurrently. A source listed more than once is loaded once.
+
+        Args:
+            sources (Sequence[str]): The http(s) URLs or file paths.
+            return_exceptions (bool, optional): Return the error in place of an image that failed
+                to load, instead of raising it, so one bad URL does not fail a large run.
+
+        Returns:
+            List[Union[LoadedImage, BaseException]]: The images, in the order of sources.
+        """
+        distinct = list(dict.fromkeys(sources))
+        results = await asyncio.gather(
+            *(self.aload(source) for source in distinct), return_exceptions=return_exceptions
+        )
+        by_source = dict(zip(distinct, results))
+        return [by_source[source] for source in sources]
+
+    async def aload_parts(self, sources: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Load several images concurrently into image_url message parts, in the order of sources.
+        """
+        return [image.to_message_part() for image in await self.aload_many(sources)]
+
+    def load_many(
+        self, sources: Sequence[str], return_exceptions: bool = False
+    ) -> List[Union[LoadedImage, BaseException]]:
+        """
+        Synchronous version of aload_many, for scripts and notebooks without an event loop.
+        """
+        async def load() -> List[Union[LoadedImage, BaseException]]:
+            try:
+                return await self.aload_many(sources, return_exceptions)
+            finally:
+                await self.aclose()
+
+        return asyncio.run(load())
+
+    async def aclose(self) -> None:
+        """
+        Close the loader's HTTP connections on the running event loop, if it opened any, and
+        those of event loops that have been closed.
+        """
+        entry = self._clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None and entry[0] is not self._external_client:
+            await entry[0].aclose()
+        await self._aclose_closed_loop_clients()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the loader counters.
+
+        Returns:
+            Dict[str, Any]: Images fetched and their bytes, cache hits, images downscaled, and the
+            bytes sent (before base64) for every image loaded.
+        """
+        with self._lock:
+            return {
+                "fetched": self.fetched,
+                "fetched_bytes": self.fetched_bytes,
+                "cache_hits": self.cache_hits,
+                "cached": len(self._cache),
+                "resized": self.resized,
+                "sent_bytes": self.sent_bytes,
+            }
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from embedding_index import EmbeddingIndex, top_k
+
+logger = logging.getLogger(__name__)
+
+# k-means needs about this many training vectors per list to place its centroids well
+MIN_TRAINING_VECTORS_PER_LIST = 39
+# With n_lists=None, the lists are retrained once the index is this many times its training size
+RETRAIN_GROWTH = 4
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def train_centroids(vectors: np.ndarray, n_lists: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """
+    Spherical k-means: cluster vectors by cosine similarity.
+
+    Args:
+        vectors (np.ndarray): The (n, dim) training vectors.
+        n_lists (int): The number of clusters.
+        iterations (int, optional): The number of k-means iterations.
+        seed (int, optional): The random seed for picking the initial centroids.
+
+    Returns:
+        np.ndarray: The (n_lists, dim) unit-length centroids.
+    """
+    vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+    if n_lists > len(vectors):
+        raise ValueError(f"Cannot train {n_lists} lists on {len(vectors)} vectors.")
+
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        counts = np.bincount(assignment, minlength=n_lists)
+        # Empty clusters are restarted on random vectors
+        empty = counts == 0
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class IVFIndex:
+    """
+    An approximate cosine-similarity index (IVF-flat) for large embedding corpora.
+
+    Vectors are clustered with spherical k-means into n_lists inverted lists. A query is only
+    compared with the vectors of the nprobe lists whose centroids are closest to it, so a
+    search touches about nprobe / n_lists of the corpus. Raising nprobe trades speed for recall;
+    nprobe = n_lists is an exact search. search and search_batch return the same results as
+    EmbeddingIndex, and each inverted list is an EmbeddingIndex.
+
+    Vectors added to an untrained index are buffered, and searched exactly, until there are
+    enough to train on: MIN_TRAINING_VECTORS_PER_LIST per list, or min_train_size. When n_lists
+    is None, the lists are retrained on all the vectors whenever the index reaches RETRAIN_GROWTH
+    times its training size, so their number keeps up with the corpus.
+    """
+
+    def __init__(
+        self, n_lists: Optional[int] = None, nprobe: int = 8, seed: int = 0, min_train_size: Optional[int] = None
+    ) -> None:
+        """
+        Initialize an empty, untrained index.
+
+        Args:
+            n_lists (Optional[int], optional): The number of inverted lists. When None it is set to
+                about sqrt(n) of the vectors the index is trained on.
+            nprobe (int, optional): The number of lists searched per query.
+            seed (int, optional): The random seed used by training.
+            min_train_size (Optional[int], optional): The number of vectors to buffer before training.
+                When None, MIN_TRAINING_VECTORS_PER_LIST times n_lists, or times about sqrt(n) when
+                n_lists is None.
+        """
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.seed = seed
+        self.min_train_size = min_train_size
+        self.centroids: Optional[np.ndarray] = None
+        self.ids: List[Any] = []
+        self._lists: List[EmbeddingIndex] = []
+        # The position in self.ids of each vector of each list, kept as arrays for fast lookups
+        self._positions: List[np.ndarray] = []
+        # Vectors added before training, by their position in self.ids
+        self._pending = EmbeddingIndex()
+        self._auto_lists = n_lists is None
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, vectors: Any, iterations: int = 10, max_training_vectors: int = 100000) -> None:
+        """
+        Learn the list centroids from a sample of the vectors. The vectors already in the index
+        are then assigned to the new lists.
+
+        Args:
+            vectors (Any): A 2D array, or a sequence of equally long vectors.
+            iterations (int, optional): The number of k-means iterations.
+            max_training_vectors (int, optional): Train on a random sample of at most this many vectors.
+        """
+        matrix = np.asarray(vectors if isinstance(vectors, np.ndarray) else list(vectors), dtype=np.float32)
+        training_size = len(matrix)
+        if len(matrix) > max_training_vectors:
+            rng = np.random.default_rng(self.seed)
+            matrix = matrix[rng.choice(len(matrix), max_training_vectors, replace=False)]
+        if self._auto_lists:
+            self.n_lists = max(1, int(np.sqrt(training_size)))
+        if not self._auto_lists and len(matrix) < MIN_TRAINING_VECTORS_PER_LIST * self.n_lists:
+            logger.warning(f"Training {self.n_lists} inverted lists on only {len(matrix)} vectors.")
+        stored = self._stored_vectors()
+        self.centroids = train_centroids(matrix, self.n_lists, iterations, self.seed)
+        self._lists = [EmbeddingIndex(dim=matrix.shape[1]) for _ in range(self.n_lists)]
+        self._positions = [np.empty(0, dtype=np.int64) for _ in range(self.n_lists)]
+        self._pending = EmbeddingIndex()
+        self._trained_size = training_size
+        logger.info(f"Trained {self.n_lists} inverted lists on {len(matrix)} vectors.")
+        if len(stored):
+            self._assign(stored, 0)
+
+    def _stored_vectors(self) -> np.ndarray:
+        # Every vector in the index, in the order of self.ids
+        if not self.is_trained:
+            return self._pending.vectors
+        matrix = np.empty((len(self.ids), self.centroids.shape[1]), dtype=np.float32)
+        for inverted_list, positions in zip(self._lists, self._positions):
+            if len(inverted_list):
+                matrix[positions] = inverted_list.vectors
+        return matrix
+
+    def _ready_to_train(self, count: int) -> bool:
+        if self.min_train_size is not None:
+            return count >= max(self.min_train_size, self.n_lists or 1)
+        if self._auto_lists:
+            # sqrt(count) lists of MIN_TRAINING_VECTORS_PER_LIST vectors each
+            return count >= MIN_TRAINING_VECTORS_PER_LIST ** 2
+        return count >= MIN_TRAINING_VECTORS_PER_LIST * self.n_lists
+
+    def _assign(self, matrix: np.ndarray, start: int) -> None:
+        # Append each vector, stored at positions start, start + 1... of self.ids, to its closest list
+        assignment = np.argmax(_normalize(matrix) @ self.centroids.T, axis=1)
+        for list_number in np.unique(assignment):
+            members = np.flatnonzero(assignment == list_number)
+            self._lists[list_number].add(matrix[members])
+            self._positions[list_number] = np.concatenate([self._positions[list_number], members + start])
+
+    def add(self, vectors: Any, ids: Optional[Sequence[Any]] = None) -> None:
+        """
+        Insert vectors, assigning each one to the list of its closest centroid.
+
+        An untrained index is trained on the vectors added so far once there are enough of
+        them; until then they are buffered.
+
+        Args:
+            vectors (Any): A 2D array, or a sequence of equally long vectors.
+            ids (Optional[Sequence[Any]], optional): An id for each vector, its position when None.
+        """
+        matrix = np.asarray(vectors if isinstance(vectors, np.ndarray) else list(vectors), dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[np.newaxis, :]
+        if ids is not None and len(ids) != len(matrix):
+            raise ValueError("The number of ids must match the number of vectors.")
+
+        start = len(self.ids)
+        if self.is_trained:
+            self._assign(matrix, start)
+        else:
+            self._pending.add(matrix, ids=range(start, start + len(matrix)))
+        self.ids.extend(ids if ids is not None else range(start, start + len(matrix)))
+        if not self.is_trained:
+            if self._ready_to_train(len(self._pending)):
+                self.train(self._pending.vectors)
+        elif self._auto_lists and len(self.ids) >= RETRAIN_GROWTH * self._trained_size:
+            self.train(self._stored_vectors())
+
+    def _probe(self, query: np.ndarray, k: int, nprobe: int) -> List[Tuple[Any, float]]:
+        lists = top_k(self.centroids @ query, nprobe)[0]
+        positions = []
+        scores = []
+        for list_number in lists:
+            inverted_list = self._lists[list_number]
+            if len(inverted_list):
+                scores.append(inverted_list.scores(query))
+                positions.append(self._positions[list_number])
+        if not scores:
+            return []
+        best_positions, best_scores = top_k(np.concatenate(scores), k)
+        all_positions = np.concatenate(positions)
+        return [(self.ids[all_positions[p]], float(s)) for p, s in zip(best_positions, best_scores)]
+
+    def search(self, query: Any, k: int = 5, nprobe: Optional[int] = None) -> List[Tuple[Any, float]]:
+        """
+        Find (approximately) the k stored vectors most similar to the query.
+
+        Args:
+            query (Any): The query vector, e.g. the output of embed_query.
+            k (int, optional): The number of results.
+            nprobe (Optional[int], optional): Lists to search, overriding self.nprobe.
+
+        Returns:
+            List[Tuple[Any, float]]: (id, cosine similarity) pairs, most similar first.
+        """
+        return self.search_batch([query], k, nprobe)[0]
+
+    def search_batch(self, queries: Any, k: int = 5, nprobe: Optional[int] = None) -> List[List[Tuple[Any, float]]]:
+        """
+        Search for several queries.
+
+        Args:
+            queries (Any): A 2D array, or a sequence of query vectors.
+            k (int, optional): The number of results per query.
+            nprobe (Optional[int], optional): Lists to search, overriding self.nprobe.
+
+        Returns:
+            List[List[Tuple[Any, float]]]: The results of each query, as returned by search.
+        """
+        matrix = _normalize(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        if not self.ids:
+            return [[] for _ in range(len(matrix))]
+        if not self.is_trained:
+            # Too few vectors to train on yet: search the buffered ones exactly
+            return [[(self.ids[position], score) for position, score in results]
+                    for results in self._pending.search_batch(matrix, k)]
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+        return [self._probe(query, k, nprobe) for query in matrix]
+
+    def save(self, path: str) -> None:
+        """
+        Write the trained index to a .npz file.
+
+        Args:
+            path (str): The file to write. Ids must be JSON-serializable.
+        """
+        if not self.is_trained:
+            raise ValueError("Cannot save an index that has not been trained.")
+        sizes = np.array([len(inverted_list) for inverted_list in self._lists], dtype=np.int64)
+        dim = self.centroids.shape[1]
+        vectors = [inverted_list.vectors for inverted_list in self._lists if len(inverted_list)]
+        positions = [list_positions for list_positions in self._positions if len(list_positions)]
+        np.savez(
+            path,
+            centroids=self.centroids,
+            sizes=sizes,
+            vectors=np.concatenate(vectors) if vectors else np.empty((0, dim), dtype=np.float32),
+            positions=np.concatenate(positions) if positions else np.empty(0, dtype=np.int64),
+            ids=np.array(json.dumps(list(self.ids))),
+            settings=np.array([self.nprobe, self.seed], dtype=np.int64),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        """
+        Read an index written by save.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            nprobe, seed = (int(value) for value in data["settings"])
+            index = cls(n_lists=len(data["centroids"]), nprobe=nprobe, seed=seed)
+            index.centroids = data["centroids"]
+            index.ids = json.loads(str(data["ids"]))
+            dim = index.centroids.shape[1]
+            vectors, positions = data["vectors"], data["positions"]
+            offset = 0
+            for size in data["sizes"]:
+                inverted_list = EmbeddingIndex(dim=dim)
+                if size:
+                    inverted_list.add(vectors[offset:offset + size])
+                index._lists.append(inverted_list)
+                index._positions.append(positions[offset:offset + size].copy())
+                offset += size
+        return index
@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from translation_memory import mask_placeholders
+
+# Training text for the character n-gram model, a few hundred words of everyday prose per language.
+# Short as it is, it covers the function words and letter sequences that tell these languages apart.
+LANGUAGE_SAMPLES = {
+    "en": (
+        "Thank you for your message. We have received your request and one of our team members will get back "
+        "to you as soon as possible. Please do not reply to this email, because this mailbox is not monitored. "
+        "If you have any questions about your order, you can find the answers in our help center. "
+        "The weather was nice yesterday, so we went for a walk in the park with the children and the dog. "
+        "She said that the meeting would be moved to next week, which is why nobody came to the office today. "
+        "It is important to read the instructions carefully before you install the software on your computer. "
+        "They would have been here earlier if the train had not been delayed by more than an hour. "
+        "What do you think about the new design? I believe that it looks much better than the old one. "
+        "Our company was founded in a small town and has grown into an international business with offices "
+        "in many countries. We are always looking for people who want to work with us."
+    ),
+    "fr": (
+        "Merci pour votre message. Nous avons bien reçu votre demande et un membre de notre équipe vous "
+        "répondra dès que possible. Veuillez ne pas répondre à ce courriel, car cette boîte aux lettres n'est "
+        "pas surveillée. Si vous avez des questions sur votre commande, vous trouverez les réponses dans notre "
+        "centre d'aide. Il faisait beau hier, alors nous sommes allés nous promener dans le parc avec les "
+        "enfants et le chien. Elle a dit que la réunion serait déplacée à la semaine prochaine, c'est pourquoi "
+        "personne n'est venu au bureau aujourd'hui. Il est important de lire attentivement les instructions "
+        "avant d'installer le logiciel sur votre ordinateur. Ils seraient arrivés plus tôt si le train n'avait "
+        "pas eu plus d'une heure de retard. Que pensez-vous du nouveau design ? Je crois qu'il est beaucoup "
+        "mieux que l'ancien. Notre entreprise a été fondée dans une petite ville et elle est devenue une "
+        "société internationale avec des bureaux dans de nombreux pays."
+    ),
+    "de": (
+        "Vielen Dank für Ihre Nachricht. Wir haben Ihre Anfrage erhalten und ein Mitglied unseres Teams wird "
+        "sich so schnell wie möglich bei Ihnen melden. Bitte antworten Sie nicht auf diese E-Mail, da dieses "
+        "Postfach nicht überwacht wird. Wenn Sie Fragen zu Ihrer Bestellung haben, finden Sie die Antworten in "
+        "unserem Hilfezentrum. Gestern war das Wetter schön, deshalb sind wir mit den Kindern und dem Hund im "
+        "Park spazieren gegangen. Sie sagte, dass die Besprechung auf nächste Woche verschoben wird, weshalb "
+        "heute niemand ins Büro gekommen ist. Es ist wichtig, die Anleitung sorgfältig zu lesen, bevor Sie die "
+        "Software auf Ihrem Computer installieren. Sie wären früher hier gewesen, wenn der Zug nicht mehr als "
+        "eine Stunde Verspätung gehabt hätte. Was halten Sie von dem neuen Design? Ich glaube, dass es viel "
+        "besser aussieht als das alte. Unser Unternehmen wurde in einer kleinen Stadt gegründet und ist zu "
+        "einem internationalen Betrieb mit Büros in vielen Ländern gewachsen."
+    ),
+    "es": (
+        "Gracias por su mensaje. Hemos recibido su solicitud y uno de los miembros de nuestro equipo se pondrá "
+        "en contacto con usted lo antes posible. Por favor, no responda a este correo, porque este buzón no se "
+        "revisa. Si tiene alguna pregunta sobre su pedido, puede encontrar las respuestas en nuestro centro de "
+        "ayuda. Ayer hacía buen tiempo, así que fuimos a dar un paseo por el parque con los niños y el perro. "
+        "Ella dijo que la reunión se trasladaría a la próxima semana, por eso nadie vino hoy a la oficina. "
+        "Es importante leer las instrucciones con atención antes de instalar el programa en su ordenador. "
+        "Habrían llegado antes si el tren no hubiera tenido más de una hora de retraso. ¿Qué piensa del nuevo "
+        "diseño? Creo que se ve mucho mejor que el anterior. Nuestra empresa fue fundada en un pueblo pequeño y "
+        "se ha convertido en una compañía internacional con oficinas en muchos países."
+    ),
+    "it": (
+        "Grazie per il tuo messaggio. Abbiamo ricevuto la tua richiesta e un membro del nostro team ti "
+        "risponderà il prima possibile. Per favore non rispondere a questa email, perché questa casella non è "
+        "controllata. Se hai domande sul tuo ordine, puoi trovare le risposte nel nostro centro assistenza. "
+        "Ieri il tempo era bello, quindi siamo andati a fare una passeggiata nel parco con i bambini e il cane. "
+        "Lei ha detto che la riunione sarebbe stata spostata alla prossima settimana, ed è per questo che oggi "
+        "nessuno è venuto in ufficio. È importante leggere attentamente le istruzioni prima di installare il "
+        "programma sul tuo computer. Sarebbero arrivati prima se il treno non avesse avuto più di un'ora di "
+        "ritardo. Che cosa ne pensi del nuovo design? Credo che sia molto più bello di quello vecchio. La nostra "
+        "azienda è stata fondata in una piccola città ed è diventata un'impresa internazionale con uffici in "
+        "molti paesi."
+    ),
+    "pt": (
+        "Obrigado pela sua mensagem. Recebemos o seu pedido e um membro da nossa equipe entrará em contato com "
+        "você o mais rápido possível. Por favor, não responda a este e-mail, porque esta caixa de correio não é "
+        "monitorada. Se tiver alguma dúvida sobre a sua encomenda, pode encontrar as respostas na nossa central "
+        "de ajuda. Ontem o tempo estava bom, então fomos passear no parque com as crianças e o cachorro. Ela "
+        "disse que a reunião seria adiada para a próxima semana, e é por isso que ninguém veio ao escritório "
+        "hoje. É importante ler as instruções com atenção antes de instalar o programa no seu computador. "
+        "Eles teriam chegado mais cedo se o trem não tivesse se atrasado mais de uma hora. O que você acha do "
+        "novo design? Eu acho que ficou muito melhor do que o antigo. A nossa empresa foi fundada numa pequena "
+        "cidade e tornou-se uma companhia internacional com escritórios em muitos países."
+    ),
+    "nl": (
+        "Bedankt voor je bericht. We hebben je aanvraag ontvangen en een van onze teamleden neemt zo snel "
+        "mogelijk contact met je op. Beantwoord deze e-mail alsjeblieft niet, want deze mailbox wordt niet "
+        "gelezen. Als je vragen hebt over je bestelling, vind je de antwoorden in ons helpcentrum. Gisteren was "
+        "het mooi weer, dus zijn we met de kinderen en de hond in het park gaan wandelen. Ze zei dat de "
+        "vergadering naar volgende week wordt verplaatst, en daarom is er vandaag niemand naar kantoor "
+        "gekomen. Het is belangrijk om de instructies zorgvuldig te lezen voordat je de software op je "
+        "computer installeert. Ze waren eerder hier geweest als de trein niet meer dan een uur vertraging had "
+        "gehad. Wat vind je van het nieuwe ontwerp? Ik denk dat het er veel beter uitziet dan het oude. Ons "
+        "bedrijf is in een kleine stad opgericht en is uitgegroeid tot een internationaal bedrijf met "
+        "kantoren in veel landen."
+    ),
+    "pl": (
+        "Dziękujemy za wiadomość. Otrzymaliśmy twoje zgłoszenie i jeden z członków naszego zespołu skontaktuje "
+        "się z tobą jak najszybciej. Prosimy nie odpowiadać na tę wiadomość, ponieważ ta skrzynka nie jest "
+        "sprawdzana. Jeśli masz pytania dotyczące zamówienia, odpowiedzi znajdziesz w naszym centrum pomocy. "
+        "Wczoraj była ładna pogoda, więc poszliśmy z dziećmi i psem na spacer do parku. Powiedziała, że "
+        "spotkanie zostanie przeniesione na przyszły tydzień, dlatego nikt nie przyszedł dzisiaj do biura. "
+        "Ważne jest, aby dokładnie przeczytać instrukcję przed zainstalowaniem programu na komputerze. Byliby "
+        "tu wcześniej, gdyby pociąg nie spóźnił się o ponad godzinę. Co myślisz o nowym projekcie? Uważam, że "
+        "wygląda znacznie lepiej niż poprzedni. Nasza firma została założona w małym mieście i stała się "
+        "międzynarodowym przedsiębiorstwem z biurami w wielu krajach."
+    ),
+}
+
+# Scripts that identify a language on their own, checked before the n-gram model
+_SCRIPT_LANGUAGES = (
+    ("ja", re.compile(r"[぀-ヿ]")),  # Hiragana and katakana
+    ("ko", re.compile(r"[가-힯]")),  # Hangul
+    ("el", re.compile(r"[Ͱ-Ͽ]")),
+    ("he", re.compile(r"[֐-׿]")),
+    ("th", re.compile(r"[฀-๿]")),
+    ("uk", re.compile(r"[іїєґІЇЄҐ]")),
+    ("ru", re.compile(r"[ыэъёЫЭЪЁ]")),
+)
+
+# Text in a language the model does not know still gets a closest language, so a guess is only
+# made when at least this share of the text's trigrams occur in that language's sample
+MIN_TRIGRAM_COVERAGE = 0.4
+
+_WORD = re.compile(r"[^\W\d_]+")
+# Statement keywords at the start of a line, and upper-case SQL
+_CODE_KEYWORD = re.compile(
+    r"^\s*(def|return|import|from \S+ import|function|const|let|var|class|elif|if|for|while|public|private|"
+    r"void|#include)\b|\b(SELECT|FROM|WHERE|INSERT INTO|UPDATE)\b",
+    re.MULTILINE,
+)
+_CODE_STRUCTURE = re.compile(r"[;{}]\s*$|\w\(.*\)|==|=>|->|::|\w+\.\w+\(|^\s*[#/]{1,2}\s|</?\w+>", re.MULTILINE)
+
+
+def _ngrams(text: str, max_n: int = 3) -> List[str]:
+    grams = []
+    for word in _WORD.findall(text.lower()):
+        padded = f" {word} "
+        for n in range(1, max_n + 1):
+            grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1) if padded[i:i + n] != " ")
+    return grams
+
+
+@lru_cache(maxsize=1)
+def _model() -> Tuple[Dict[str, Dict[str, float]], Dict[str, float]]:
+    """
+    Train the n-gram model on LANGUAGE_SAMPLES: add-one smoothed log probabilities per language.
+    """
+    counts = {language: Counter(_ngrams(sample)) for language, sample in LANGUAGE_SAMPLES.items()}
+    vocabulary = len(set().union(*counts.values()))
+    log_probs = {}
+    unseen = {}
+    for language, language_counts in counts.items():
+        total = sum(language_counts.values()) + vocabulary
+        log_probs[language] = {gram: math.log((count + 1) / total) for gram, count in language_counts.items()}
+        unseen[language] = math.log(1 / total)
+    return log_probs, unseen
+
+
+def detect_language(text: str) -> Tuple[Optional[str], float]:
+    """
+    Guess the language of a text locally.
+
+    Distinctive scripts (Japanese kana, Hangul, Greek, Hebrew, Thai, Ukrainian and Russian
+    Cyrillic) decide on their own. Latin-script text is scored with a character 1-3 gram model
+    of the languages in LANGUAGE_SAMPLES, and is unknown (None) when too few of its trigrams
+    occur in the sample of the best scoring language (see MIN_TRIGRAM_COVERAGE), as for Czech,
+    Finnish or Indonesian.
+
+    Args:
+        text (str): The text to classify.
+
+    Returns:
+        Tuple[Optional[str], float]: The language code, or None when it cannot be guessed, and a
+        confidence: the average log-likelihood margin per n-gram over the runner-up for the
+        n-gram model, or 1.0 for a script match.
+    """
+    for language, script in _SCRIPT_LANGUAGES:
+        if script.search(text):
+            return language, 1.0
+
+    letters = [c for c in text if c.isalpha()]
+    if not letters or any(not unicodedata.name(c, "").startswith("LATIN") for c in letters):
+        return None, 0.0
+
+    grams = _ngrams(text)
+    log_probs, unseen = _model()
+    scores = sorted(
+        ((sum(probs.get(gram, unseen[language]) for gram in grams), language) for language, probs in log_probs.items()),
+        reverse=True,
+    )
+    (best, language), (runner_up, _) = scores[0], scores[1]
+    trigrams = [gram for gram in grams if len(gram) == 3]
+    if trigrams and sum(gram in log_probs[language] for gram in trigrams) / len(trigrams) < MIN_TRIGRAM_COVERAGE:
+        return None, 0.0
+    return language, (best - runner_up) / len(grams)
+
+
+def is_untranslatable(text: str) -> bool:
+    """
+    Tell whether a text has nothing to translate: only numbers, URLs, e-mail addresses,
+    {variables} and punctuation, or something that looks like source code.
+    """
+    masked, _ = mask_placeholders(text)
+    words = _WORD.findall(masked)
+    if sum(len(word) for word in words) < 2:
+        return True
+
+    # Code: statement keywords together with code punctuation, which prose rarely combines
+    structure = len(_CODE_STRUCTURE.findall(text))
+    keywords = len(_CODE_KEYWORD.findall(text))
+    symbols = sum(1 for c in text if not c.isalnum() and not c.isspace())
+    return structure >= 1 and keywords >= 1 and symbols / max(1, len(text.strip())) > 0.08
+
+
+@dataclass
+class FilterDecision:
+    """
+    What the LanguageFilter decided for a text.
+    """
+
+    to_languages: List[str]  # The target languages still to translate into
+    from_language: Optional[str] = None  # The detected source language, when confident
+    reason: Optional[str] = None  # "untranslatable" or "same_language" when some targets were skipped
+
+
+class LanguageFilter:
+    """
+    A local pre-filter that saves Translator round trips.
+
+    Texts with nothing to translate, and target languages the text is already in, are skipped;
+    the text is returned unchanged for them. When the source language is detected with enough
+    confidence it is passed to the service as from_language, so the service does not have to
+    detect it again.
+
+    A wrong detection either returns a text untranslated or makes the service mistranslate it,
+    so the filter only acts on strong evidence; anything else goes to the service as is.
+    """
+
+    def __init__(self, min_confidence: float = 0.2, min_letters: int = 15) -> None:
+        """
+        Initialize the filter.
+
+        Args:
+            min_confidence (float, optional): The detect_language confidence needed to act on a detection.
+            min_letters (int, optional): Texts with fewer letters are never classified, as n-gram
+                guesses on a couple of words are unreliable.
+        """
+        self.min_confidence = min_confidence
+        self.min_letters = min_letters
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.skipped_untranslatable = 0
+        self.skipped_same_language = 0
+        self.detected = 0
+        self.saved_characters = 0
+        self._translated_requests = 0
+        self._translated_seconds = 0.0
+
+    def classify(self, text: str, to_languages: Sequence[str]) -> FilterDecision:
+        """
+        Decide which target languages a text needs and what its source language is.
+
+        Args:
+            text (str): The text to translate.
+            to_languages (Sequence[str]): The requested target languages.
+
+        Returns:
+            FilterDecision: The target languages left to translate (none when the text can be
+            returned as is) and the source language to pass on.
+        """
+        decision = FilterDecision(list(to_languages))
+        if is_untranslatable(text):
+            decision = FilterDecision([], reason="untranslatable")
+        elif sum(c.isalpha() for c in text) >= self.min_letters:
+            language, confidence = detect_language(text)
+            if language is not None and confidence >= self.min_confidence:
+                remaining = [target for target in to_languages if target.split("-")[0].lower() != language]
+                reason = "same_language" if len(remaining) < len(to_languages) else None
+                decision = FilterDecision(remaining, from_language=language if remaining else None, reason=reason)
+
+        skipped = len(to_languages) - len(decision.to_languages)
+        with self._lock:
+            self.checked += 1
+            self.saved_characters += len(text) * skipped
+            if decision.reason == "untranslatable":
+                self.skipped_untranslatable += 1
+            elif decision.reason == "same_language" and not decision.to_languages:
+                self.skipped_same_language += 1
+            if decision.from_language is not None:
+                self.detected += 1
+        return decision
+
+    def record_translation(self, seconds: float, texts: int = 1) -> None:
+        """
+        Record how long the translation of texts that were not skipped took, to estimate the time saved.
+
+        Args:
+            seconds (float): The time the translation took.
+            texts (int, optional): The number of texts translated in that time.
+        """
+        with self._lock:
+            self._translated_requests += texts
+            self._translated_seconds += seconds
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Report what the filter skipped.
+
+        Returns:
+            Dict[str, float]: Texts checked, skipped as untranslatable or already in the target
+            language, and with a detected source language; the skip rate; the characters not sent;
+            and the seconds saved, estimated from the average time of the translations that were made.
+        """
+        with self._lock:
+            skipped = self.skipped_untranslatable + self.skipped_same_language
+            average = self._translated_seconds / self._translated_requests if self._translated_requests else 0.0
+            return {
+                "checked": self.checked,
+                "skipped_untranslatable": self.skipped_untranslatable,
+                "skipped_same_language": self.skipped_same_language,
+                "detected": self.detected,
+                "skip_rate": skipped / self.checked if self.checked else 0.0,
+                "saved_characters": self.saved_characters,
+                "saved_seconds": skipped * average,
+            }
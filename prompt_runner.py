@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from langchain_community.callbacks.openai_info import OpenAICallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.prompts import BasePromptTemplate
+from langchain_core.runnables import Runnable, RunnableBinding, RunnableSequence
+
+from cached_embeddings import count_tokens
+from rate_limiter import TokenBudgetLimiter
+from translation_cache import TwoTierCache
+
+logger = logging.getLogger(__name__)
+
+# Tokens reserved for the response of a model without max_tokens
+DEFAULT_COMPLETION_TOKENS = 256
+# The chat format adds a few tokens around every message
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+
+class ResponseCache(TwoTierCache):
+    """
+    A thread-safe, two-tier cache of chat model responses.
+
+    Responses are kept as serialized messages in memory and on disk, and every lookup
+    returns a new message.
+    """
+
+    _table = "responses"
+    _column = "message TEXT"
+
+    def _encode(self, message: BaseMessage) -> str:
+        return json.dumps(message_to_dict(message), ensure_ascii=False)
+
+    def _decode(self, stored: str) -> AIMessage:
+        return messages_from_dict([json.loads(stored)])[0]
+
+
+def _split_chain(
+    chain: Runnable, model: Optional[BaseChatModel]
+) -> Tuple[BasePromptTemplate, BaseChatModel, Dict[str, Any], Optional[Runnable]]:
+    """
+    Take a chain apart into its prompt, its chat model (with any bound arguments) and the steps after it.
+    """
+    if isinstance(chain, BasePromptTemplate):
+        if model is None:
+            raise ValueError("A model is required when running a prompt template.")
+        return chain, model, {}, None
+
+    steps = chain.steps if isinstance(chain, RunnableSequence) else [chain]
+    if model is not None or len(steps) < 2 or not isinstance(steps[0], BasePromptTemplate):
+        raise ValueError("Expected a prompt template and a model, or a chain that starts with prompt | model.")
+
+    step, kwargs = steps[1], {}
+    while isinstance(step, RunnableBinding):
+        kwargs = {**step.kwargs, **kwargs}
+        step = step.bound
+    if not isinstance(step, BaseChatModel):
+        raise ValueError("The step after the prompt must be a chat model.")
+    rest = steps[2:]
+    output = None if not rest else rest[0] if len(rest) == 1 else RunnableSequence(*rest)
+    return steps[0], step, kwargs, output
+
+
+class PromptRunner:
+    """
+    Runs a chat prompt (or a prompt | model | parser chain) over many sets of variables.
+
+    Every prompt is rendered first. Prompts that render to the same messages are sent once,
+    and responses found in the cache, keyed on the rendered messages and the model's
+    parameters (deployment, temperature, max_tokens, bound stop words...), are not sent at
+    all. The remaining prompts run concurrently, at most max_concurrency at a time and within
+    the limiter's token budget. Token and cost totals are collected as get_openai_callback
+    does, both for the requests sent (totals) and for the requests the cache and
+    deduplication saved (saved).
+    """
+
+    def __init__(
+        self,
+        chain: Runnable,
+        model: Optional[BaseChatModel] = None,
+        *,
+        cache: Optional[ResponseCache] = None,
+        limiter: Optional[TokenBudgetLimiter] = None,
+        max_concurrency: int = 8,
+        completion_tokens: Optional[int] = None
+    ) -> None:
+        """
+        Initialize the runner.
+
+        Args:
+            chain (Runnable): A ChatPromptTemplate, or a chain that starts with prompt | model.
+            model (Optional[BaseChatModel], optional): The chat model, when chain is a prompt template.
+            cache (Optional[ResponseCache], optional): Where responses are looked up and stored.
+            limiter (Optional[TokenBudgetLimiter], optional): The token budget of the deployment.
+            max_concurrency (int, optional): The maximum number of requests in flight.
+            completion_tokens (Optional[int], optional): The response tokens reserved per request
+                with the limiter; the model's max_tokens, or DEFAULT_COMPLETION_TOKENS, by default.
+        """
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be a positive integer.")
+
+        self.prompt, self.model, self.model_kwargs, self.output = _split_chain(chain, model)
+        self.cache = cache
+        self.limiter = limiter
+        self.max_concurrency = max_concurrency
+        self.completion_tokens = (
+            completion_tokens or getattr(self.model, "max_tokens", None) or DEFAULT_COMPLETION_TOKENS
+        )
+        self._model_key = self.model._get_llm_string(**self.model_kwargs)
+        self.totals = OpenAICallbackHandler()
+        self.saved = OpenAICallbackHandler()
+        self.cache_hits = 0
+        self.deduplicated = 0
+
+    def render(self, variables: Mapping[str, Any]) -> List[BaseMessage]:
+        """
+        Render the prompt for one set of variables.
+        """
+        return self.prompt.invoke(dict(variables)).to_messages()
+
+    def cache_key(self, messages: Sequence[BaseMessage]) -> str:
+        """
+        Build the key of a rendered prompt: a hex SHA-256 digest of its messages and the model parameters.
+        """
+        payload = json.dumps([[message_to_dict(m) for m in messages], self._model_key], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _reserved_tokens(self, messages: Sequence[BaseMessage]) -> int:
+        prompt_tokens = sum(
+            count_tokens(m.content if isinstance(m.content, str) else json.dumps(m.content)) + _MESSAGE_OVERHEAD_TOKENS
+            for m in messages
+        )
+        return prompt_tokens + self.completion_tokens
+
+    def _record_saved(self, message: AIMessage, count: int) -> None:
+        # Count the usage of responses that did not have to be requested again
+        for _ in range(count):
+            self.saved.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]))
+
+    async def _request(self, messages: List[BaseMessage], semaphore: asyncio.Semaphore) -> AIMessage:
+        async with semaphore:
+            if self.limiter is not None:
+                await self.limiter.aacquire(self._reserved_tokens(messages))
+            return await self.model.ainvoke(messages, config={"callbacks": [self.totals]}, **self.model_kwargs)
+
+    async def arun(
+        self, inputs: Iterable[Mapping[str, Any]], return_exceptions: bool = False
+    ) -> List[Union[Any, BaseException]]:
+        """
+        Run the prompt over every set of variables.
+
+        The totals and saved counters start from zero on every run.
+
+        Args:
+            inputs (Iterable[Mapping[str, Any]]): The prompt variables, one dict per run.
+            return_exceptions (bool, optional): Return the error in place of the output of a
+                prompt that failed, instead of raising it once every request has finished.
+
+        Returns:
+            List[Union[Any, BaseException]]: The output of each prompt, in order: the model's
+            message, or whatever the steps after the model in the chain turn it into.
+        """
+        self.totals = OpenAICallbackHandler()
+        self.saved = OpenAICallbackHandler()
+        self.cache_hits = 0
+        self.deduplicated = 0
+
+        rendered: Dict[str, List[BaseMessage]] = {}
+        keys = []
+        for variables in inputs:
+            messages = self.render(variables)
+            key = self.cache_key(messages)
+            keys.append(key)
+            rendered.setdefault(key, messages)
+        uses = Counter(keys)
+
+        responses: Dict[str, Union[AIMessage, BaseException]] = {}
+        if self.cache is not None:
+            responses.update(self.cache.get_many(rendered))
+            for key, message in responses.items():
+                self.cache_hits += uses[key]
+                self._record_saved(message, uses[key])
+
+        missing = [key for key in rendered if key not in responses]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(
+            *(self._request(rendered[key], semaphore) for key in missing), return_exceptions=True
+        )
+        responses.update(zip(missing, results))
+        fresh = [(key, message) for key, message in zip(missing, results) if not isinstance(message, BaseException)]
+        for key, message in fresh:
+            self.deduplicated += uses[key] - 1
+            self._record_saved(message, uses[key] - 1)
+        if self.cache is not None and fresh:
+            self.cache.put_many(fresh)
+
+        outputs: List[Union[Any, BaseException]] = []
+        for i, key in enumerate(keys):
+            response = responses[key]
+            if not isinstance(response, BaseException) and self.output is not None:
+                try:
+                    response = await self.output.ainvoke(response)
+                except Exception as e:
+                    response = e
+            if isinstance(response, BaseException) and not return_exceptions:
+                logger.error(f"Prompt {i} failed: {str(response)}")
+                raise RuntimeError(f"Error running prompt {i}: {response}")
+            outputs.append(response)
+        return outputs
+
+    def run(
+        self, inputs: Iterable[Mapping[str, Any]], return_exceptions: bool = False
+    ) -> List[Union[Any, BaseException]]:
+        """
+        Synchronous version of arun, for scripts and notebooks without an event loop.
+        """
+        return asyncio.run(self.arun(inputs, return_exceptions))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the totals of the last run.
+
+        Returns:
+            Dict[str, Any]: The requests sent and their prompt, completion and total tokens and
+            cost in USD, as get_openai_callback reports them; the prompts served from the cache or
+            deduplicated; and the tokens and cost they saved.
+        """
+        return {
+            "requests": self.totals.successful_requests,
+            "prompt_tokens": self.totals.prompt_tokens,
+            "completion_tokens": self.totals.completion_tokens,
+            "total_tokens": self.totals.total_tokens,
+            "total_cost": self.totals.total_cost,
+            "cache_hits": self.cache_hits,
+            "deduplicated": self.deduplicated,
+            "saved_tokens": self.saved.total_tokens,
+            "saved_cost": self.saved.total_cost,
+        }
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+from typing import Any, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# Status codes the Translator service uses for throttling and temporary unavailability
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """
+    A token bucket that hands out reservations instead of blocking.
+
+    A reservation always succeeds: it takes the tokens, possibly leaving the bucket in debt,
+    and returns how long the caller has to wait before the tokens are really available.
+    Callers that reserve later queue up behind the debt, so waiting is fair.
+    Not thread-safe on its own; TranslatorRateLimiter guards it with a lock.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float): The maximum number of tokens the bucket holds (the burst size).
+        """
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive.")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate: float, now: Optional[float] = None) -> None:
+        """
+        Change the refill rate, keeping the tokens accumulated so far.
+        """
+        self._refill(time.monotonic() if now is None else now)
+        self.rate = rate
+
+    def reserve(self, amount: float, now: Optional[float] = None) -> float:
+        """
+        Take amount tokens.
+
+        Amounts above the capacity wait for a full bucket and leave the rest as debt,
+        which the following reservations wait for.
+
+        Args:
+            amount (float): The number of tokens to take.
+            now (Optional[float], optional): The current time.monotonic() value.
+
+        Returns:
+            float: Seconds to wait before the tokens are available, 0 when they are available now.
+        """
+        self._refill(time.monotonic() if now is None else now)
+        delay = max(0.0, min(amount, self.capacity) - self._tokens) / self.rate
+        self._tokens -= amount
+        return delay
+
+
+class TranslatorRateLimiter:
+    """
+    An adaptive rate limiter for the Translator service.
+
+    Requests are limited both in requests per second and in characters per minute, the two
+    quotas the service enforces. When the service throttles anyway, the limiter stops every
+    caller until the Retry-After delay has passed and halves its rates; each successful
+    request then raises the rates again by a small step until they are back at the ceiling.
+    The limiter is thread-safe and can be shared by sync and async callers.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: Optional[float] = None,
+        characters_per_minute: Optional[float] = None,
+        min_rate_fraction: float = 0.1,
+        decrease_factor: float = 0.5,
+        increase_step: float = 0.05
+    ) -> None:
+        """
+        Initialize the limiter at its ceiling.
+
+        Args:
+            requests_per_second (Optional[float], optional): The request quota, None for no limit.
+            characters_per_minute (Optional[float], optional): The character quota, None for no limit.
+            min_rate_fraction (float, optional): The lowest fraction of the quota the rates adapt down to.
+            decrease_factor (float, optional): The factor applied to the rates when throttled.
+            increase_step (float, optional): The fraction of the quota regained per successful request.
+        """
+        if not 0 < min_rate_fraction <= 1:
+            raise ValueError("min_rate_fraction must be in (0, 1].")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be in (0, 1).")
+
+        self.requests_per_second = requests_per_second
+        self.characters_per_minute = characters_per_minute
+        self.min_rate_fraction = min_rate_fraction
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.rate_fraction = 1.0
+        self.throttled_count = 0
+
+        self._lock = threading.Lock()
+        self._blocked_until = 0.0
+        self._requests = TokenBucket(requests_per_second, requests_per_second) if requests_per_second else None
+        # A minute's worth of characters would allow a burst far above the per-second rate the
+        # service smooths over, so the bucket holds one second's worth (at least one request)
+        self._characters = (
+            TokenBucket(characters_per_minute / 60.0, max(characters_per_minute / 60.0, 1.0))
+            if characters_per_minute else None
+        )
+
+    def reserve(self, characters: int) -> float:
+        """
+        Reserve capacity for one request.
+
+        Args:
+            characters (int): The characters the request is billed for.
+
+        Returns:
+            float: Seconds the caller has to wait before sending the request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._blocked_until - now)
+            if self._requests is not None:
+                delay = max(delay, self._requests.reserve(1, now))
+            if self._characters is not None:
+                delay = max(delay, self._characters.reserve(characters, now))
+            return delay
+
+    def acquire(self, characters: int) -> None:
+        """
+        Block until one request of the given size may be sent.
+        """
+        delay = self.reserve(characters)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self, characters: int) -> None:
+        """
+        Wait, without blocking the event loop, until one request of the given size may be sent.
+        """
+        delay = self.reserve(characters)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _apply_fraction(self, now: float) -> None:
+        # Caller holds the lock
+        if self._requests is not None:
+            self._requests.set_rate(self.requests_per_second * self.rate_fraction, now)
+        if self._characters is not None:
+            self._characters.set_rate(self.characters_per_minute / 60.0 * self.rate_fraction, now)
+
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        """
+        Record a throttling response: pause every caller and lower the rates.
+
+        Args:
+            retry_after (Optional[float], optional): The delay the service asked for, in seconds.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.throttled_count += 1
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+            self.rate_fraction = max(self.min_rate_fraction, self.rate_fraction * self.decrease_factor)
+            self._apply_fraction(now)
+        logger.warning(f"Translator throttled the request, rate lowered to {self.rate_fraction:.0%} of the quota.")
+
+    def on_success(self) -> None:
+        """
+        Record a successful request and move the rates back toward the quota.
+        """
+        with self._lock:
+            if self.rate_fraction < 1.0:
+                self.rate_fraction = min(1.0, self.rate_fraction + self.increase_step)
+                self._apply_fraction(time.monotonic())
+
+
+class TokenBudgetLimiter:
+    """
+    A rate limiter for the Azure OpenAI quota, in tokens and requests per minute.
+
+    Azure OpenAI counts a request against the tokens-per-minute quota when it arrives, as its
+    estimated prompt tokens plus its max_tokens, so that is what callers reserve. The service
+    enforces the quota over short windows, so each bucket holds ten seconds' worth (at least
+    one request). Thread-safe, for sync and async callers.
+    """
+
+    def __init__(self, tokens_per_minute: float, requests_per_minute: Optional[float] = None) -> None:
+        """
+        Initialize the limiter with full buckets.
+
+        Args:
+            tokens_per_minute (float): The token quota of the deployment.
+            requests_per_minute (Optional[float], optional): The request quota, None for no limit.
+        """
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self._lock = threading.Lock()
+        self._tokens = TokenBucket(tokens_per_minute / 60.0, max(tokens_per_minute / 6.0, 1.0))
+        self._requests = (
+            TokenBucket(requests_per_minute / 60.0, max(requests_per_minute / 6.0, 1.0))
+            if requests_per_minute else None
+        )
+
+    def reserve(self, tokens: int) -> float:
+        """
+        Reserve capacity for one request.
+
+        Args:
+            tokens (int): The prompt tokens plus the max_tokens of the request.
+
+        Returns:
+            float: Seconds the caller has to wait before sending the request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            delay = self._tokens.reserve(tokens, now)
+            if self._requests is not None:
+                delay = max(delay, self._requests.reserve(1, now))
+            return delay
+
+    def acquire(self, tokens: int) -> None:
+        """
+        Block until one request of the given size may be sent.
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self, tokens: int) -> None:
+        """
+        Wait, without blocking the event loop, until one request of the given size may be sent.
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def parse_retry_after(headers: Optional[Mapping[str, Any]]) -> Optional[float]:
+    """
+    Read the delay requested by the service from a response's headers.
+
+    Supports retry-after-ms, x-ms-retry-after-ms and Retry-After in seconds or as an HTTP date.
+
+    Args:
+        headers (Optional[Mapping[str, Any]]): The response headers.
+
+    Returns:
+        Optional[float]: The delay in seconds, or None when the response did not ask for one.
+    """
+    if not headers:
+        return None
+    lowered = {str(name).lower(): value for name, value in headers.items()}
+
+    for name in ("retry-after-ms", "x-ms-retry-after-ms"):
+        if name in lowered:
+            try:
+                return max(0.0, float(lowered[name]) / 1000.0)
+            except (TypeError, ValueError):
+                pass
+
+    value = lowered.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(str(value))
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def retry_delay(
+    attempt: int,
+    retry_after: Optional[float] = None,
+    backoff: float = 0.5,
+    backoff_max: float = 30.0
+) -> float:
+    """
+    How long to wait before retrying a failed request.
+
+    Uses exponential backoff with full jitter, so callers that were throttled together do not
+    retry together. When the service sent Retry-After, the wait is never shorter than that.
+
+    Args:
+        attempt (int): The number of the retry, starting at 0.
+        retry_after (Optional[float], optional): The delay the service asked for, in seconds.
+        backoff (float, optional): The base delay in seconds.
+        backoff_max (float, optional): The largest backoff delay in seconds.
+
+    Returns:
+        float: The delay in seconds.
+    """
+    delay = random.uniform(0, min(backoff_max, backoff * (2 ** attempt)))
+    if retry_after is not None:
+        # A little jitter on top of Retry-After spreads out callers released at the same time
+        delay = retry_after + random.uniform(0, backoff / 2)
+    return delay
@@ -0,0 +1,133 @@
+import io
+import random
+import unittest
+import wave
+
+import numpy as np
+from langchain_core.document_loaders import Blob
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from audio_transcriber import (
+    SAMPLE_RATE,
+    ChunkedTranscriber,
+    ChunkedWhisperParser,
+    TranscriptStitcher,
+    encode_wav,
+    load_audio,
+    plan_chunks,
+    stream_to_chat,
+)
+from fake_transcription import VOCABULARY, FakeTranscriptionServer, synthesize_speech
+
+
+def speech(words, **kwargs):
+    return (synthesize_speech(words, **kwargs) * 32767).astype(np.int16)
+
+
+class TestChunking(unittest.TestCase):
+
+    def test_stitcher_drops_the_overlap(self):
+        stitcher = TranscriptStitcher(max_overlap_words=5)
+        pieces = [
+            stitcher.add("One two three four five six seven eight."),
+            stitcher.add("six, Seven eight nine ten"),
+            stitcher.add("unrelated words"),
+        ]
+        pieces.append(stitcher.finish())
+        self.assertEqual(" ".join(piece for piece in pieces if piece),
+                         "One two three four five six seven eight. nine ten unrelated words")
+        self.assertEqual(pieces[0], "One two three")
+
+    def test_stitcher_ignores_phrases_repeated_away_from_the_boundary(self):
+        stitcher = TranscriptStitcher(max_overlap_words=20)
+        first = "We met in the park on Monday and talked for hours about the plans we had for the summer"
+        second = "for the summer holidays and later we walked back in the park again"
+        text = " ".join(piece for piece in (stitcher.add(first), stitcher.add(second), stitcher.finish()) if piece)
+        self.assertEqual(text, first + " holidays and later we walked back in the park again")
+
+        stitcher = TranscriptStitcher.for_overlap(1.0)
+        first, second = "I sat in the park all day reading a book", "then everyone ran in the park gates"
+        text = " ".join(piece for piece in (stitcher.add(first), stitcher.add(second), stitcher.finish()) if piece)
+        self.assertEqual(text, f"{first} {second}")
+        self.assertEqual(TranscriptStitcher.for_overlap(2.0).max_overlap_words, 10)
+
+    def test_chunks_end_in_pauses_and_overlap(self):
+        samples = speech(["alpha"] * 100, pauses={30: 1.0})  # About 51 seconds, with a pause at 15.5s
+        chunks = plan_chunks(samples, chunk_seconds=20, overlap_seconds=1, search_seconds=6)
+
+        self.assertTrue(chunks[0].at_silence)
+        self.assertTrue(15.5 < chunks[0].end < 16.5)
+        self.assertEqual(chunks[1].start, chunks[0].end - 1)
+        self.assertFalse(chunks[1].at_silence)
+        self.assertEqual(chunks[1].end, chunks[1].start + 20)
+        self.assertEqual(chunks[-1].end, len(samples) / SAMPLE_RATE)
+
+    def test_load_audio_converts_to_16k_mono(self):
+        rate = 44100
+        t = np.arange(rate * 2) / rate
+        tone = (0.5 * np.sin(2 * np.pi * 440 * t) * 32767).astype("<i2")
+        stereo = np.stack([tone, tone], axis=1)
+
+        output = io.BytesIO()
+        with wave.open(output, "wb") as f:
+            f.setnchannels(2)
+            f.setsampwidth(2)
+            f.setframerate(rate)
+            f.writeframes(stereo.tobytes())
+
+        samples = load_audio(output.getvalue())
+        self.assertLessEqual(abs(len(samples) - 2 * SAMPLE_RATE), 1)
+        self.assertAlmostEqual(np.abs(samples).max() / 32767, 0.5, places=2)
+
+
+class TestChunkedTranscriber(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeTranscriptionServer(latency=0.05).start()
+        rng = random.Random(0)
+        cls.words = [rng.choice(VOCABULARY) for _ in range(200)]
+        cls.audio = encode_wav(speech(cls.words, pauses={40: 1.0, 140: 1.0}))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.reset()
+        self.transcriber = ChunkedTranscriber(
+            api_key="test-key", base_url=self.server.base_url, chunk_seconds=22, overlap_seconds=2,
+            search_seconds=5, max_workers=3
+        )
+
+    def test_transcribes_in_parallel_and_stitches(self):
+        pieces = list(self.transcriber.iter_transcript(self.audio))
+
+        self.assertEqual(" ".join(pieces).split(), self.words)
+        self.assertGreater(len(pieces), 1)
+        self.assertEqual(len(self.server.requests), 6)
+        self.assertEqual(self.server.max_in_flight, 3)
+        self.assertTrue(all(request["seconds"] <= 24 for request in self.server.requests))
+
+    def test_parser_and_chat(self):
+        parser = ChunkedWhisperParser(
+            "test-key", base_url=self.server.base_url, chunk_seconds=22, overlap_seconds=2, search_seconds=5
+        )
+        documents = list(parser.lazy_parse(Blob.from_data(self.audio)))
+        self.assertEqual(" ".join(document.page_content for document in documents).split(), self.words)
+        self.assertEqual(documents[1].metadata["chunk"], 1)
+
+        model = FakeListChatModel(responses=["first", "second"])
+        replies = list(stream_to_chat(model, (document.page_content for document in documents[:2]), "Summarize."))
+        self.assertEqual([reply.content for _, reply in replies], ["first", "second"])
+
+    def test_errors_name_the_chunk(self):
+        self.transcriber.client = self.transcriber.client.with_options(
+            base_url=self.server.base_url + "/missing", max_retries=0
+        )
+        with self.assertRaisesRegex(RuntimeError, "chunk 0"):
+            self.transcriber.transcribe(self.audio)
+
+
+if __name__ == "__main__":
+    unittest.main()
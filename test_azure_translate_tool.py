@@ -1,8 +1,13 @@
 import os
 import unittest
-from azure_translate_tool import AzureTranslateTool
+from translate_tool import AzureTranslateTool
 
 
+# These tests call the live service; test_translate_batch.py covers the tool against a local fake
+@unittest.skipUnless(
+    os.getenv("AZURE_OPENAI_TRANSLATE_API_KEY") and os.getenv("AZURE_OPENAI_TRANSLATE_ENDPOINT"),
+    "AZURE_OPENAI_TRANSLATE_API_KEY and AZURE_OPENAI_TRANSLATE_ENDPOINT are not set",
+)
 class TestAzureTranslateTool(unittest.TestCase):
 
     def setUp(self):
@@ -0,0 +1,105 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+from bulk_translate import translate_file
+from fake_translator import FakeTranslatorServer, fake_translation
+
+
+class TestBulkTranslate(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeTranslatorServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.reset()
+        self.directory = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.directory.name, "rows.jsonl")
+        self.output_path = os.path.join(self.directory.name, "out.jsonl")
+        with open(self.input_path, "w", encoding="utf-8") as f:
+            for i in range(1000):
+                f.write(json.dumps({"id": i, "text": f"Row number {i}."}) + "\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def translate(self, **kwargs):
+        options = dict(translate_key="test-key", translate_endpoint=self.server.endpoint, chunk_rows=100)
+        options.update(kwargs)
+        return translate_file(self.input_path, self.output_path, "de", **options)
+
+    def read_output(self):
+        with open(self.output_path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def assert_complete_output(self):
+        rows = self.read_output()
+        self.assertEqual([row["id"] for row in rows], list(range(1000)))
+        self.assertTrue(all(row["text_de"] == fake_translation(row["text"], "de") for row in rows))
+
+    def test_translates_in_worker_processes(self):
+        reports = []
+        result = self.translate(workers=2, progress=reports.append, progress_interval=0)
+
+        self.assert_complete_output()
+        self.assertEqual(result.rows, 1000)
+        self.assertEqual(result.characters, sum(len(f"Row number {i}.") for i in range(1000)))
+        self.assertGreater(result.rows_per_second, 0)
+        self.assertTrue(reports)
+        with open(self.output_path + ".checkpoint", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["rows"], 1000)
+
+    def test_resumes_after_a_crash(self):
+        self.translate(workers=0)
+        # Roll the job back to a crash after 300 rows, halfway through writing the next chunk
+        with open(self.output_path, "rb") as f:
+            lines = f.readlines()
+        output_bytes = sum(len(line) for line in lines[:300])
+        with open(self.output_path, "wb") as f:
+            f.write(b"".join(lines[:350]) + lines[350][:10])
+        with open(self.output_path + ".checkpoint", "w", encoding="utf-8") as f:
+            json.dump({"input": os.path.abspath(self.input_path), "output": os.path.abspath(self.output_path),
+                       "rows": 300, "output_bytes": output_bytes}, f)
+        self.server.reset()
+
+        result = self.translate(workers=0)
+
+        self.assert_complete_output()
+        self.assertEqual((result.rows, result.skipped_rows), (700, 300))
+        sent = [item["Text"] for request in self.server.requests for item in request["body"]]
+        self.assertEqual(sent[0], "Row number 300.")
+        self.assertEqual(len(sent), 700)
+
+    def test_failed_run_can_be_restarted(self):
+        self.server.inject_errors(400, count=1)
+        with self.assertRaises(RuntimeError):
+            self.translate(workers=0)
+
+        self.translate(workers=0)
+        self.assert_complete_output()
+
+    def test_csv_input_and_output(self):
+        self.input_path = os.path.join(self.directory.name, "rows.csv")
+        self.output_path = os.path.join(self.directory.name, "out.csv")
+        with open(self.input_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "body"])
+            writer.writerows([[i, f"Line, {i}"] for i in range(50)])
+
+        self.translate(workers=0, text_field="body", output_field="body_de", chunk_rows=7)
+
+        with open(self.output_path, encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 50)
+        self.assertEqual(rows[49], {"id": "49", "body": "Line, 49", "body_de": fake_translation("Line, 49", "de")})
+
+
+if __name__ == '__main__':
+    unittest.main()
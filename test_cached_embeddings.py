@@ -0,0 +1,100 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from cached_embeddings import CachedEmbeddings, EmbeddingCache
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic embeddings that record every batch they are asked for."""
+
+    model = "fake-embedding"
+
+    def __init__(self):
+        self.batches: List[List[str]] = []
+
+    def embed_documents(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(text)), float(sum(map(ord, text)) % 97)] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class TestCachedEmbeddings(unittest.TestCase):
+
+    def setUp(self):
+        self.model = FakeEmbeddings()
+        self.embedder = CachedEmbeddings(self.model)
+        self.texts = ["The sun sets.", "Space exploration.", "The sun sets.", "Flour and salt."]
+
+    def test_deduplicates_and_keeps_order(self):
+        result = self.embedder.embed_documents(self.texts)
+
+        self.assertEqual(result, FakeEmbeddings().embed_documents(self.texts))
+        self.assertEqual(self.model.batches, [["The sun sets.", "Space exploration.", "Flour and salt."]])
+        self.assertEqual(self.embedder.stats()["deduplicated"], 1)
+
+    def test_query_after_documents_is_free(self):
+        self.embedder.embed_documents(self.texts)
+        for text in self.texts:
+            self.embedder.embed_query(text)
+
+        stats = self.embedder.stats()
+        self.assertEqual(len(self.model.batches), 1)
+        self.assertEqual(stats["hits"], 4)
+        self.assertEqual(stats["misses"], 3)
+        self.assertGreater(stats["saved_tokens"], 0)
+
+    def test_batches_respect_limits(self):
+        embedder = CachedEmbeddings(self.model, batch_size=2, max_batch_tokens=10 ** 6)
+        embedder.embed_documents([f"text {i}" for i in range(5)])
+        self.assertEqual([len(batch) for batch in self.model.batches], [2, 2, 1])
+
+    def test_persistent_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "embeddings.sqlite")
+            first = CachedEmbeddings(self.model, cache=EmbeddingCache(path=path))
+            expected = first.embed_documents(self.texts)
+            first.cache.close()
+
+            second = CachedEmbeddings(self.model, cache=EmbeddingCache(path=path))
+            self.assertEqual(second.embed_documents(self.texts), expected)
+            self.assertEqual(len(self.model.batches), 1)
+            second.cache.close()
+
+    def test_cache_tiers_return_the_same_copies(self):
+        vector = [0.1, 1 / 3]
+        with tempfile.TemporaryDirectory() as directory:
+            cache = EmbeddingCache(max_entries=1, path=os.path.join(directory, "embeddings.sqlite"))
+            cache.put_many([("a", vector), ("b", vector)])
+            from_memory, from_disk = cache.get("b"), cache.get("a")
+            cache.close()
+
+        self.assertEqual(from_memory, from_disk)
+        self.assertAlmostEqual(from_memory[1], 1 / 3, places=6)
+        from_memory.append(0.0)
+        self.assertEqual(cache.get("a"), from_disk)
+
+    def test_results_are_copies(self):
+        first = self.embedder.embed_documents(self.texts)
+        first[0][0] = -1.0
+        second = self.embedder.embed_documents(self.texts)
+
+        self.assertEqual(second, FakeEmbeddings().embed_documents(self.texts))
+        self.assertEqual(first[2], second[2])
+        self.assertEqual(second, self.embedder.embed_documents(self.texts))
+
+    def test_async(self):
+        result = asyncio.run(self.embedder.aembed_documents(self.texts))
+        self.assertEqual(result, FakeEmbeddings().embed_documents(self.texts))
+        self.assertEqual(asyncio.run(self.embedder.aembed_query("The sun sets.")), result[0])
+        self.assertEqual(len(self.model.batches), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from embedding_index import EmbeddingIndex, top_k
+
+
+def cosine_similarity(text, query):
+    return np.dot(text, query) / (np.linalg.norm(text) * np.linalg.norm(query))
+
+
+class TestEmbeddingIndex(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.vectors = rng.normal(size=(500, 32))
+        self.queries = rng.normal(size=(7, 32))
+
+    def expected(self, query, k):
+        scores = np.array([cosine_similarity(v, query) for v in self.vectors])
+        return list(np.argsort(-scores)[:k]), sorted(scores, reverse=True)[:k]
+
+    def test_search_matches_brute_force(self):
+        index = EmbeddingIndex.from_vectors(self.vectors)
+        positions, scores = self.expected(self.queries[0], 10)
+
+        result = index.search(self.queries[0], k=10)
+
+        self.assertEqual([i for i, _ in result], positions)
+        np.testing.assert_allclose([s for _, s in result], scores, rtol=1e-5)
+
+    def test_search_batch_matches_search(self):
+        index = EmbeddingIndex.from_vectors(self.vectors)
+        batch = index.search_batch(self.queries, k=5)
+        single = [index.search(q, k=5) for q in self.queries]
+
+        self.assertEqual([[i for i, _ in r] for r in batch], [[i for i, _ in r] for r in single])
+        np.testing.assert_allclose([[s for _, s in r] for r in batch], [[s for _, s in r] for r in single], rtol=1e-5)
+
+    def test_incremental_add_with_ids_from_dataframe(self):
+        df = pd.DataFrame({"text": [f"t{i}" for i in range(500)], "Embeddings": list(self.vectors.tolist())})
+        index = EmbeddingIndex()
+        index.add(df["Embeddings"][:200], ids=list(df["text"][:200]))
+        index.add(df["Embeddings"][200:], ids=list(df["text"][200:]))
+
+        positions, _ = self.expected(self.queries[1], 3)
+        self.assertEqual(len(index), 500)
+        self.assertEqual([i for i, _ in index.search(self.queries[1], k=3)], [f"t{p}" for p in positions])
+
+    def test_k_larger_than_index_and_zero_vectors(self):
+        index = EmbeddingIndex.from_vectors([[1.0, 0.0], [0.0, 0.0], [1.0, 1.0]])
+        result = index.search([1.0, 0.0], k=10)
+        self.assertEqual([i for i, _ in result], [0, 2, 1])
+        self.assertEqual(result[2][1], 0.0)
+
+    def test_empty_index(self):
+        for index in (EmbeddingIndex(), EmbeddingIndex(dim=4)):
+            self.assertEqual(index.search(self.queries[0]), [])
+            self.assertEqual(index.search_batch(self.queries[:3]), [[], [], []])
+
+    def test_dimension_mismatch(self):
+        index = EmbeddingIndex.from_vectors(self.vectors)
+        with self.assertRaises(ValueError):
+            index.add(np.ones((1, 8)))
+        with self.assertRaises(ValueError):
+            index.search(np.ones(8))
+
+    def test_top_k(self):
+        positions, scores = top_k(np.array([0.1, 0.9, 0.5, 0.7]), 2)
+        self.assertEqual(list(positions), [1, 3])
+        self.assertEqual(list(scores), [0.9, 0.7])
+
+
+if __name__ == '__main__':
+    unittest.main()
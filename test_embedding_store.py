@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import embedding_store
+from embedding_index import EmbeddingIndex
+from embedding_store import EmbeddingStore
+
+
+class TestEmbeddingStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "store")
+        rng = np.random.default_rng(0)
+        self.vectors = rng.normal(size=(300, 16)).astype(np.float32)
+        self.texts = [f"chunk {i}" for i in range(300)]
+        self.query = rng.normal(size=16)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_search_matches_in_memory_index_across_chunks(self):
+        original_chunk = embedding_store.SEARCH_CHUNK_ROWS
+        embedding_store.SEARCH_CHUNK_ROWS = 64
+        try:
+            store = EmbeddingStore(self.path)
+            store.append(self.vectors[:100], texts=self.texts[:100])
+            store.append(self.vectors[100:], texts=self.texts[100:])
+
+            expected = EmbeddingIndex.from_vectors(self.vectors).search(self.query, k=8)
+            result = store.search(self.query, k=8)
+        finally:
+            embedding_store.SEARCH_CHUNK_ROWS = original_chunk
+
+        self.assertEqual([i for i, _ in result], [i for i, _ in expected])
+        np.testing.assert_allclose([s for _, s in result], [s for _, s in expected], rtol=1e-5)
+
+    def test_reopen_is_persistent_and_memory_mapped(self):
+        EmbeddingStore(self.path).append(self.vectors, ids=[f"doc-{i}" for i in range(300)], texts=self.texts)
+
+        store = EmbeddingStore(self.path)
+        self.assertEqual(len(store), 300)
+        self.assertIsInstance(store.vectors(), np.memmap)
+        np.testing.assert_array_equal(store.vectors()[5], self.vectors[5])
+        self.assertEqual(store.get_text("doc-42"), "chunk 42")
+
+    def test_float16_storage(self):
+        store = EmbeddingStore(self.path, dtype="float16")
+        store.append(self.vectors)
+        self.assertEqual(os.path.getsize(os.path.join(self.path, "vectors.bin")), 300 * 16 * 2)
+        self.assertEqual(store.search(self.vectors[7], k=1)[0][0], 7)
+
+    def test_delete_replace_and_compact(self):
+        store = EmbeddingStore(self.path)
+        store.append(self.vectors[:3], ids=["a", "b", "c"], texts=["A", "B", "C"])
+        store.append(self.vectors[3:4], ids=["b"], texts=["B2"])
+        store.delete(["c"])
+
+        self.assertEqual(len(store), 2)
+        self.assertEqual([i for i, _ in store.search(self.vectors[2], k=5)].count("c"), 0)
+
+        store.compact()
+        reopened = EmbeddingStore(self.path)
+        self.assertEqual(reopened.ids, ["a", "b"])
+        self.assertEqual(reopened.get_text("b"), "B2")
+        np.testing.assert_array_equal(reopened.vectors()[1], self.vectors[3])
+
+    def test_default_ids_are_not_reused_after_compact(self):
+        store = EmbeddingStore(self.path)
+        store.append(self.vectors[:3], texts=["a", "b", "c"])
+        store.delete([0])
+        store.compact()
+        store.append(self.vectors[3:4], texts=["d"])
+
+        self.assertEqual(store.ids, [1, 2, 3])
+        self.assertEqual(store.get_text(2), "c")
+
+        store.delete([3])
+        store.compact()
+        reopened = EmbeddingStore(self.path)
+        reopened.append(self.vectors[4:5], texts=["e"])
+        self.assertEqual(reopened.ids, [1, 2, 4])
+
+    def test_partial_write_is_dropped_on_open(self):
+        store = EmbeddingStore(self.path)
+        store.append(self.vectors[:10], texts=self.texts[:10])
+        # Simulate a crash after the vectors of the next append were written
+        with open(os.path.join(self.path, "vectors.bin"), "ab") as f:
+            f.write(self.vectors[10:12].tobytes())
+
+        reopened = EmbeddingStore(self.path)
+        self.assertEqual(len(reopened), 10)
+        reopened.append(self.vectors[10:11], texts=["chunk 10"])
+        self.assertEqual(reopened.search(self.vectors[10], k=1)[0][0], 10)
+
+    def test_dimension_mismatch(self):
+        EmbeddingStore(self.path).append(self.vectors)
+        with self.assertRaises(ValueError):
+            EmbeddingStore(self.path, dim=8)
+
+
+if __name__ == '__main__':
+    unittest.main()
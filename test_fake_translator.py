@@ -0,0 +1,58 @@
+import time
+import unittest
+
+import requests
+
+from benchmark_translate import compare, run_suite
+from fake_translator import FakeTranslatorServer, fake_translation
+from translate_tool import AzureTranslateTool
+
+
+class TestFakeTranslatorServer(unittest.TestCase):
+
+    def test_speaks_translate_v3(self):
+        with FakeTranslatorServer() as server:
+            response = requests.post(
+                f"{server.endpoint}/translate?api-version=3.0&to=fr&to=de", json=[{"Text": "Hello"}]
+            )
+            missing = requests.post(f"{server.endpoint}/detect?api-version=3.0", json=[{"Text": "Hello"}])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["translations"], [
+            {"text": fake_translation("Hello", "fr"), "to": "fr"},
+            {"text": fake_translation("Hello", "de"), "to": "de"},
+        ])
+        self.assertEqual(response.json()[0]["detectedLanguage"]["language"], "en")
+        self.assertEqual(missing.status_code, 404)
+
+    def test_random_errors(self):
+        with FakeTranslatorServer(error_rate=1.0, error_status=503) as server:
+            tool = AzureTranslateTool(
+                translate_key="test-key", translate_endpoint=server.endpoint, max_retries=2, retry_backoff=0.01
+            )
+            with self.assertRaises(RuntimeError):
+                tool._translate_text("Hello", "fr")
+            self.assertEqual(server.request_count, 3)
+
+    def test_latency_per_character(self):
+        with FakeTranslatorServer(latency_per_character=0.001) as server:
+            tool = AzureTranslateTool(translate_key="test-key", translate_endpoint=server.endpoint)
+            start = time.perf_counter()
+            tool._translate_text("x" * 100, "fr")
+            self.assertGreaterEqual(time.perf_counter() - start, 0.1)
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def test_suite_results_can_be_compared(self):
+        suite = run_suite(["latency", "memory"])
+
+        self.assertEqual(set(suite["results"]), {"latency", "memory"})
+        self.assertGreater(suite["results"]["latency"]["p50_ms"], 0)
+        rows = {row["metric"]: row for row in compare(suite, suite)}
+        self.assertEqual(rows["latency.p99_ms"]["change"], 0)
+        self.assertIn("memory.peak_bytes_per_request", rows)
+
+
+if __name__ == '__main__':
+    unittest.main()
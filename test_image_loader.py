@@ -0,0 +1,188 @@
+import asyncio
+import base64
+import io
+import os
+import struct
+import tempfile
+import threading
+import time
+import unittest
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from image_loader import Image, ImageLoader, encode_data_url, fit_image_size, image_tokens, sniff_image
+
+
+def make_png(width, height, seed=0):
+    """
+    A small valid RGB PNG, built without Pillow.
+    """
+    def chunk(kind, payload):
+        return struct.pack(">I", len(payload)) + kind + payload + struct.pack(">I", zlib.crc32(kind + payload))
+
+    rows = b"".join(b"\x00" + bytes((x * 7 + y * 3 + seed) % 256 for x in range(width * 3)) for y in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.requests += 1
+        time.sleep(0.02)
+        with server.lock:
+            server.in_flight -= 1
+
+        data = server.images.get(self.path)
+        if data is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestImageHelpers(unittest.TestCase):
+
+    def test_sniff_and_sizes(self):
+        self.assertEqual(sniff_image(make_png(5, 3)), ("image/png", (5, 3)))
+        self.assertEqual(sniff_image(b"GIF89a\x10\x00\x08\x00"), ("image/gif", (16, 8)))
+        self.assertEqual(sniff_image(b"not an image"), (None, None))
+
+        self.assertEqual(fit_image_size(4096, 2048), (1536, 768))
+        self.assertEqual(fit_image_size(300, 200), (300, 200))
+        self.assertEqual(fit_image_size(2048, 1024, "low"), (512, 256))
+        self.assertEqual(image_tokens(2048, 4096), 1105)
+        self.assertEqual(image_tokens(2048, 4096, "low"), 85)
+
+    def test_data_url_matches_base64(self):
+        for size in (0, 1, 2, 3, 100000, 3 * 16384 + 1):
+            data = os.urandom(size)
+            self.assertEqual(
+                encode_data_url(data, "image/png"), "data:image/png;base64," + base64.b64encode(data).decode("ascii")
+            )
+
+
+class TestImageLoader(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+        cls.server.daemon_threads = True
+        cls.server.lock = threading.Lock()
+        cls.server.images = {f"/{i}.png": make_png(8, 8, seed=i) for i in range(10)}
+        cls.server.images["/copy.png"] = cls.server.images["/0.png"]
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.in_flight = self.server.max_in_flight = self.server.requests = 0
+
+    def test_loads_concurrently_in_order(self):
+        loader = ImageLoader(max_concurrency=4)
+        urls = [f"{self.base}/{i}.png" for i in range(10)]
+        images = loader.load_many(urls)
+
+        self.assertEqual([image.source for image in images], urls)
+        for i, image in enumerate(images):
+            self.assertEqual(base64.b64decode(image.data_url.split(",", 1)[1]), self.server.images[f"/{i}.png"])
+        self.assertLessEqual(self.server.max_in_flight, 4)
+        self.assertGreater(self.server.max_in_flight, 1)
+        self.assertEqual(images[0].tokens, 255)
+        self.assertEqual(
+            images[0].to_message_part(), {"type": "image_url", "image_url": {"url": images[0].data_url, "detail": "auto"}}
+        )
+
+    def test_same_content_is_encoded_once(self):
+        loader = ImageLoader()
+        first, copy, repeat = loader.load_many([f"{self.base}/0.png", f"{self.base}/copy.png", f"{self.base}/0.png"])
+
+        self.assertEqual(first.data_url, copy.data_url)
+        self.assertEqual(copy.source, f"{self.base}/copy.png")
+        self.assertIs(first, repeat)
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(loader.stats()["cache_hits"], 1)
+
+    def test_client_of_closed_loop_is_closed(self):
+        loader = ImageLoader()
+
+        async def load():
+            await loader.aload_many([f"{self.base}/0.png"])
+            client, _ = await loader._aget_client()
+            return asyncio.get_running_loop(), client
+
+        loop, first = asyncio.run(load())
+        self.assertFalse(first.is_closed)
+
+        image = loader.load_many([f"{self.base}/1.png"])[0]
+        self.assertEqual(image.source, f"{self.base}/1.png")
+        self.assertTrue(first.is_closed)
+        self.assertNotIn(loop, loader._clients)
+
+    def test_errors(self):
+        loader = ImageLoader()
+        results = loader.load_many([f"{self.base}/missing.png", f"{self.base}/1.png"], return_exceptions=True)
+        self.assertIsInstance(results[0], RuntimeError)
+        self.assertEqual(results[1].mime_type, "image/png")
+
+        with self.assertRaises(RuntimeError):
+            ImageLoader(max_image_bytes=10).load_many([f"{self.base}/1.png"])
+
+    def test_local_file_and_parts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "image.png")
+            with open(path, "wb") as f:
+                f.write(make_png(4, 4))
+            parts = asyncio.run(ImageLoader(detail="low").aload_parts([path]))
+        self.assertEqual(parts[0]["image_url"]["detail"], "low")
+        self.assertTrue(parts[0]["image_url"]["url"].startswith("data:image/png;base64,"))
+
+    @unittest.skipUnless(Image, "Pillow is not installed")
+    def test_large_images_are_downscaled(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "large.png")
+            Image.new("RGB", (3000, 1500), (200, 100, 50)).save(path)
+            loader = ImageLoader()
+            image = loader.load_many([path])[0]
+        self.assertEqual((image.mime_type, image.size), ("image/jpeg", (1536, 768)))
+        self.assertEqual(loader.stats()["resized"], 1)
+
+
+    @unittest.skipUnless(Image, "Pillow is not installed")
+    def test_exif_orientation_is_applied_before_resizing(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for name, size in (("large.jpg", (3000, 1500)), ("small.jpg", (40, 20))):
+                exif = Image.Exif()
+                exif[0x0112] = 6  # Stored sideways, displayed turned a quarter clockwise
+                paths.append(os.path.join(directory, name))
+                Image.new("RGB", size, (200, 100, 50)).save(paths[-1], exif=exif.tobytes())
+            images = ImageLoader().load_many(paths)
+
+        self.assertEqual([image.size for image in images], [(768, 1536), (20, 40)])
+        for image in images:
+            data = base64.b64decode(image.data_url.split(",", 1)[1])
+            with Image.open(io.BytesIO(data)) as decoded:
+                self.assertEqual(decoded.size, image.size)
+                self.assertEqual(decoded.getexif().get(0x0112, 1), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
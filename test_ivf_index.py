@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from embedding_index import EmbeddingIndex
+from ivf_index import IVFIndex
+
+
+def clustered_vectors(rng, clusters, per_cluster, dim):
+    centers = rng.normal(size=(clusters, dim))
+    return np.concatenate([center + 0.3 * rng.normal(size=(per_cluster, dim)) for center in centers])
+
+
+class TestIVFIndex(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.vectors = clustered_vectors(rng, 20, 100, 24).astype(np.float32)
+        self.queries = self.vectors[rng.choice(len(self.vectors), 20, replace=False)] + 0.05 * rng.normal(size=(20, 24))
+        self.exact = EmbeddingIndex.from_vectors(self.vectors)
+
+    def recall(self, index, nprobe):
+        hits = 0
+        for query in self.queries:
+            expected = {i for i, _ in self.exact.search(query, k=10)}
+            hits += len(expected & {i for i, _ in index.search(query, k=10, nprobe=nprobe)})
+        return hits / (10 * len(self.queries))
+
+    def test_full_probe_is_exact(self):
+        index = IVFIndex(n_lists=16)
+        index.add(self.vectors)
+
+        result = index.search(self.queries[0], k=10, nprobe=16)
+        expected = self.exact.search(self.queries[0], k=10)
+        self.assertEqual([i for i, _ in result], [i for i, _ in expected])
+        np.testing.assert_allclose([s for _, s in result], [s for _, s in expected], rtol=1e-5)
+
+    def test_recall_grows_with_nprobe(self):
+        index = IVFIndex(n_lists=32)
+        index.add(self.vectors)
+        self.assertGreaterEqual(self.recall(index, 8), self.recall(index, 1))
+        self.assertGreater(self.recall(index, 8), 0.9)
+
+    def test_incremental_insert_with_ids(self):
+        index = IVFIndex(n_lists=8)
+        index.add(self.vectors[:1000], ids=[f"doc-{i}" for i in range(1000)])
+        index.add(self.vectors[1000:], ids=[f"doc-{i}" for i in range(1000, 2000)])
+
+        self.assertEqual(len(index), 2000)
+        self.assertEqual(index.search(self.vectors[1500], k=1, nprobe=8)[0][0], "doc-1500")
+
+    def test_small_first_batches_are_buffered_until_training(self):
+        index = IVFIndex(n_lists=16)
+        index.add(self.vectors[:5], ids=[f"doc-{i}" for i in range(5)])
+
+        self.assertFalse(index.is_trained)
+        self.assertEqual(index.search(self.vectors[3], k=1)[0][0], "doc-3")
+
+        # n_lists vectors are not enough to place n_lists centroids
+        index.add(self.vectors[5:20], ids=[f"doc-{i}" for i in range(5, 20)])
+        self.assertFalse(index.is_trained)
+        for start in range(20, 2000, 10):
+            index.add(self.vectors[start:start + 10], ids=[f"doc-{i}" for i in range(start, start + 10)])
+            self.assertEqual(index.is_trained, start + 10 >= 39 * 16)
+
+        self.assertEqual(len(index), 2000)
+        for i in (3, 12, 1500):
+            self.assertEqual(index.search(self.vectors[i], k=1, nprobe=16)[0][0], f"doc-{i}")
+
+    def test_lists_grow_with_the_index(self):
+        index = IVFIndex(min_train_size=100)
+        for start in range(0, 2000, 10):
+            index.add(self.vectors[start:start + 10])
+            if start + 10 == 100:
+                self.assertEqual(index.n_lists, 10)
+
+        # Retrained at 400 and 1600 vectors
+        self.assertEqual(index.n_lists, 40)
+        self.assertEqual(len(index), 2000)
+        for i in (3, 12, 1500):
+            self.assertEqual(index.search(self.vectors[i], k=1, nprobe=40)[0][0], i)
+        self.assertGreater(self.recall(index, 8), 0.9)
+
+        default = IVFIndex()
+        for start in range(0, 2000, 10):
+            default.add(self.vectors[start:start + 10])
+        # Trained once 39 ** 2 vectors were buffered, not on the first batch of 10
+        self.assertEqual(default.n_lists, 39)
+
+    def test_save_and_load(self):
+        index = IVFIndex(n_lists=16, nprobe=4)
+        index.add(self.vectors)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index.npz")
+            index.save(path)
+            loaded = IVFIndex.load(path)
+
+        self.assertEqual(loaded.nprobe, 4)
+        self.assertEqual(loaded.search_batch(self.queries, k=5), index.search_batch(self.queries, k=5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import asyncio
+import unittest
+
+from fake_translator import FakeTranslatorServer, fake_translation
+from language_id import LanguageFilter, detect_language, is_untranslatable
+from translate_tool import AzureTranslateTool
+
+
+# Latin-script languages the model does not know, each closest to one it does
+UNMODELLED_SENTENCES = {
+    "es": "Balík bude doručen na vaši adresu zítra ráno.",  # Czech
+    "it": "Paketti toimitetaan osoitteeseesi huomenna aamulla.",  # Finnish
+    "nl": "Paket akan dikirim ke alamat Anda besok pagi.",  # Indonesian
+}
+
+
+class TestDetectLanguage(unittest.TestCase):
+
+    def test_detects_held_out_sentences(self):
+        sentences = {
+            "en": "The package will be delivered to your address tomorrow morning.",
+            "fr": "Le colis sera livré à votre adresse demain matin.",
+            "de": "Das Paket wird morgen früh an Ihre Adresse geliefert.",
+            "es": "El paquete será entregado en su dirección mañana por la mañana.",
+            "it": "Il pacco sarà consegnato al tuo indirizzo domani mattina.",
+            "pt": "O pacote será entregue no seu endereço amanhã de manhã.",
+            "nl": "Het pakket wordt morgenochtend op je adres bezorgd.",
+            "pl": "Paczka zostanie dostarczona na twój adres jutro rano.",
+        }
+        for language, sentence in sentences.items():
+            with self.subTest(language=language):
+                self.assertEqual(detect_language(sentence)[0], language)
+
+    def test_unmodelled_languages_are_unknown(self):
+        for sentence in UNMODELLED_SENTENCES.values():
+            with self.subTest(sentence=sentence):
+                self.assertEqual(detect_language(sentence), (None, 0.0))
+
+    def test_scripts(self):
+        self.assertEqual(detect_language("こんにちは、元気ですか"), ("ja", 1.0))
+        self.assertEqual(detect_language("Привет, как дела? Всё хорошо, спасибо, а у тебя?")[0], "ru")
+        self.assertEqual(detect_language("你好")[0], None)
+
+    def test_untranslatable(self):
+        for text in ("12,50", "https://example.com/docs", "{name}: 42", "def f(x):\n    return x + 1\n"):
+            with self.subTest(text=text):
+                self.assertTrue(is_untranslatable(text))
+        for text in ("Hello world", "Please return the form from the class (room 4) by Friday."):
+            with self.subTest(text=text):
+                self.assertFalse(is_untranslatable(text))
+
+
+class TestLanguageFilter(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeTranslatorServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.reset()
+        self.language_filter = LanguageFilter()
+        self.tool = AzureTranslateTool(
+            translate_key="test-key", translate_endpoint=self.server.endpoint, language_filter=self.language_filter
+        )
+
+    def test_same_language_is_returned_unchanged(self):
+        text = "Merci pour votre commande, elle sera expédiée demain."
+        self.assertEqual(self.tool._run(text, to_language="fr"), text)
+        self.assertEqual(self.server.request_count, 0)
+        self.assertEqual(self.language_filter.stats()["skipped_same_language"], 1)
+
+    def test_detected_language_is_sent(self):
+        text = "Thank you for your order, it will be shipped tomorrow."
+        result = self.tool._run(text, to_languages=["en", "de"])
+
+        self.assertEqual(result, {"en": text, "de": fake_translation(text, "de")})
+        self.assertEqual(self.server.requests[0]["to"], ["de"])
+        self.assertEqual(self.server.requests[0]["from"], "en")
+
+    def test_untranslatable_and_stats(self):
+        self.assertEqual(asyncio.run(self.tool._arun("https://example.com/a/b", to_language="de")),
+                         "https://example.com/a/b")
+        self.tool._run("Thank you for your order, it will be shipped tomorrow.", to_language="de")
+
+        stats = self.language_filter.stats()
+        self.assertEqual(self.server.request_count, 1)
+        self.assertEqual((stats["checked"], stats["skipped_untranslatable"], stats["detected"]), (2, 1, 1))
+        self.assertEqual(stats["skip_rate"], 0.5)
+        self.assertEqual(stats["saved_characters"], len("https://example.com/a/b"))
+        self.assertGreater(stats["saved_seconds"], 0)
+
+    def test_unmodelled_languages_are_sent_unfiltered(self):
+        for closest, sentence in UNMODELLED_SENTENCES.items():
+            with self.subTest(sentence=sentence):
+                self.server.reset()
+                result = self.tool._run(sentence, to_languages=[closest, "de"])
+
+                self.assertEqual(result, {closest: fake_translation(sentence, closest),
+                                          "de": fake_translation(sentence, "de")})
+                self.assertEqual(self.server.requests[0]["to"], [closest, "de"])
+                self.assertIsNone(self.server.requests[0]["from"])
+        self.assertEqual(self.language_filter.stats()["detected"], 0)
+
+    def test_batches_and_streams_are_filtered(self):
+        french = "Merci pour votre commande, elle sera expédiée demain."
+        english = "Thank you for your order, it will be shipped tomorrow."
+        url = "https://example.com/a/b"
+        expected = [french, fake_translation(english, "fr"), url]
+
+        self.assertEqual(self.tool.translate_batch([french, english, url], "fr"), expected)
+        self.assertEqual(asyncio.run(self.tool.atranslate_batch([french, english, url], "fr")), expected)
+        self.assertEqual("".join(self.tool.translate_stream(f"{french}\n{english}\n{url}", "fr", segment_chars=60)),
+                         "\n".join(expected))
+
+        self.assertEqual(self.server.request_count, 3)
+        for request in self.server.requests:
+            self.assertEqual([item["Text"] for item in request["body"]], [english])
+            self.assertEqual(request["from"], "en")
+        self.assertEqual(self.language_filter.stats()["checked"], 9)
+
+    def test_short_text_is_left_to_the_service(self):
+        self.tool._run("Hallo", to_language="de")
+        self.assertEqual(self.server.requests[0]["from"], None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from typing import Any, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.prompts import ChatPromptTemplate
+
+from prompt_runner import PromptRunner, ResponseCache
+from rate_limiter import TokenBudgetLimiter
+
+
+class EchoChatModel(BaseChatModel):
+    """
+    A chat model that answers with the last message, reporting gpt-4o-mini token usage.
+    """
+
+    temperature: float = 0.0
+    latency: float = 0.02
+    calls: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    lock: Any = None
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.lock = threading.Lock()
+
+    @property
+    def _llm_type(self) -> str:
+        return "echo"
+
+    @property
+    def _identifying_params(self):
+        return {"temperature": self.temperature}
+
+    def _generate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any
+    ) -> ChatResult:
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self.lock:
+            self.in_flight -= 1
+        if "fail" in messages[-1].content:
+            raise ValueError("The model failed.")
+        message = AIMessage(
+            content=f"echo: {messages[-1].content}",
+            usage_metadata={"input_tokens": 10, "output_tokens": 5, "total_tokens": 15},
+            response_metadata={"model_name": "gpt-4o-mini"},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class TestPromptRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.prompt = ChatPromptTemplate.from_messages(
+            [("system", "You are an expert in {country} cuisine."), ("human", "{question}")]
+        )
+        self.model = EchoChatModel()
+        self.inputs = [{"country": "Japan", "question": f"Dish {i % 5}?"} for i in range(20)]
+
+    def test_deduplicates_and_runs_concurrently(self):
+        runner = PromptRunner(self.prompt | self.model | StrOutputParser(), max_concurrency=3)
+        outputs = runner.run(self.inputs)
+
+        self.assertEqual(outputs, [f"echo: Dish {i % 5}?" for i in range(20)])
+        self.assertEqual(self.model.calls, 5)
+        self.assertEqual(self.model.max_in_flight, 3)
+
+        stats = runner.stats()
+        self.assertEqual((stats["requests"], stats["total_tokens"], stats["deduplicated"]), (5, 75, 15))
+        self.assertEqual(stats["saved_tokens"], 225)
+        self.assertGreater(stats["total_cost"], 0)
+        self.assertAlmostEqual(stats["saved_cost"], 3 * stats["total_cost"])
+
+    def test_persistent_cache_is_keyed_on_model_parameters(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "responses.sqlite")
+            cache = ResponseCache(path=path)
+            PromptRunner(self.prompt, self.model, cache=cache).run(self.inputs)
+            cache.close()
+
+            runner = PromptRunner(self.prompt, self.model, cache=ResponseCache(path=path))
+            outputs = runner.run(self.inputs)
+            self.assertEqual(outputs[1].content, "echo: Dish 1?")
+            self.assertEqual(self.model.calls, 5)
+            self.assertEqual(runner.stats()["cache_hits"], 20)
+
+            warmer = PromptRunner(self.prompt, EchoChatModel(temperature=0.7), cache=ResponseCache(path=path))
+            warmer.run(self.inputs[:1])
+            self.assertEqual(warmer.stats()["requests"], 1)
+
+            bound = PromptRunner(self.prompt | self.model.bind(stop=["."]), cache=ResponseCache(path=path))
+            bound.run(self.inputs[:1])
+            self.assertEqual(bound.stats()["requests"], 1)
+
+    def test_token_budget(self):
+        limiter = TokenBudgetLimiter(tokens_per_minute=600, requests_per_minute=60)
+        self.assertEqual(limiter.reserve(60), 0.0)
+        self.assertEqual(limiter.reserve(40), 0.0)
+        self.assertAlmostEqual(limiter.reserve(10), 1.0, places=2)
+
+        # The bucket holds 900 tokens; three requests of about 300 go slightly over, so the third waits
+        limiter = TokenBudgetLimiter(tokens_per_minute=6 * 900)
+        runner = PromptRunner(self.prompt, self.model, limiter=limiter, completion_tokens=290, max_concurrency=1)
+        start = time.monotonic()
+        runner.run([{"country": "Peru", "question": f"Q{i}"} for i in range(3)])
+        self.assertGreater(time.monotonic() - start, 0.1)
+        self.assertGreater(limiter.reserve(100), 1.0)
+
+    def test_errors(self):
+        runner = PromptRunner(self.prompt, self.model)
+        inputs = [{"country": "Italy", "question": "fail"}, {"country": "Italy", "question": "Pasta?"}]
+        outputs = runner.run(inputs, return_exceptions=True)
+        self.assertIsInstance(outputs[0], ValueError)
+        self.assertEqual(outputs[1].content, "echo: Pasta?")
+
+        with self.assertRaisesRegex(RuntimeError, "prompt 0"):
+            runner.run(inputs)
+        with self.assertRaises(ValueError):
+            PromptRunner(self.prompt)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import time
+import unittest
+
+from fake_translator import FakeTranslatorServer, fake_translation
+from rate_limiter import TokenBucket, TranslatorRateLimiter, parse_retry_after, retry_delay
+from translate_tool import AzureTranslateTool
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_token_bucket_reservations(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+        self.assertEqual(bucket.reserve(1, now=bucket._updated), 0.0)
+        self.assertEqual(bucket.reserve(1, now=bucket._updated), 0.0)
+        self.assertAlmostEqual(bucket.reserve(1, now=bucket._updated), 0.1)
+        # Later callers queue up behind the debt
+        self.assertAlmostEqual(bucket.reserve(1, now=bucket._updated), 0.2)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after({"Retry-After": "2"}), 2.0)
+        self.assertEqual(parse_retry_after({"retry-after-ms": "250"}), 0.25)
+        self.assertIsNone(parse_retry_after({"Content-Type": "application/json"}))
+        self.assertEqual(parse_retry_after({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}), 0.0)
+
+    def test_retry_delay(self):
+        for attempt in range(6):
+            self.assertLessEqual(retry_delay(attempt, backoff=0.5, backoff_max=4), 4)
+        self.assertGreaterEqual(retry_delay(0, retry_after=3), 3)
+
+    def test_limiter_adapts_to_throttling(self):
+        limiter = TranslatorRateLimiter(requests_per_second=100, characters_per_minute=60000)
+        limiter.on_throttled()
+        limiter.on_throttled()
+        self.assertEqual(limiter.rate_fraction, 0.25)
+        self.assertEqual(limiter._requests.rate, 25)
+
+        for _ in range(100):
+            limiter.on_success()
+        self.assertEqual(limiter.rate_fraction, 1.0)
+        self.assertEqual(limiter._characters.rate, 1000)
+
+    def test_retry_after_pauses_every_caller(self):
+        limiter = TranslatorRateLimiter()
+        limiter.on_throttled(retry_after=0.5)
+        self.assertGreater(limiter.reserve(10), 0.4)
+
+
+class TestToolRetries(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeTranslatorServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.reset()
+        self.server.requests_per_second = None
+        self.tool = AzureTranslateTool(
+            translate_key="test-key",
+            translate_endpoint=self.server.endpoint,
+            retry_backoff=0.01,
+        )
+
+    def test_retries_throttled_request_after_retry_after(self):
+        self.server.inject_errors(429, count=2, retry_after=0.1)
+
+        start = time.perf_counter()
+        self.assertEqual(self.tool._translate_text("Hello", "fr"), fake_translation("Hello", "fr"))
+
+        self.assertEqual(self.server.request_count, 3)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.2)
+
+    def test_gives_up_after_max_retries(self):
+        self.tool.max_retries = 2
+        self.server.inject_errors(503, count=5)
+
+        with self.assertRaises(RuntimeError):
+            self.tool._translate_text("Hello", "fr")
+        self.assertEqual(self.server.request_count, 3)
+
+    def test_client_errors_are_not_retried(self):
+        self.server.inject_errors(400)
+
+        with self.assertRaises(RuntimeError):
+            self.tool._translate_text("Hello", "fr")
+        self.assertEqual(self.server.request_count, 1)
+
+    def test_runs_at_quota_without_failing(self):
+        self.server.requests_per_second = 20
+        self.tool.rate_limiter = TranslatorRateLimiter(requests_per_second=20)
+        texts = [f"Row {i}" for i in range(30)]
+
+        result = [self.tool._translate_text(text, "fr") for text in texts]
+
+        self.assertEqual(result, [fake_translation(text, "fr") for text in texts])
+        self.assertLess(self.server.throttled_count, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
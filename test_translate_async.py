@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import unittest
+
+from fake_translator import FakeTranslatorServer, fake_translation
+from translate_tool import AzureTranslateTool
+
+
+class TestAsyncTranslate(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeTranslatorServer(latency=0.02).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.reset()
+        self.tool = AzureTranslateTool(translate_key="test-key", translate_endpoint=self.server.endpoint)
+
+    def run_async(self, coroutine_function):
+        async def wrapper():
+            try:
+                return await coroutine_function()
+            finally:
+                await self.tool.aclose()
+        return asyncio.run(wrapper())
+
+    def test_arun(self):
+        result = self.run_async(lambda: self.tool.ainvoke({"query": "Hello", "to_languages": ["fr", "de"]}))
+        self.assertEqual(result, {"fr": fake_translation("Hello", "fr"), "de": fake_translation("Hello", "de")})
+
+    def test_atranslate_batch_preserves_order_and_bounds_concurrency(self):
+        self.tool.max_request_elements = 1
+        self.tool.max_concurrent_requests = 3
+        texts = [f"Text {i}" for i in range(12)]
+
+        result = self.run_async(lambda: self.tool.atranslate_batch(texts, "fr"))
+
+        self.assertEqual(result, [fake_translation(text, "fr") for text in texts])
+        self.assertEqual(self.server.request_count, 12)
+        self.assertEqual(self.server.max_in_flight, 3)
+
+    def test_concurrent_callers_share_client(self):
+        async def callers():
+            results = await asyncio.gather(*(self.tool._arun(f"Hi {i}") for i in range(20)))
+            return results, await self.tool._aget_async_client()
+
+        results, (client, _) = self.run_async(callers)
+
+        self.assertEqual(results, [fake_translation(f"Hi {i}", "fr") for i in range(20)])
+        self.assertIsNotNone(client)
+        self.assertEqual(len(self.tool._async_clients), 0)
+
+    def track_close(self, client):
+        closed = []
+        close = client.close
+
+        async def tracked_close():
+            closed.append(asyncio.get_running_loop())
+            await close()
+
+        client.close = tracked_close
+        return closed
+
+    def test_client_of_closed_loop_is_closed(self):
+        async def first_loop():
+            await self.tool._arun("First loop")
+            client, _ = await self.tool._aget_async_client()
+            return asyncio.get_running_loop(), client
+
+        loop, first = asyncio.run(first_loop())
+        closed = self.track_close(first)
+
+        async def second_loop():
+            result = await self.tool._arun("Second loop")
+            client, _ = await self.tool._aget_async_client()
+            return result, client
+
+        result, client = self.run_async(second_loop)
+
+        self.assertEqual(result, fake_translation("Second loop", "fr"))
+        self.assertEqual(len(closed), 1)
+        self.assertIsNot(client, first)
+        self.assertNotIn(loop, self.tool._async_clients)
+
+    def test_loops_on_other_threads_keep_their_client(self):
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+
+        def on_thread(coroutine):
+            return asyncio.run_coroutine_threadsafe(coroutine, loop).result(timeout=10)
+
+        try:
+            on_thread(self.tool._arun("Other thread"))
+            client, semaphore = on_thread(self.tool._aget_async_client())
+            closed = self.track_close(client)
+
+            for i in range(3):
+                self.assertEqual(self.run_async(lambda: self.tool._arun(f"Main thread {i}")),
+                                 fake_translation(f"Main thread {i}", "fr"))
+                self.assertEqual(on_thread(self.tool._arun(f"Other thread {i}")),
+                                 fake_translation(f"Other thread {i}", "fr"))
+
+            self.assertEqual(closed, [])
+            self.assertEqual(on_thread(self.tool._aget_async_client()), (client, semaphore))
+            on_thread(self.tool.aclose())
+            self.assertEqual(closed, [loop])
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
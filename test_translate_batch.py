@@ -0,0 +1,186 @@
+import io
+import unittest
+
+from fake_translator import FakeTranslatorServer, fake_translation
+from translate_tool import AzureTranslateTool, pack_requests, split_stream, split_text
+
+
+class TestSplitAndPack(unittest.TestCase):
+
+    def test_short_text_is_not_split(self):
+        self.assertEqual(split_text("Hello there.", 100), [("Hello there.", "")])
+
+    def test_split_at_sentence_boundaries(self):
+        text = "One two. Three four!\nFive six?  Seven."
+        pieces = split_text(text, 12)
+        self.assertTrue(all(len(piece) <= 12 for piece, _ in pieces))
+        self.assertEqual("".join(piece + separator for piece, separator in pieces), text)
+        self.assertEqual(pieces[0], ("One two.", " "))
+
+    def test_long_sentence_is_hard_split(self):
+        text = "word " * 20 + "x" * 30
+        pieces = split_text(text, 16)
+        self.assertTrue(all(len(piece) <= 16 for piece, _ in pieces))
+        self.assertEqual("".join(piece + separator for piece, separator in pieces), text)
+
+    def test_leading_whitespace_is_kept(self):
+        for text, max_chars in (("\n\nHello there. Bye now.", 12), ("\n\nHello there. Bye now.", 14),
+                                ("\n" * 25 + "Hello.", 10)):
+            pieces = split_text(text, max_chars)
+            self.assertTrue(all(len(piece) <= max_chars for piece, _ in pieces))
+            self.assertEqual("".join(piece + separator for piece, separator in pieces), text)
+        self.assertEqual(split_text("\n\nHello there. Bye now.", 14)[0], ("\n\nHello there.", " "))
+
+    def test_pack_respects_limits(self):
+        texts = ["a" * 4] * 10
+        self.assertEqual([len(r) for r in pack_requests(texts, 3, 100)], [3, 3, 3, 1])
+        self.assertEqual([len(r) for r in pack_requests(texts, 100, 10)], [2] * 5)
+
+    def test_split_stream_matches_split_text(self):
+        text = "".join(f"Sentence number {i} is here.{' ' if i % 3 else chr(10)}" for i in range(200))
+        chunks = [text[i:i + 37] for i in range(0, len(text), 37)]
+        self.assertEqual(list(split_stream(chunks, 80)), split_text(text, 80))
+
+    def test_split_stream_carries_whitespace_only_chunks(self):
+        chunks = ["\n" * 25, "  \n", "Hello. Bye now."]
+        pieces = list(split_stream(chunks, 10))
+        self.assertTrue(all(len(piece) <= 10 for piece, _ in pieces))
+        self.assertEqual("".join(piece + separator for piece, separator in pieces), "".join(chunks))
+
+
+class TestTranslateBatch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeTranslatorServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.reset()
+        self.tool = AzureTranslateTool(translate_key="test-key", translate_endpoint=self.server.endpoint)
+
+    def test_batch_uses_fewer_requests(self):
+        texts = [f"Ticket number {i}." for i in range(50)]
+
+        for text in texts:
+            self.tool._translate_text(text, "fr")
+        single_requests = self.server.request_count
+
+        self.server.reset()
+        result = self.tool.translate_batch(texts, "fr")
+
+        self.assertEqual(result, [fake_translation(text, "fr") for text in texts])
+        self.assertEqual(single_requests, 50)
+        self.assertEqual(self.server.request_count, 1)
+
+    def test_batch_respects_element_limit(self):
+        self.tool.max_request_elements = 8
+        texts = [f"Line {i}" for i in range(20)]
+        result = self.tool.translate_batch(texts, "de")
+        self.assertEqual(result, [fake_translation(text, "de") for text in texts])
+        self.assertEqual(self.server.request_count, 3)
+
+    def test_oversized_text_is_split_and_reassembled(self):
+        self.tool.max_request_characters = 20
+        text = "First sentence. Second sentence. Third one."
+        result = self.tool.translate_batch(["Short.", text, ""], "fr")
+
+        self.assertEqual(result[0], fake_translation("Short.", "fr"))
+        self.assertEqual(result[1], " ".join(
+            fake_translation(s, "fr") for s in ["First sentence.", "Second sentence.", "Third one."]
+        ))
+        self.assertEqual(result[2], "")
+        for request in self.server.requests:
+            self.assertLessEqual(sum(len(item["Text"]) for item in request["body"]), 20)
+
+    def test_leading_whitespace_is_not_sent(self):
+        self.tool.max_request_characters = 20
+        text = "\n" * 30 + "First sentence. Second sentence."
+        result = self.tool.translate_batch([text], "fr")
+
+        self.assertEqual(result[0], "\n" * 30 + " ".join(
+            fake_translation(s, "fr") for s in ["First sentence.", "Second sentence."]
+        ))
+        self.assertEqual([item["Text"] for request in self.server.requests for item in request["body"]],
+                         ["First sentence.", "Second sentence."])
+
+    def test_multi_target_uses_one_request(self):
+        languages = ["fr", "de", "ja"]
+        result = self.tool.invoke({"query": "Hello", "to_languages": languages})
+
+        self.assertEqual(result, {lang: fake_translation("Hello", lang) for lang in languages})
+        self.assertEqual(self.server.request_count, 1)
+        self.assertEqual(self.server.requests[0]["to"], languages)
+
+    def test_run_defaults_to_french(self):
+        self.assertEqual(self.tool.invoke("Hello"), fake_translation("Hello", "fr"))
+        self.assertEqual(self.tool.invoke({"query": "Hello", "to_language": "de"}), fake_translation("Hello", "de"))
+
+    def test_batch_multi_shares_character_budget(self):
+        self.tool.max_request_characters = 40
+        texts = [f"Ten chars{i}" for i in range(4)]
+        result = self.tool.translate_batch_multi(texts + [""], ["fr", "de"])
+
+        self.assertEqual(result[:4], [{"fr": fake_translation(t, "fr"), "de": fake_translation(t, "de")} for t in texts])
+        self.assertEqual(result[4], "")
+        self.assertEqual(self.server.request_count, 2)
+
+
+class TestTranslateStream(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeTranslatorServer(latency=0.01).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.reset()
+        self.tool = AzureTranslateTool(
+            translate_key="test-key", translate_endpoint=self.server.endpoint, max_request_characters=200
+        )
+
+    def test_stream_translates_file_in_order(self):
+        text = "".join(f"Line {i} of the log.\n" for i in range(300))
+        result = "".join(self.tool.translate_stream(io.StringIO(text), "de", segment_chars=50, max_in_flight=3))
+
+        self.assertEqual(result, "".join(fake_translation(piece, "de") + separator
+                                         for piece, separator in split_text(text, 50)))
+        self.assertGreater(self.server.request_count, 10)
+        self.assertLessEqual(self.server.max_in_flight, 3)
+        for request in self.server.requests:
+            self.assertLessEqual(sum(len(item["Text"]) for item in request["body"]), 200)
+
+    def test_stream_reads_source_lazily(self):
+        consumed = []
+
+        def lines():
+            for i in range(10000):
+                consumed.append(i)
+                yield f"Sentence {i}.\n"
+
+        stream = self.tool.translate_stream(lines(), "fr", segment_chars=50, max_in_flight=2)
+        self.assertTrue(next(stream).startswith(fake_translation("Sentence 0.", "fr")))
+        stream.close()
+        # Only a few requests' worth of the source is read before the first segment comes back
+        self.assertLess(len(consumed), 200)
+
+    def test_stream_keeps_whitespace_only_chunks(self):
+        result = "".join(self.tool.translate_stream(["\n" * 25, "Hello."], "fr", segment_chars=10))
+
+        self.assertEqual(result, "\n" * 25 + fake_translation("Hello.", "fr"))
+        self.assertEqual([item["Text"] for request in self.server.requests for item in request["body"]], ["Hello."])
+
+    def test_stream_raises_request_errors(self):
+        self.server.inject_errors(400, count=1)
+        with self.assertRaises(RuntimeError):
+            list(self.tool.translate_stream("Hello there.", "fr"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from fake_translator import FakeTranslatorServer, fake_translation
+from translate_tool import AzureTranslateTool
+from translation_cache import TranslationCache, make_cache_key
+
+
+class TestTranslationCache(unittest.TestCase):
+
+    def test_key_depends_on_languages_and_options(self):
+        key = make_cache_key("Hello", "fr")
+        self.assertEqual(key, make_cache_key("  Hello ", "fr"))
+        self.assertNotEqual(key, make_cache_key("Hello", "de"))
+        self.assertNotEqual(key, make_cache_key("Hello", "fr", from_language="en"))
+        self.assertNotEqual(key, make_cache_key("Hello", "fr", options={"text_type": "html"}))
+
+    def test_lru_eviction(self):
+        cache = TranslationCache(max_entries=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "1")
+        self.assertEqual(cache.stats(), {"hits": 2, "disk_hits": 0, "misses": 1, "evictions": 1, "size": 2})
+
+    def test_disk_tier_survives_restart(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "translations.sqlite")
+            with TranslationCache(max_entries=1, path=path) as cache:
+                cache.put_many([("a", "1"), ("b", "2")])
+                # Evicted from memory but still on disk
+                self.assertEqual(cache.get("a"), "1")
+
+            with TranslationCache(path=path) as cache:
+                self.assertEqual(cache.get("b"), "2")
+                self.assertEqual(cache.stats()["disk_hits"], 1)
+
+    def test_thread_safety(self):
+        cache = TranslationCache(max_entries=50)
+
+        def worker(offset):
+            for i in range(500):
+                cache.put(f"{offset}-{i}", str(i))
+                cache.get(f"{offset}-{i // 2}")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = cache.stats()
+        self.assertEqual(stats["size"], 50)
+        self.assertEqual(stats["hits"] + stats["misses"], 8 * 500)
+
+
+class TestToolCache(unittest.TestCase):
+
+    def test_cache_hit_skips_request(self):
+        with FakeTranslatorServer() as server:
+            tool = AzureTranslateTool(
+                translate_key="test-key",
+                translate_endpoint=server.endpoint,
+                translation_cache=TranslationCache(),
+            )
+
+            self.assertEqual(tool._translate_text("Save", "fr"), fake_translation("Save", "fr"))
+            self.assertEqual(tool._translate_text("Save", "fr"), fake_translation("Save", "fr"))
+            self.assertEqual(server.request_count, 1)
+
+            result = tool.translate_batch(["Save", "Cancel", "Cancel", "Save"], "fr")
+            self.assertEqual(result, [fake_translation(t, "fr") for t in ["Save", "Cancel", "Cancel", "Save"]])
+            self.assertEqual(server.request_count, 2)
+            self.assertEqual([item["Text"] for item in server.requests[1]["body"]], ["Cancel"])
+
+            tool.translate_batch(["Save", "Cancel"], "fr")
+            self.assertEqual(server.request_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import unittest
+
+from fake_translator import FakeTranslatorServer, fake_translation
+from translate_tool import AzureTranslateTool
+from translation_memory import TranslationMemory, fill_placeholders, mask_placeholders
+
+
+class TestPlaceholders(unittest.TestCase):
+
+    def test_mask_and_fill(self):
+        text = "Send {count} files (1,024 KB) to ops@example.com via https://example.com/upload."
+        masked, placeholders = mask_placeholders(text)
+
+        self.assertEqual(masked, "Send ⟦0⟧ files (⟦1⟧ KB) to ⟦2⟧ via ⟦3⟧.")
+        self.assertEqual([kind for kind, _ in placeholders], ["variable", "number", "email", "url"])
+        self.assertEqual(fill_placeholders(masked, [value for _, value in placeholders]), text)
+
+
+class TestTranslationMemory(unittest.TestCase):
+
+    def setUp(self):
+        self.memory = TranslationMemory()
+        self.memory.add("Hello Alice, your order 12 has shipped.", "Bonjour Alice, votre commande 12 a été expédiée.", "fr")
+
+    def test_placeholder_values_are_replaced(self):
+        self.assertEqual(self.memory.lookup("Hello Alice, your order 4021 has shipped.", "fr"),
+                         "Bonjour Alice, votre commande 4021 a été expédiée.")
+        self.assertEqual(self.memory.stats()["exact_hits"], 1)
+
+    def test_fuzzy_match_patches_differing_names(self):
+        self.assertIsNone(self.memory.lookup("Hello Bob, your order 7 has shipped.", "fr"))
+
+        memory = TranslationMemory(patch_words=True)
+        memory.add("Hello Alice, your order 12 has shipped.", "Bonjour Alice, votre commande 12 a été expédiée.", "fr")
+        self.assertEqual(memory.lookup("Hello Bob, your order 7 has shipped.", "fr"),
+                         "Bonjour Bob, votre commande 7 a été expédiée.")
+        self.assertEqual(memory.stats()["fuzzy_hits"], 1)
+
+    def test_changed_ordinary_word_is_not_reused(self):
+        for memory in (TranslationMemory(), TranslationMemory(patch_words=True)):
+            memory.add("Click here to open the main menu of the application.",
+                       "Cliquez ici pour ouvrir le menu principal de l'application.", "fr")
+            self.assertIsNone(memory.lookup("Click here to open the main file of the application.", "fr"))
+            self.assertEqual(memory.lookup("Click here to open the main menu of the application.", "fr"),
+                             "Cliquez ici pour ouvrir le menu principal de l'application.")
+
+    def test_unpatchable_match_is_rejected(self):
+        self.memory.patch_words = True
+        self.assertIsNone(self.memory.lookup("Hello Bob, your order 7 has not shipped.", "fr"))
+        self.assertIsNone(self.memory.lookup("Hello Alice, your parcel 12 has shipped.", "fr"))
+        self.assertIsNone(self.memory.lookup("Hello Alice, your order 12 has shipped.", "de"))
+        self.assertIsNone(self.memory.lookup("The weather is nice today.", "fr"))
+        self.assertEqual(self.memory.stats()["misses"], 4)
+
+    def test_translation_with_changed_placeholder_is_not_stored(self):
+        self.assertFalse(self.memory.add("It costs 1,000 euros.", "Cela coûte 1 000 euros.", "fr"))
+        self.assertEqual(len(self.memory), 1)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "memory.jsonl")
+            self.memory.save(path)
+            loaded = TranslationMemory(patch_words=True)
+            loaded.load(path)
+
+        self.assertEqual(loaded.lookup("Hello Bob, your order 7 has shipped.", "fr"),
+                         "Bonjour Bob, votre commande 7 a été expédiée.")
+
+
+class TestToolWithTranslationMemory(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeTranslatorServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.reset()
+        self.tool = AzureTranslateTool(
+            translate_key="test-key", translate_endpoint=self.server.endpoint, translation_memory=TranslationMemory()
+        )
+
+    def sent_texts(self):
+        return [item["Text"] for request in self.server.requests for item in request["body"]]
+
+    def test_templated_sentences_are_sent_once(self):
+        texts = [f"Invoice {i} is due on 2024-05-{i:02d}." for i in range(1, 21)]
+        self.tool.translate_batch(texts[:1], "fr")
+        result = self.tool.translate_batch(texts, "fr")
+
+        self.assertEqual(result, [fake_translation(text, "fr") for text in texts])
+        self.assertEqual(self.sent_texts(), texts[:1])
+
+    def test_only_missing_sentences_are_sent(self):
+        self.tool.invoke("Your ticket 17 was closed.")
+        self.server.reset()
+
+        result = self.tool.invoke("Thanks for writing in. Your ticket 42 was closed.\nBye!")
+
+        self.assertEqual(result, " ".join([fake_translation("Thanks for writing in.", "fr"),
+                                           fake_translation("Your ticket 42 was closed.", "fr")])
+                         + "\n" + fake_translation("Bye!", "fr"))
+        self.assertEqual(self.sent_texts(), ["Thanks for writing in.", "Bye!"])
+
+
+if __name__ == '__main__':
+    unittest.main()
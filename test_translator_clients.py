@@ -0,0 +1,108 @@
+import subprocess
+import sys
+import unittest
+
+from fake_translator import FakeTranslatorServer
+from translate_tool import AzureTranslateTool
+from translator_clients import TranslatorClientRegistry, get_client_registry
+
+
+class TestTranslatorClientRegistry(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeTranslatorServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def test_tools_share_client_and_connections(self):
+        with TranslatorClientRegistry(pool_size=2) as registry:
+            tools = [
+                AzureTranslateTool(translate_key="key", translate_endpoint=self.server.endpoint, client_registry=registry)
+                for _ in range(5)
+            ]
+            for tool in tools:
+                tool._translate_text("Hello", "fr")
+
+            self.assertTrue(all(tool.translate_client is tools[0].translate_client for tool in tools))
+            stats = registry.stats()
+            self.assertEqual(stats["clients"], 1)
+            self.assertEqual(stats["client_hits"], 4)
+            self.assertEqual(stats["requests"], 5)
+            self.assertEqual(stats["connections_opened"], 1)
+            self.assertEqual(stats["connections_reused"], 4)
+
+    def test_clients_are_keyed_by_endpoint_and_key(self):
+        with TranslatorClientRegistry() as registry:
+            client = registry.get_client(self.server.endpoint, "key-1")
+            self.assertIs(registry.get_client(self.server.endpoint, "key-1"), client)
+            self.assertIsNot(registry.get_client(self.server.endpoint, "key-2"), client)
+            self.assertEqual(registry.stats()["clients"], 2)
+
+    def test_clients_are_keyed_by_options(self):
+        with TranslatorClientRegistry() as registry:
+            client = registry.get_client(self.server.endpoint, "key", retry_total=0)
+            self.assertIs(registry.get_client(self.server.endpoint, "key", retry_total=0), client)
+            other = registry.get_client(self.server.endpoint, "key", retry_total=3)
+            self.assertIsNot(other, client)
+            self.assertIsNot(registry.get_client(self.server.endpoint, "key"), client)
+            self.assertEqual(registry.stats()["clients"], 3)
+
+    def test_keep_alive_disabled(self):
+        with TranslatorClientRegistry(keep_alive=False) as registry:
+            tool = AzureTranslateTool(translate_key="key", translate_endpoint=self.server.endpoint, client_registry=registry)
+            for _ in range(3):
+                tool._translate_text("Hello", "fr")
+            self.assertEqual(registry.stats()["connections_reused"], 0)
+
+    def test_close_and_reuse(self):
+        registry = TranslatorClientRegistry()
+        client = registry.get_client(self.server.endpoint, "key")
+        registry.close()
+        self.assertEqual(registry.stats()["clients"], 0)
+        self.assertIsNot(registry.get_client(self.server.endpoint, "key"), client)
+        registry.close()
+
+    def test_default_registry_is_shared(self):
+        self.assertIs(get_client_registry(), get_client_registry())
+        first = AzureTranslateTool(translate_key="key", translate_endpoint=self.server.endpoint)
+        second = AzureTranslateTool(translate_key="key", translate_endpoint=self.server.endpoint)
+        self.assertIs(first._get_client(), second._get_client())
+
+    def test_client_is_created_on_first_use(self):
+        with TranslatorClientRegistry() as registry:
+            tool = AzureTranslateTool(translate_key="key", translate_endpoint=self.server.endpoint, client_registry=registry)
+            self.assertIsNone(tool.translate_client)
+            self.assertEqual(registry.stats()["clients"], 0)
+            tool._translate_text("Hello", "fr")
+            self.assertEqual(registry.stats()["clients"], 1)
+
+    def test_prewarm_opens_the_connection(self):
+        self.server.reset()
+        with TranslatorClientRegistry() as registry:
+            tool = AzureTranslateTool(translate_key="key", translate_endpoint=self.server.endpoint, client_registry=registry)
+            self.assertIsNone(tool.prewarm().result(timeout=10))
+            tool._translate_text("Hello", "fr")
+
+            stats = registry.stats()
+            self.assertEqual(stats["connections_opened"], 1)
+            self.assertEqual(stats["requests"], 2)
+            # The languages request is not a translation
+            self.assertEqual(len(self.server.requests), 1)
+
+        with TranslatorClientRegistry() as registry:
+            tool = AzureTranslateTool(translate_key="key", translate_endpoint="http://127.0.0.1:1", client_registry=registry)
+            with self.assertLogs("translate_tool", "WARNING"):
+                with self.assertRaises(Exception):
+                    tool.prewarm().result(timeout=10)
+
+    def test_import_defers_the_sdk(self):
+        code = "import sys, translate_tool; print(any(name.startswith('azure') for name in sys.modules))"
+        process = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(process.stdout.strip(), "False")
+
+
+if __name__ == '__main__':
+    unittest.main()
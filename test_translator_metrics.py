@@ -0,0 +1,110 @@
+import unittest
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from fake_translator import FakeTranslatorServer, fake_translation
+from translate_tool import RUN_METRICS_EVENT, AzureTranslateTool
+from translation_cache import TranslationCache
+from translator_metrics import Histogram, TranslatorMetrics
+
+
+class RecordingHandler(BaseCallbackHandler):
+
+    def __init__(self):
+        self.events = []
+
+    def on_custom_event(self, name, data, *, run_id, tags=None, metadata=None, **kwargs):
+        self.events.append((name, data))
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_cumulative_buckets_and_quantiles(self):
+        histogram = Histogram([0.1, 1.0])
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.cumulative(), [("0.1", 1), ("1.0", 3), ("+Inf", 4)])
+        self.assertEqual(histogram.quantile(0.5), 1.0)
+        self.assertEqual(histogram.quantile(1.0), float("inf"))
+
+
+class TestTranslatorMetrics(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeTranslatorServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.reset()
+        self.metrics = TranslatorMetrics()
+        self.tool = AzureTranslateTool(
+            translate_key="test-key", translate_endpoint=self.server.endpoint, metrics=self.metrics, retry_backoff=0.01
+        )
+
+    def test_requests_are_counted_and_timed(self):
+        self.tool.translate_batch_multi(["Hello", "World"], ["fr", "de"])
+
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot["requests"], 1)
+        self.assertEqual(snapshot["characters"], 20)
+        self.assertEqual(snapshot["in_flight"], 0)
+        self.assertEqual(snapshot["latency"]["count"], 1)
+        for phase in ("serialize", "network", "deserialize"):
+            self.assertEqual(snapshot["phases"][phase]["count"], 1)
+
+    def test_errors_and_retries_are_counted(self):
+        self.server.inject_errors(429, count=1, retry_after=0)
+        self.tool.invoke("Hello")
+
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot["requests"], 2)
+        self.assertEqual(snapshot["errors"], {"429": 1})
+        self.assertEqual(snapshot["retries"], 1)
+        self.assertEqual(snapshot["throttled"], 1)
+        self.assertIn('azure_translator_errors_total{reason="429"} 1', self.metrics.to_prometheus())
+
+    def test_cache_lookups_are_counted(self):
+        self.tool.translation_cache = TranslationCache()
+        self.tool.translate_batch(["Hello", "World"], "fr")
+        self.tool.translate_batch(["Hello", "Again"], "fr")
+
+        snapshot = self.metrics.snapshot()
+        self.assertEqual((snapshot["cache_hits"], snapshot["cache_misses"]), (1, 3))
+
+    def test_sinks_receive_request_events(self):
+        events = []
+        self.metrics.add_sink(events.append)
+        self.metrics.add_sink(lambda event: 1 / 0)  # A failing sink does not break translation
+
+        self.assertEqual(self.tool.invoke("Hello"), fake_translation("Hello", "fr"))
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["characters"], 5)
+        self.assertIsNone(events[0]["error"])
+
+    def test_run_totals_are_sent_to_callbacks(self):
+        handler = RecordingHandler()
+        self.tool.invoke({"query": "Hello", "to_languages": ["fr", "de"]}, config={"callbacks": [handler]})
+
+        self.assertEqual(len(handler.events), 1)
+        name, totals = handler.events[0]
+        self.assertEqual(name, RUN_METRICS_EVENT)
+        self.assertEqual((totals["requests"], totals["characters"], totals["errors"]), (1, 10, 0))
+        self.assertGreater(totals["duration"], 0)
+
+    def test_prometheus_format(self):
+        self.tool.invoke("Hello")
+        text = self.metrics.to_prometheus()
+
+        self.assertIn("# TYPE azure_translator_requests_total counter", text)
+        self.assertIn("azure_translator_requests_total 1", text)
+        self.assertIn('azure_translator_request_duration_seconds_bucket{le="+Inf"} 1', text)
+        self.assertIn('azure_translator_request_phase_seconds_count{phase="network"} 1', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
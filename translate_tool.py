@@ -1,15 +1,226 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
-from typing import Any, Optional, Dict
-from langchain_core.callbacks import CallbackManagerForToolRun
+import re
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Optional, Deque, Dict, Iterable, Iterator, List, Sequence, Tuple, Type, Union
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
 from langchain_core.tools import BaseTool
-from azure.ai.translation.text import TextTranslationClient
-from azure.core.credentials import AzureKeyCredential
+from pydantic import BaseModel, Field
+from rate_limiter import RETRYABLE_STATUS_CODES, TranslatorRateLimiter, parse_retry_after, retry_delay
+from language_id import LanguageFilter
+from translation_cache import TranslationCache, make_cache_key
+from translation_memory import TranslationMemory
+from translator_clients import TranslatorClientRegistry, get_client_registry
+from translator_metrics import TranslatorMetrics, get_translator_metrics
 
 logger = logging.getLogger(__name__)
 
+# Per-request limits of the Translator v3 translate operation
+MAX_REQUEST_ELEMENTS = 1000
+MAX_REQUEST_CHARACTERS = 50000  # Counted once per target language
+
+DEFAULT_TO_LANGUAGE = "fr"
+
+# Name of the LangChain custom event that reports the totals of each tool run
+RUN_METRICS_EVENT = "azure_translate_metrics"
+
+# Totals of the tool run in progress, reported through its run_manager
+_run_totals: ContextVar[Optional[Dict[str, float]]] = ContextVar("azure_translate_run_totals", default=None)
+
+
+def _new_run_totals() -> Dict[str, float]:
+    return dict.fromkeys(
+        ("requests", "characters", "errors", "retries", "cache_hits", "cache_misses", "skipped", "seconds"), 0
+    )
+
+
+def _add_to_run_totals(**values: float) -> None:
+    totals = _run_totals.get()
+    if totals is not None:
+        for name, value in values.items():
+            totals[name] += value
+
+
+# Whitespace following sentence-ending punctuation, or a run of line breaks
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?\u3002\uff01\uff1f])\s+|\n\s*")
+
+
+def _split_sentences(text: str) -> List[Tuple[str, str]]:
+    """
+    Split text into sentences, keeping the whitespace that followed each one.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        List[Tuple[str, str]]: (sentence, separator) pairs that concatenate back to the text.
+    """
+    pieces = []
+    position = 0
+    for match in _SENTENCE_BOUNDARY.finditer(text):
+        if match.start() == position:
+            # Boundary at the very start (e.g. leading line breaks), nothing to translate
+            if pieces:
+                sentence, separator = pieces[-1]
+                pieces[-1] = (sentence, separator + match.group())
+        else:
+            pieces.append((text[position:match.start()], match.group()))
+        position = match.end()
+    if position < len(text):
+        pieces.append((text[position:], ""))
+    return pieces
+
+
+def _hard_split(sentence: str, separator: str, max_chars: int) -> List[Tuple[str, str]]:
+    """
+    Split a single sentence longer than max_chars, preferring whitespace boundaries.
+    """
+    pieces = []
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(" ", 0, max_chars + 1)
+        if cut <= 0:
+            pieces.append((sentence[:max_chars], ""))
+            sentence = sentence[max_chars:]
+        else:
+            pieces.append((sentence[:cut], " "))
+            sentence = sentence[cut + 1:]
+    pieces.append((sentence, separator))
+    return pieces
+
+
+def split_text(text: str, max_chars: int) -> List[Tuple[str, str]]:
+    """
+    Split text into pieces of at most max_chars characters at sentence boundaries.
+
+    Consecutive sentences are merged back together as long as they fit, so short texts
+    come back as a single piece. Sentences that are too long on their own are split at
+    whitespace, or at max_chars when there is none.
+
+    Args:
+        text (str): The text to split.
+        max_chars (int): The maximum number of characters per piece.
+
+    Returns:
+        List[Tuple[str, str]]: (piece, separator) pairs. Joining every piece followed by its
+        separator reproduces the text, so translated pieces can be reassembled the same way.
+    """
+    if max_chars <= 0:
+        raise ValueError("max_chars must be a positive integer.")
+    if len(text) <= max_chars:
+        return [(text, "")]
+
+    sentences = _split_sentences(text)
+    # _split_sentences drops leading whitespace, which starts the first piece when it fits
+    # there and is otherwise kept in whitespace-only pieces of its own
+    prefix = text[:len(text) - sum(len(sentence) + len(separator) for sentence, separator in sentences)]
+    if sentences and len(prefix) + len(sentences[0][0]) <= max_chars:
+        sentences[0] = (prefix + sentences[0][0], sentences[0][1])
+        prefix = ""
+    pieces: List[Tuple[str, str]] = [(prefix[i:i + max_chars], "") for i in range(0, len(prefix), max_chars)]
+    current, current_separator = "", ""
+    for sentence, separator in sentences:
+        if len(sentence) > max_chars:
+            if current:
+                pieces.append((current, current_separator))
+                current, current_separator = "", ""
+            pieces.extend(_hard_split(sentence, separator, max_chars))
+        elif current and len(current) + len(current_separator) + len(sentence) <= max_chars:
+            current += current_separator + sentence
+            current_separator = separator
+        else:
+            if current:
+                pieces.append((current, current_separator))
+            current, current_separator = sentence, separator
+    if current:
+        pieces.append((current, current_separator))
+    return pieces
+
+
+def split_stream(chunks: Iterable[str], max_chars: int) -> Iterator[Tuple[str, str]]:
+    """
+    Incremental version of split_text for text that arrives in chunks, e.g. the lines of a file.
+
+    Pieces are yielded as soon as the text after them has been read, and at most about
+    three times max_chars characters are buffered, however long the text is.
+
+    Args:
+        chunks (Iterable[str]): The text, in consecutive chunks of any size.
+        max_chars (int): The maximum number of characters per piece.
+
+    Yields:
+        Tuple[str, str]: The (piece, separator) pairs split_text would return for the whole text.
+    """
+    if max_chars <= 0:
+        raise ValueError("max_chars must be a positive integer.")
+
+    buffer: List[str] = []
+    buffered = 0
+    for chunk in chunks:
+        for start in range(0, len(chunk), max_chars):
+            part = chunk[start:start + max_chars]
+            buffer.append(part)
+            buffered += len(part)
+            # Splitting only once two pieces' worth is buffered keeps the work linear in the text size
+            if buffered > 2 * max_chars:
+                pieces = split_text("".join(buffer), max_chars)
+                # The last piece may still grow with the next chunk
+                yield from pieces[:-1]
+                last, separator = pieces[-1]
+                buffer = [last + separator]
+                buffered = len(buffer[0])
+    if buffered:
+        yield from split_text("".join(buffer), max_chars)
+
+
+def pack_requests(texts: Sequence[str], max_elements: int, max_chars: int) -> List[List[int]]:
+    """
+    Group texts, in order, into requests that respect the per-request limits.
+
+    Args:
+        texts (Sequence[str]): The texts to send, each no longer than max_chars.
+        max_elements (int): The maximum number of texts per request.
+        max_chars (int): The maximum total number of characters per request.
+
+    Returns:
+        List[List[int]]: The indices of the texts that make up each request.
+    """
+    requests: List[List[int]] = []
+    current: List[int] = []
+    current_chars = 0
+    for index, text in enumerate(texts):
+        if current and (len(current) >= max_elements or current_chars + len(text) > max_chars):
+            requests.append(current)
+            current, current_chars = [], 0
+        current.append(index)
+        current_chars += len(text)
+    if current:
+        requests.append(current)
+    return requests
+
+
+class TranslateInput(BaseModel):
+    """
+    Structured input for the AzureTranslateTool.
+    """
+
+    query: str = Field(..., description="The text to be translated.")
+    to_language: str = Field(
+        default=DEFAULT_TO_LANGUAGE, description="The language code to translate to, e.g. 'fr'."
+    )
+    to_languages: Optional[List[str]] = Field(
+        default=None,
+        description="Translate into all of these language codes at once. "
+                    "The result maps each language code to its translation.",
+    )
+
 
 class AzureTranslateTool(BaseTool):
     """
@@ -19,21 +230,49 @@ class AzureTranslateTool(BaseTool):
     It requires an API key and endpoint, which can be set up as described in the
     Azure Translator API documentation. https://learn.microsoft.com/en-us/azure/ai-services/translator/translator-text-apis?tabs=python
 
+    The Azure SDK is imported, and the Translator client created, on first use rather than when
+    the module is imported or the tool constructed. Call prewarm (or pass prewarm=True) to do
+    both, and open the connection, on a background thread while the application starts up.
     """
 
     translate_key: str = ""
     translate_endpoint: str = ""
     translate_client: Any = None  #: :meta private:
+    max_request_elements: int = MAX_REQUEST_ELEMENTS
+    max_request_characters: int = MAX_REQUEST_CHARACTERS
+    translation_cache: Optional[TranslationCache] = None
+    translation_memory: Optional[TranslationMemory] = None
+    language_filter: Optional[LanguageFilter] = None
+    client_registry: Optional[TranslatorClientRegistry] = None
+    rate_limiter: Optional[TranslatorRateLimiter] = None
+    metrics: Optional[TranslatorMetrics] = None
+    max_retries: int = 5
+    retry_backoff: float = 0.5
+    retry_backoff_max: float = 30.0
+    max_concurrent_requests: int = 8
+    _async_clients: Any = None
 
     name: str = "azure_translator_tool"
     description: str = (
         "A wrapper around Azure Translator API. "
-        "Useful for translating text between languages. Input must be text (str)."
+        "Useful for translating text between languages. Input must be text (str), "
+        "optionally with the target language code(s)."
     )
+    args_schema: Type[BaseModel] = TranslateInput
 
-    def __init__(self, *, translate_key: Optional[str] = None, translate_endpoint: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        *,
+        translate_key: Optional[str] = None,
+        translate_endpoint: Optional[str] = None,
+        prewarm: bool = False,
+        **kwargs: Any
+    ) -> None:
         """
         Initialize the AzureTranslateTool with the given API key and endpoint.
+
+        Any other keyword arguments (e.g. max_request_characters) are passed on as tool fields.
+        When prewarm is True, the client is created and its connection opened in the background.
         """
         translate_key = translate_key or os.environ.get("AZURE_OPENAI_TRANSLATE_API_KEY")
         translate_endpoint = translate_endpoint or os.environ.get("AZURE_OPENAI_TRANSLATE_ENDPOINT")
@@ -44,14 +283,48 @@ class AzureTranslateTool(BaseTool):
         # Initialize parent class (Pydantic)
         super().__init__(
             translate_key=translate_key,
-            translate_endpoint=translate_endpoint
+            translate_endpoint=translate_endpoint,
+            **kwargs
         )
 
-        # Initialize the Translator Client outside of Pydantic attributes
-        self.translate_client = TextTranslationClient(
-            endpoint=translate_endpoint,
-            credential=AzureKeyCredential(translate_key)
-        )
+        if prewarm:
+            self.prewarm()
+
+    def _get_client(self) -> Any:
+        """
+        Return the Translator client, creating it on first use.
+        """
+        if self.translate_client is None:
+            # Reuse the pooled Translator Client shared by every tool using the same resource.
+            # Retries are scheduled by the tool (see _retry_wait), so the SDK must not retry underneath.
+            registry = self.client_registry or get_client_registry()
+            self.translate_client = registry.get_client(self.translate_endpoint, self.translate_key, retry_total=0)
+        return self.translate_client
+
+    def prewarm(self) -> Future:
+        """
+        Create the Translator client and open its connection on a background thread.
+
+        The connection is opened with the languages operation, which is not billed,
+        and then stays in the shared pool for the first translation. Failures are logged and
+        left to surface again on first use.
+
+        Returns:
+            Future: Completes once the connection is open; it holds the error if that failed.
+        """
+        future: Future = Future()
+
+        def warm() -> None:
+            try:
+                self._get_client().get_supported_languages(scope="translation")
+            except Exception as e:
+                logger.warning(f"Pre-warming the Translator client failed: {str(e)}")
+                future.set_exception(e)
+            else:
+                future.set_result(None)
+
+        threading.Thread(target=warm, name="translate-prewarm", daemon=True).start()
+        return future
 
     def _translate_text(self, text: str, to_language: str) -> str:
         """
@@ -68,46 +341,860 @@ class AzureTranslateTool(BaseTool):
         if not text:
             raise ValueError("Input text for translation is empty.")
 
+        return self._translate_to_languages(text, [to_language])[to_language]
+
+    def _translate_to_languages(self, text: str, to_languages: Sequence[str]) -> Dict[str, str]:
+        """
+        Translate text into several languages with a single Translator request.
+
+        With a language_filter, the text is returned as is for the target languages it is already
+        in (or for all of them when there is nothing to translate), and the detected source
+        language is sent along with the request.
+
+        Args:
+            text (str): The text to be translated.
+            to_languages (Sequence[str]): The target languages to translate to.
+
+        Returns:
+            Dict[str, str]: The translation for each target language.
+        """
+        if not text:
+            raise ValueError("Input text for translation is empty.")
+        if not to_languages:
+            raise ValueError("At least one target language is required.")
+
+        try:
+            return self._translate_filtered([text], to_languages, self.max_request_characters)[0]
+        except Exception as e:
+            logger.error(f"Translation failed: {str(e)}")
+            raise RuntimeError(f"Error during translation: {e}")
+
+    def _prefilter(
+        self, text: str, to_languages: Sequence[str]
+    ) -> Tuple[Dict[str, str], Sequence[str], Optional[str]]:
+        """
+        Run the language filter, if there is one, before translating a text.
+
+        Returns:
+            Tuple[Dict[str, str], Sequence[str], Optional[str]]: The text itself for each target language
+            it needs no translation into, the target languages left to translate into, and the detected
+            source language (None to let the service detect it).
+        """
+        if self.language_filter is None:
+            return {}, to_languages, None
+        decision = self.language_filter.classify(text, to_languages)
+        unchanged = {language: text for language in to_languages if language not in decision.to_languages}
+        _add_to_run_totals(skipped=len(unchanged))
+        return unchanged, decision.to_languages, decision.from_language
+
+    def _plan_filter(
+        self, segments: Sequence[str], to_languages: Sequence[str]
+    ) -> Tuple[List[Dict[str, str]], Dict[Tuple[Tuple[str, ...], Optional[str]], List[int]]]:
+        """
+        Run the language filter on every segment and group the segments that still need translating.
+
+        Returns:
+            Tuple[List[Dict[str, str]], Dict[Tuple[Tuple[str, ...], Optional[str]], List[int]]]: For each
+            segment, the segment itself for the target languages it needs no translation into, and the
+            positions of the segments to translate by their remaining target languages and source language.
+        """
+        outputs: List[Dict[str, str]] = []
+        groups: Dict[Tuple[Tuple[str, ...], Optional[str]], List[int]] = {}
+        for i, segment in enumerate(segments):
+            unchanged, remaining, from_language = self._prefilter(segment, to_languages)
+            outputs.append(unchanged)
+            if remaining:
+                groups.setdefault((tuple(remaining), from_language), []).append(i)
+        return outputs, groups
+
+    def _translate_filtered(
+        self, segments: Sequence[str], to_languages: Sequence[str], max_chars: int
+    ) -> List[Dict[str, str]]:
+        """
+        Translate segments through the language filter, when there is one.
+
+        Every call path (single texts, batches, streams and bulk files) goes through here, so the
+        filter skips the same segments whichever one is used. Segments with the same remaining
+        target languages and detected source language share requests.
+
+        Args:
+            segments (Sequence[str]): The texts to translate, each within max_chars.
+            to_languages (Sequence[str]): The target languages to translate to.
+            max_chars (int): The per-request character budget.
+
+        Returns:
+            List[Dict[str, str]]: For each segment, in order, the translation for each target language.
+        """
+        if self.language_filter is None:
+            return self._translate_segments(segments, to_languages, max_chars)
+        outputs, groups = self._plan_filter(segments, to_languages)
+        for (remaining, from_language), positions in groups.items():
+            start = time.perf_counter()
+            translated = self._translate_segments([segments[i] for i in positions], remaining, max_chars, from_language)
+            self.language_filter.record_translation(time.perf_counter() - start, len(positions))
+            for i, output in zip(positions, translated):
+                outputs[i] = {**output, **outputs[i]}
+        return outputs
+
+    def _plan_segments(
+        self, segments: Sequence[str], to_languages: Sequence[str], from_language: Optional[str] = None
+    ) -> Tuple[List[Optional[Dict[str, str]]], Dict[str, List[int]]]:
+        """
+        Fill in cached segments and group the remaining ones by text.
+
+        A segment is only served from the cache when every target language is cached.
+
+        Args:
+            segments (Sequence[str]): The texts to translate.
+            to_languages (Sequence[str]): The target languages to translate to.
+            from_language (Optional[str], optional): The source language, None when auto-detected.
+
+        Returns:
+            Tuple[List[Optional[Dict[str, str]]], Dict[str, List[int]]]: The translations found so far
+            (None where missing), and the positions of each distinct text that still has to be sent.
+        """
+        cache = self.translation_cache
+        translated: List[Optional[Dict[str, str]]] = [None] * len(segments)
+
+        if cache is not None:
+            keys = [[make_cache_key(segment, language, from_language) for language in to_languages]
+                    for segment in segments]
+            found = cache.get_many(key for segment_keys in keys for key in segment_keys)
+            for i, segment_keys in enumerate(keys):
+                if all(key in found for key in segment_keys):
+                    translated[i] = {language: found[key] for language, key in zip(to_languages, segment_keys)}
+            hits = sum(output is not None for output in translated)
+            self._get_metrics().record_cache(hits, len(segments) - hits)
+            _add_to_run_totals(cache_hits=hits, cache_misses=len(segments) - hits)
+
+        # Send each distinct missing segment once
+        pending: Dict[str, List[int]] = {}
+        for i, segment in enumerate(segments):
+            if translated[i] is None:
+                pending.setdefault(segment, []).append(i)
+        return translated, pending
+
+    def _record_outputs(
+        self,
+        translated: List[Optional[Dict[str, str]]],
+        pending: Dict[str, List[int]],
+        texts: List[str],
+        outputs: List[Dict[str, str]],
+        to_languages: Sequence[str],
+        from_language: Optional[str] = None
+    ) -> None:
+        """
+        Place the outputs of one request at every position of their text and cache them.
+        """
+        for text, output in zip(texts, outputs):
+            for i in pending[text]:
+                translated[i] = output
+        if self.translation_cache is not None:
+            self.translation_cache.put_many(
+                (make_cache_key(text, language, from_language), output[language])
+                for text, output in zip(texts, outputs)
+                for language in to_languages
+                if language in output
+            )
+
+    def _translate_segments(
+        self, segments: Sequence[str], to_languages: Sequence[str], max_chars: int, from_language: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Translate segments, reusing translation memory matches sentence by sentence when there is a memory.
+
+        Args:
+            segments (Sequence[str]): The texts to translate, each within max_chars.
+            to_languages (Sequence[str]): The target languages to translate to.
+            max_chars (int): The per-request character budget.
+            from_language (Optional[str], optional): The source language, None to let the service detect it.
+
+        Returns:
+            List[Dict[str, str]]: For each segment, in order, the translation for each target language.
+        """
+        if self.translation_memory is None:
+            return self._send_segments(segments, to_languages, max_chars, from_language)
+        plan, misses = self._plan_memory(segments, to_languages)
+        outputs = self._send_segments(misses, to_languages, max_chars, from_language)
+        return self._complete_memory(plan, misses, outputs, to_languages)
+
+    def _plan_memory(
+        self, segments: Sequence[str], to_languages: Sequence[str]
+    ) -> Tuple[List[Tuple[str, List[Tuple[str, str, Optional[Dict[str, str]]]]]], List[str]]:
+        """
+        Split segments into sentences and look each one up in the translation memory.
+
+        Returns:
+            Tuple[List[Tuple[str, List[Tuple[str, str, Optional[Dict[str, str]]]]]], List[str]]: For each
+            segment, its leading whitespace and its (sentence, separator, reused translations or None)
+            triples, and the distinct sentences that have to be translated.
+        """
+        memory = self.translation_memory
+        plan = []
+        misses: Dict[str, None] = {}
+        for segment in segments:
+            pieces = _split_sentences(segment)
+            # _split_sentences drops leading line breaks, which are kept as they are
+            prefix = segment[:len(segment) - sum(len(sentence) + len(separator) for sentence, separator in pieces)]
+            sentences = []
+            for sentence, separator in pieces:
+                reused: Optional[Dict[str, str]] = {}
+                for language in to_languages:
+                    translation = memory.lookup(sentence, language)
+                    if translation is None:
+                        reused = None
+                        misses.setdefault(sentence)
+                        break
+                    reused[language] = translation
+                sentences.append((sentence, separator, reused))
+            plan.append((prefix, sentences))
+        return plan, list(misses)
+
+    def _complete_memory(
+        self,
+        plan: List[Tuple[str, List[Tuple[str, str, Optional[Dict[str, str]]]]]],
+        misses: List[str],
+        outputs: List[Dict[str, str]],
+        to_languages: Sequence[str]
+    ) -> List[Dict[str, str]]:
+        """
+        Store the translations of the missed sentences and join each segment's sentences back together.
+        """
+        translated = dict(zip(misses, outputs))
+        for sentence, output in translated.items():
+            for language in to_languages:
+                if language in output:
+                    self.translation_memory.add(sentence, output[language], language)
+
+        return [
+            {
+                language: prefix + "".join(
+                    (reused if reused is not None else translated[sentence]).get(language, "") + separator
+                    for sentence, separator, reused in sentences
+                )
+                for language in to_languages
+            }
+            for prefix, sentences in plan
+        ]
+
+    def _send_segments(
+        self, segments: Sequence[str], to_languages: Sequence[str], max_chars: int, from_language: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Translate segments, serving repeats from the cache and packing the rest into requests.
+
+        Args:
+            segments (Sequence[str]): The texts to translate, each within max_chars.
+            to_languages (Sequence[str]): The target languages to translate to.
+            max_chars (int): The per-request character budget.
+            from_language (Optional[str], optional): The source language, None to let the service detect it.
+
+        Returns:
+            List[Dict[str, str]]: For each segment, in order, the translation for each target language.
+        """
+        translated, pending = self._plan_segments(segments, to_languages, from_language)
+        pending_texts = list(pending)
+
+        for request in pack_requests(pending_texts, self.max_request_elements, max_chars):
+            request_texts = [pending_texts[j] for j in request]
+            outputs = self._request_translations(request_texts, to_languages, from_language)
+            self._record_outputs(translated, pending, request_texts, outputs, to_languages, from_language)
+
+        return translated  # type: ignore[return-value]
+
+    def _request_translations(
+        self, texts: List[str], to_languages: Sequence[str], from_language: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Send a single translate request for all of the given texts and target languages.
+
+        Args:
+            texts (List[str]): The texts to translate, within the per-request limits.
+            to_languages (Sequence[str]): The target languages to translate to.
+            from_language (Optional[str], optional): The source language, None to let the service detect it.
+
+        Returns:
+            List[Dict[str, str]]: For each text, in order, the translation for each target language.
+        """
         # The request body should contain a list of dictionaries, where each dictionary contains the text to be translated
-        body = [{"Text": text}]  # Use "Text" as the key in the body (based on Translator API)
+        body = [{"Text": text} for text in texts]  # Use "Text" as the key in the body (based on Translator API)
+        characters = sum(len(text) for text in texts) * len(to_languages)
+
+        metrics = self._get_metrics()
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(characters)
+            timings: Dict[str, float] = {}
+            metrics.request_started()
+            start = time.perf_counter()
+            try:
+                response = self._get_client().translate(
+                    body=body,
+                    to_language=list(to_languages),  # The target languages must be passed as a list
+                    from_language=from_language,
+                    **self._timing_hooks(timings)
+                )
+                outputs = self._parse_response(texts, response)
+            except Exception as e:
+                self._record_request(metrics, start, timings, characters, e)
+                delay = self._retry_wait(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self._record_request(metrics, start, timings, characters)
+            if self.rate_limiter is not None:
+                self.rate_limiter.on_success()
+            return outputs
+
+    def _get_metrics(self) -> TranslatorMetrics:
+        return self.metrics or get_translator_metrics()
+
+    @staticmethod
+    def _timing_hooks(timings: Dict[str, float]) -> Dict[str, Any]:
+        """
+        SDK pipeline hooks that note when the request was sent and when its response arrived.
+        """
+        return {
+            "raw_request_hook": lambda request: timings.__setitem__("sent", time.perf_counter()),
+            "raw_response_hook": lambda response: timings.__setitem__("received", time.perf_counter()),
+        }
+
+    @staticmethod
+    def _record_request(
+        metrics: TranslatorMetrics,
+        start: float,
+        timings: Dict[str, float],
+        characters: int,
+        error: Optional[Exception] = None
+    ) -> None:
+        """
+        Record a finished request attempt in the metrics and in the totals of the current run.
+
+        The time before the request hook is spent building the request, the time between the hooks
+        waiting for the service, and the rest reading the response.
+        """
+        end = time.perf_counter()
+        phases = {}
+        if "sent" in timings and "received" in timings:
+            phases = {
+                "serialize": timings["sent"] - start,
+                "network": timings["received"] - timings["sent"],
+                "deserialize": end - timings["received"],
+            }
+        reason = None
+        if error is not None:
+            from azure.core.exceptions import HttpResponseError
+
+            status = getattr(error, "status_code", None)
+            reason = str(status) if isinstance(error, HttpResponseError) and status else type(error).__name__
+        metrics.request_finished(end - start, characters, phases, reason)
+        if error is None:
+            _add_to_run_totals(requests=1, characters=characters, seconds=end - start)
+        else:
+            _add_to_run_totals(requests=1, errors=1, seconds=end - start)
+
+    def _retry_wait(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Decide whether a failed request is retried, and after how long.
+
+        Throttling (429), server errors and connection errors are retried with jittered
+        exponential backoff, waiting at least as long as the service's Retry-After.
+        429 and 503 responses also slow down the rate limiter, if there is one.
+
+        Args:
+            error (Exception): The error raised by the request.
+            attempt (int): The number of retries already made.
+
+        Returns:
+            Optional[float]: Seconds to wait before retrying, or None when the error should be raised.
+        """
+        if attempt >= self.max_retries:
+            return None
+
+        from azure.core.exceptions import HttpResponseError, ServiceRequestError, ServiceResponseError
+
+        retry_after = None
+        throttled = False
+        if isinstance(error, HttpResponseError) and error.status_code in RETRYABLE_STATUS_CODES:
+            retry_after = parse_retry_after(error.response.headers if error.response is not None else None)
+            throttled = error.status_code in (429, 503)
+            if throttled and self.rate_limiter is not None:
+                self.rate_limiter.on_throttled(retry_after)
+        elif not isinstance(error, (ServiceRequestError, ServiceResponseError)):
+            return None
+
+        self._get_metrics().record_retry(throttled)
+        _add_to_run_totals(retries=1)
+        delay = retry_delay(attempt, retry_after, self.retry_backoff, self.retry_backoff_max)
+        logger.warning(f"Translate request failed ({error}), retrying in {delay:.2f}s")
+        return delay
+
+    @staticmethod
+    def _parse_response(texts: List[str], response: Any) -> List[Dict[str, str]]:
+        """
+        Check a translate response against its request and extract the translations.
+        """
+        if not response:
+            raise ValueError("Translation failed with an empty response.")
+        if len(response) != len(texts):
+            raise ValueError(f"Expected {len(texts)} translations but received {len(response)}.")
+
+        return [{translation.to: translation.text for translation in item.translations} for item in response]
+
+    def _segment_texts(self, texts: Sequence[str], max_chars: int) -> Tuple[List[str], List[Tuple[int, str, str]]]:
+        """
+        Split the non-empty texts of a batch into segments of at most max_chars characters.
+
+        Returns:
+            Tuple[List[str], List[Tuple[int, str, str]]]: The segments to translate, and for every piece
+            of every text the index of its input text, the piece and the separator that followed it.
+            Whitespace-only pieces are not translated.
+        """
+        segments: List[str] = []
+        owners: List[Tuple[int, str, str]] = []
+        for index, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            for piece, separator in split_text(text, max_chars):
+                if piece.strip():
+                    segments.append(piece)
+                owners.append((index, piece, separator))
+        return segments, owners
+
+    @staticmethod
+    def _assemble(
+        texts: Sequence[str],
+        owners: List[Tuple[int, str, str]],
+        translated: List[Dict[str, str]],
+        to_languages: Sequence[str]
+    ) -> List[Union[Dict[str, str], str]]:
+        """
+        Join translated segments back into one result per input text.
+        """
+        outputs = iter(translated)
+        parts: Dict[int, List[Tuple[Optional[Dict[str, str]], str, str]]] = {}
+        for index, piece, separator in owners:
+            parts.setdefault(index, []).append((next(outputs) if piece.strip() else None, piece, separator))
+
+        results: List[Union[Dict[str, str], str]] = list(texts)
+        for index, pieces in parts.items():
+            results[index] = {
+                language: "".join(
+                    (output.get(language, "") if output is not None else piece) + separator
+                    for output, piece, separator in pieces
+                )
+                for language in to_languages
+            }
+        return results
+
+    def _batch_budget(self, to_languages: Sequence[str]) -> int:
+        """
+        The per-request character budget of a source text when translating into to_languages.
+        """
+        if not to_languages:
+            raise ValueError("At least one target language is required.")
+        return max(1, self.max_request_characters // len(to_languages))
+
+    def translate_batch(self, texts: Sequence[str], to_language: str) -> List[str]:
+        """
+        Translate many texts using as few Translator requests as possible.
+
+        Texts are packed into requests that respect max_request_elements and
+        max_request_characters, and repeated or cached texts are not sent again.
+        A text longer than max_request_characters is split at sentence boundaries
+        and its translated pieces are joined back together.
+        Empty or whitespace-only texts are returned unchanged without being sent.
+
+        Args:
+            texts (Sequence[str]): The texts to be translated.
+            to_language (str): The target language to translate to.
+
+        Returns:
+            List[str]: The translations, where item i is the translation of texts[i].
+        """
+        return [result.get(to_language, "") if isinstance(result, dict) else result
+                for result in self.translate_batch_multi(texts, [to_language])]
+
+    def translate_batch_multi(
+        self, texts: Sequence[str], to_languages: Sequence[str]
+    ) -> List[Union[Dict[str, str], str]]:
+        """
+        Translate many texts into several languages using as few Translator requests as possible.
+
+        Every request carries all target languages. The service counts each character once
+        per target language, so the per-request character budget is shared between them.
+
+        Args:
+            texts (Sequence[str]): The texts to be translated.
+            to_languages (Sequence[str]): The target languages to translate to.
+
+        Returns:
+            List[Union[Dict[str, str], str]]: For each text, a mapping of language to translation.
+            Empty or whitespace-only texts are returned unchanged as strings.
+        """
+        max_chars = self._batch_budget(to_languages)
+        segments, owners = self._segment_texts(texts, max_chars)
 
         try:
-            # Correct call to the SDK, ensuring that the body and to_language are passed properly
-            response = self.translate_client.translate(
-                body=body,  # The body should be passed here
-                to_language=[to_language]  # The target language must be passed as a list
+            translated = self._translate_filtered(segments, to_languages, max_chars)
+        except Exception as e:
+            logger.error(f"Batch translation failed: {str(e)}")
+            raise RuntimeError(f"Error during batch translation: {e}")
+
+        return self._assemble(texts, owners, translated, to_languages)
+
+    def _translate_pieces(self, pieces: List[Tuple[str, str]], to_language: str, max_chars: int) -> List[str]:
+        """
+        Translate one request's worth of pieces for translate_stream.
+
+        Returns:
+            List[str]: Each translated piece followed by its separator. Whitespace-only pieces are kept as is.
+        """
+        texts = [piece for piece, _ in pieces if piece.strip()]
+        translated = iter(self._translate_filtered(texts, [to_language], max_chars))
+        return [
+            (next(translated).get(to_language, "") if piece.strip() else piece) + separator
+            for piece, separator in pieces
+        ]
+
+    def translate_stream(
+        self,
+        source: Union[str, Iterable[str]],
+        to_language: str = DEFAULT_TO_LANGUAGE,
+        segment_chars: int = 2000,
+        max_in_flight: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Translate a document of any size, reading and yielding it incrementally.
+
+        The source is split into sentences, merged into segments of up to segment_chars
+        characters and packed into requests. Up to max_in_flight requests are sent
+        concurrently; reading stops while that many are waiting, so memory stays bounded
+        by about max_in_flight requests whatever the size of the source.
+
+        Args:
+            source (Union[str, Iterable[str]]): The text, or an iterable of text chunks such as an open file.
+            to_language (str, optional): The target language, French by default.
+            segment_chars (int, optional): The maximum number of characters per segment.
+            max_in_flight (Optional[int], optional): The maximum number of requests in flight,
+                max_concurrent_requests when None.
+
+        Yields:
+            str: The translated segments in source order, each followed by the whitespace that
+            followed it in the source, so "".join(...) is the translated document.
+        """
+        if isinstance(source, str):
+            source = [source]
+        max_chars = self._batch_budget([to_language])
+        max_in_flight = max_in_flight or self.max_concurrent_requests
+        pieces = split_stream(source, min(segment_chars, max_chars))
+
+        executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="translate-stream")
+        in_flight: Deque[Future] = deque()
+        try:
+            request: List[Tuple[str, str]] = []
+            request_chars = 0
+            for piece, separator in pieces:
+                if request and (len(request) >= self.max_request_elements or request_chars + len(piece) > max_chars):
+                    in_flight.append(executor.submit(self._translate_pieces, request, to_language, max_chars))
+                    request, request_chars = [], 0
+                    # Backpressure: wait for the oldest request before reading further
+                    while len(in_flight) >= max_in_flight or (in_flight and in_flight[0].done()):
+                        yield from self._stream_result(in_flight.popleft())
+                request.append((piece, separator))
+                request_chars += len(piece)
+            if request:
+                in_flight.append(executor.submit(self._translate_pieces, request, to_language, max_chars))
+            while in_flight:
+                yield from self._stream_result(in_flight.popleft())
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _stream_result(future: Future) -> List[str]:
+        try:
+            return future.result()
+        except Exception as e:
+            logger.error(f"Stream translation failed: {str(e)}")
+            raise RuntimeError(f"Error during stream translation: {e}")
+
+    async def _aget_async_client(self) -> Tuple[Any, asyncio.Semaphore]:
+        """
+        Return the async Translator client and request semaphore for the running event loop.
+
+        The client keeps one HTTP session that all async calls on its loop share. Event loops
+        cannot share sessions, so every loop the tool is used from gets a client of its own,
+        held only as long as the loop exists. Clients of loops that have been closed since are
+        closed here, on the running loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_clients is None:
+            self._async_clients = weakref.WeakKeyDictionary()
+        entry = self._async_clients.get(loop)
+        if entry is None:
+            from azure.ai.translation.text.aio import TextTranslationClient as AsyncTextTranslationClient
+            from azure.core.credentials import AzureKeyCredential
+
+            # Stored before anything is awaited, so concurrent callers on this loop share it
+            entry = self._async_clients[loop] = (
+                AsyncTextTranslationClient(
+                    endpoint=self.translate_endpoint,
+                    credential=AzureKeyCredential(self.translate_key),
+                    retry_total=0
+                ),
+                asyncio.Semaphore(self.max_concurrent_requests),
             )
+            await self._aclose_closed_loop_clients()
+        return entry
 
-            if response:
-                # Extract and return the translation result
-                return response[0].translations[0].text
-            else:
-                raise ValueError("Translation failed with an empty response.")
+    async def _aclose_closed_loop_clients(self) -> None:
+        """
+        Close the async clients of event loops that have been closed, which releases their HTTP
+        sessions and connection pools. Clients of loops still running in other threads are kept.
+        """
+        closed = [loop for loop in list(self._async_clients.keys()) if loop.is_closed()]
+        for loop in closed:
+            client, _ = self._async_clients.pop(loop)
+            try:
+                await client.close()
+            except Exception as e:
+                logger.debug(f"Closing the async Translator client of a closed event loop failed: {str(e)}")
+
+    async def _arequest_translations(
+        self, texts: List[str], to_languages: Sequence[str], from_language: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Async version of _request_translations, limited to max_concurrent_requests in flight
+        and with the same retry scheduling.
+        """
+        client, semaphore = await self._aget_async_client()
+        body = [{"Text": text} for text in texts]
+        characters = sum(len(text) for text in texts) * len(to_languages)
+
+        metrics = self._get_metrics()
+        attempt = 0
+        while True:
+            async with semaphore:
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.aacquire(characters)
+                timings: Dict[str, float] = {}
+                metrics.request_started()
+                start = time.perf_counter()
+                try:
+                    response = await client.translate(
+                        body=body,
+                        to_language=list(to_languages),
+                        from_language=from_language,
+                        **self._timing_hooks(timings)
+                    )
+                    outputs = self._parse_response(texts, response)
+                except Exception as e:
+                    self._record_request(metrics, start, timings, characters, e)
+                    delay = self._retry_wait(e, attempt)
+                    if delay is None:
+                        raise
+                else:
+                    self._record_request(metrics, start, timings, characters)
+                    if self.rate_limiter is not None:
+                        self.rate_limiter.on_success()
+                    return outputs
+            # Wait outside the semaphore so other requests can use the slot
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _atranslate_segments(
+        self, segments: Sequence[str], to_languages: Sequence[str], max_chars: int, from_language: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Async version of _translate_segments.
+        """
+        if self.translation_memory is None:
+            return await self._asend_segments(segments, to_languages, max_chars, from_language)
+        plan, misses = self._plan_memory(segments, to_languages)
+        outputs = await self._asend_segments(misses, to_languages, max_chars, from_language)
+        return self._complete_memory(plan, misses, outputs, to_languages)
+
+    async def _atranslate_filtered(
+        self, segments: Sequence[str], to_languages: Sequence[str], max_chars: int
+    ) -> List[Dict[str, str]]:
+        """
+        Async version of _translate_filtered. The groups of segments are translated concurrently.
+        """
+        if self.language_filter is None:
+            return await self._atranslate_segments(segments, to_languages, max_chars)
+        outputs, groups = self._plan_filter(segments, to_languages)
+
+        async def translate_group(
+            remaining: Tuple[str, ...], from_language: Optional[str], positions: List[int]
+        ) -> None:
+            start = time.perf_counter()
+            translated = await self._atranslate_segments(
+                [segments[i] for i in positions], remaining, max_chars, from_language
+            )
+            self.language_filter.record_translation(time.perf_counter() - start, len(positions))
+            for i, output in zip(positions, translated):
+                outputs[i] = {**output, **outputs[i]}
+
+        await asyncio.gather(*(translate_group(*group, positions) for group, positions in groups.items()))
+        return outputs
+
+    async def _asend_segments(
+        self, segments: Sequence[str], to_languages: Sequence[str], max_chars: int, from_language: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Async version of _send_segments that sends the packed requests concurrently.
+        """
+        translated, pending = self._plan_segments(segments, to_languages, from_language)
+        pending_texts = list(pending)
+        requests = [
+            [pending_texts[j] for j in request]
+            for request in pack_requests(pending_texts, self.max_request_elements, max_chars)
+        ]
+
+        # gather returns the outputs in request order, whatever order they complete in
+        outputs = await asyncio.gather(
+            *(self._arequest_translations(texts, to_languages, from_language) for texts in requests)
+        )
+        for request_texts, request_outputs in zip(requests, outputs):
+            self._record_outputs(translated, pending, request_texts, request_outputs, to_languages, from_language)
+
+        return translated  # type: ignore[return-value]
+
+    async def _atranslate_to_languages(self, text: str, to_languages: Sequence[str]) -> Dict[str, str]:
+        """
+        Async version of _translate_to_languages.
+        """
+        if not text:
+            raise ValueError("Input text for translation is empty.")
+        if not to_languages:
+            raise ValueError("At least one target language is required.")
+
+        try:
+            return (await self._atranslate_filtered([text], to_languages, self.max_request_characters))[0]
         except Exception as e:
             logger.error(f"Translation failed: {str(e)}")
             raise RuntimeError(f"Error during translation: {e}")
 
-    def _run(self, query: str, run_manager: Optional[CallbackManagerForToolRun] = None) -> str:
+    async def atranslate_batch(self, texts: Sequence[str], to_language: str) -> List[str]:
+        """
+        Async version of translate_batch. Up to max_concurrent_requests requests are in flight at once.
+        """
+        return [result.get(to_language, "") if isinstance(result, dict) else result
+                for result in await self.atranslate_batch_multi(texts, [to_language])]
+
+    async def atranslate_batch_multi(
+        self, texts: Sequence[str], to_languages: Sequence[str]
+    ) -> List[Union[Dict[str, str], str]]:
+        """
+        Async version of translate_batch_multi. Up to max_concurrent_requests requests are in flight at once.
+        """
+        max_chars = self._batch_budget(to_languages)
+        segments, owners = self._segment_texts(texts, max_chars)
+
+        try:
+            translated = await self._atranslate_filtered(segments, to_languages, max_chars)
+        except Exception as e:
+            logger.error(f"Batch translation failed: {str(e)}")
+            raise RuntimeError(f"Error during batch translation: {e}")
+
+        return self._assemble(texts, owners, translated, to_languages)
+
+    async def aclose(self) -> None:
+        """
+        Close the HTTP session of the async client of the running event loop, if one was opened,
+        and those of event loops that have been closed.
+        """
+        if self._async_clients is None:
+            return
+        entry = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await entry[0].close()
+        await self._aclose_closed_loop_clients()
+
+    def _run(
+        self,
+        query: str,
+        to_language: str = DEFAULT_TO_LANGUAGE,
+        to_languages: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForToolRun] = None
+    ) -> Union[str, Dict[str, str]]:
         """
         Run the tool to perform translation.
 
         Args:
             query (str): The text to be translated.
+            to_language (str, optional): The target language, French by default.
+            to_languages (Optional[List[str]], optional): Several target languages to translate to in one request.
             run_manager (Optional[CallbackManagerForToolRun], optional): A callback manager for tracking the tool run.
+                It receives the run's request, character, error, retry, cache and language filter skip
+                totals as a RUN_METRICS_EVENT custom event.
 
         Returns:
-            str: The translated text.
+            Union[str, Dict[str, str]]: The translated text, or a mapping of language to translation
+            when to_languages is given.
         """
+        token = _run_totals.set(_new_run_totals())
+        start = time.perf_counter()
         try:
-            to_language = "fr"  # Default to French translation
+            if to_languages:
+                return self._translate_to_languages(query, to_languages)
             return self._translate_text(query, to_language)
         except Exception as e:
             raise RuntimeError(f"Error while running AzureTranslateTool: {e}")
+        finally:
+            totals = _run_totals.get()
+            _run_totals.reset(token)
+            if run_manager is not None:
+                totals["duration"] = time.perf_counter() - start
+                # Reported like dispatch_custom_event does, as an event of this tool run
+                run_manager.get_child().on_custom_event(RUN_METRICS_EVENT, totals, run_id=run_manager.run_id)
+
+    async def _arun(
+        self,
+        query: str,
+        to_language: str = DEFAULT_TO_LANGUAGE,
+        to_languages: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None
+    ) -> Union[str, Dict[str, str]]:
+        """
+        Run the tool asynchronously, without blocking the event loop.
+
+        Args:
+            query (str): The text to be translated.
+            to_language (str, optional): The target language, French by default.
+            to_languages (Optional[List[str]], optional): Several target languages to translate to in one request.
+            run_manager (Optional[AsyncCallbackManagerForToolRun], optional): A callback manager for tracking the tool run.
+
+        Returns:
+            Union[str, Dict[str, str]]: The translated text, or a mapping of language to translation
+            when to_languages is given.
+        """
+        token = _run_totals.set(_new_run_totals())
+        start = time.perf_counter()
+        try:
+            if to_languages:
+                return await self._atranslate_to_languages(query, to_languages)
+            return (await self._atranslate_to_languages(query, [to_language]))[to_language]
+        except Exception as e:
+            raise RuntimeError(f"Error while running AzureTranslateTool: {e}")
+        finally:
+            totals = _run_totals.get()
+            _run_totals.reset(token)
+            if run_manager is not None:
+                totals["duration"] = time.perf_counter() - start
+                await run_manager.get_child().on_custom_event(RUN_METRICS_EVENT, totals, run_id=run_manager.run_id)
 
     @classmethod
-    def from_env(cls):
+    def from_env(cls, prewarm: bool = False):
         """
         Create an instance of the tool using environment variables.
+
+        Args:
+            prewarm (bool, optional): Create the client and open its connection in the background.
         """
         translate_key = os.getenv("AZURE_OPENAI_TRANSLATE_API_KEY")
         translate_endpoint = os.getenv("AZURE_OPENAI_TRANSLATE_ENDPOINT")
@@ -117,10 +1204,9 @@ class AzureTranslateTool(BaseTool):
         if not translate_endpoint:
             raise ValueError("AZURE_TRANSLATE_ENDPOINT is missing in environment variables")
 
-        print(f"API Key: {translate_key[:4]}**** (masked)")
-        print(f"Endpoint: {translate_endpoint}")
+        logger.debug(f"Translator API key: {translate_key[:4]}**** (masked), endpoint: {translate_endpoint}")
 
-        return cls(translate_key=translate_key, translate_endpoint=translate_endpoint)
+        return cls(translate_key=translate_key, translate_endpoint=translate_endpoint, prewarm=prewarm)
 
 
 # Example test usage for the AzureTranslateTool
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text before it is hashed, so trivially different inputs share a cache entry.
+
+    Args:
+        text (str): The source text.
+
+    Returns:
+        str: The NFC-normalized text without surrounding whitespace.
+    """
+    return unicodedata.normalize("NFC", text).strip()
+
+
+def make_cache_key(
+    text: str,
+    to_language: str,
+    from_language: Optional[str] = None,
+    options: Optional[Mapping[str, Any]] = None
+) -> str:
+    """
+    Build the content-addressed key of a translation.
+
+    Args:
+        text (str): The source text.
+        to_language (str): The target language.
+        from_language (Optional[str], optional): The source language, None when auto-detected.
+        options (Optional[Mapping[str, Any]], optional): Any other request options that change the output.
+
+    Returns:
+        str: A hex SHA-256 digest of the normalized text, languages and options.
+    """
+    payload = json.dumps(
+        [normalize_text(text), from_language, to_language, dict(options or {})],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TwoTierCache:
+    """
+    A thread-safe, two-tier cache.
+
+    Entries live in an in-memory LRU tier bounded by max_entries. When a path is given,
+    every entry is also written to a SQLite database, so entries survive restarts and
+    entries evicted from memory can still be served from disk.
+
+    Both tiers hold a value in the same stored form, made by _encode, and every lookup
+    returns a new value made by _decode. Values come back the same from either tier, and
+    changing a returned value does not change the cache. Subclasses set the table and
+    column the entries are kept in, and how values are stored.
+    """
+
+    _table = "entries"
+    _column = "value TEXT"
+
+    def __init__(self, max_entries: int = 10000, path: Optional[str] = None) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int, optional): The maximum number of entries kept in memory.
+            path (Optional[str], optional): A SQLite database file for the durable tier.
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be a positive integer.")
+
+        self.max_entries = max_entries
+        self.path = path
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._value_column = self._column.split()[0]
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS {self._table} (key TEXT PRIMARY KEY, {self._column} NOT NULL)")
+            self._db.commit()
+
+    def _encode(self, value: Any) -> Any:
+        """
+        The form a value is stored in, in memory and on disk.
+        """
+        return value
+
+    def _decode(self, stored: Any) -> Any:
+        """
+        The value to return for a stored one.
+        """
+        return stored
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._memory)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a value.
+
+        Args:
+            key (str): The key of the value.
+
+        Returns:
+            Optional[Any]: The cached value, or None on a miss.
+        """
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Look up several values at once.
+
+        Args:
+            keys (Iterable[str]): The keys of the values.
+
+        Returns:
+            Dict[str, Any]: The values that were found, by key.
+        """
+        found: Dict[str, Any] = {}
+        with self._lock:
+            missing: List[str] = []
+            for key in keys:
+                stored = self._memory.get(key)
+                if stored is None:
+                    missing.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    found[key] = stored
+            self.hits += len(found)
+
+            if missing and self._db is not None:
+                query = f"SELECT {self._value_column} FROM {self._table} WHERE key = ?"
+                for key in missing:
+                    row = self._db.execute(query, (key,)).fetchone()
+                    if row is not None:
+                        found[key] = row[0]
+                        self.disk_hits += 1
+                        self.hits += 1
+                        self._remember(key, row[0])
+
+            self.misses += sum(1 for key in missing if key not in found)
+        return {key: self._decode(stored) for key, stored in found.items()}
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Store a value.
+
+        Args:
+            key (str): The key of the value.
+            value (Any): The value.
+        """
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        """
+        Store several values, writing them to disk in a single transaction.
+
+        Args:
+            items (Iterable[Tuple[str, Any]]): (key, value) pairs.
+        """
+        items = [(key, self._encode(value)) for key, value in items]
+        with self._lock:
+            for key, stored in items:
+                self._remember(key, stored)
+            if self._db is not None and items:
+                self._db.executemany(
+                    f"INSERT OR REPLACE INTO {self._table} (key, {self._value_column}) VALUES (?, ?)", items
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, stored: Any) -> None:
+        # Caller holds the lock
+        self._memory[key] = stored
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report the cache counters.
+
+        Returns:
+            Dict[str, int]: hits (including disk_hits), disk_hits, misses, evictions and the in-memory size.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._memory),
+            }
+
+    def clear(self) -> None:
+        """
+        Remove every entry from both tiers. Counters are left untouched.
+        """
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute(f"DELETE FROM {self._table}")
+                self._db.commit()
+
+    def close(self) -> None:
+        """
+        Close the on-disk tier. The in-memory tier keeps working.
+        """
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __enter__(self) -> "TwoTierCache":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class TranslationCache(TwoTierCache):
+    """
+    A thread-safe, two-tier cache of translations, keyed with make_cache_key. With a path,
+    translations survive restarts.
+    """
+
+    _table = "translations"
+    _column = "value TEXT"
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import difflib
+import json
+import re
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Placeholders are replaced by numbered markers before matching, so sentences that only differ
+# in these values share one memory entry. Earlier patterns take precedence.
+PLACEHOLDER_PATTERNS = (
+    ("url", r"(?:https?://|www\.)[^\s<>\"']*[^\s<>\"'.,;:!?)\]]"),
+    ("email", r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+"),
+    ("variable", r"\{[A-Za-z_][A-Za-z0-9_]*\}"),
+    ("number", r"(?<![\w.])\d+(?:[.,:/]\d+)*(?!\w)"),
+)
+_PLACEHOLDER = re.compile("|".join(f"(?P<{kind}>{pattern})" for kind, pattern in PLACEHOLDER_PATTERNS))
+_MARKER = re.compile("⟦(\\d+)⟧")
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+
+def _marker(index: int) -> str:
+    return f"⟦{index}⟧"
+
+
+def mask_placeholders(text: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Replace URLs, e-mail addresses, {variables} and numbers with numbered markers.
+
+    Args:
+        text (str): The text to mask.
+
+    Returns:
+        Tuple[str, List[Tuple[str, str]]]: The masked text, and the (kind, value) of each marker in order.
+    """
+    placeholders: List[Tuple[str, str]] = []
+
+    def replace(match: re.Match) -> str:
+        placeholders.append((match.lastgroup, match.group()))
+        return _marker(len(placeholders) - 1)
+
+    return _PLACEHOLDER.sub(replace, text), placeholders
+
+
+def fill_placeholders(masked: str, values: List[str]) -> str:
+    """
+    Put values back in place of the markers of a masked text.
+    """
+    return _MARKER.sub(lambda match: values[int(match.group(1))], masked)
+
+
+def _normalize(masked: str) -> str:
+    return " ".join(masked.split())
+
+
+def _shingles(masked: str, size: int) -> Set[str]:
+    text = _normalize(masked).lower()
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def _replace_once(text: str, old: str, new: str) -> Optional[str]:
+    # Replace old when it occurs exactly once as whole words outside markers, otherwise give up
+    matches = list(re.finditer(rf"(?<![\w⟦]){re.escape(old)}(?![\w⟧])", text))
+    if len(matches) != 1:
+        return None
+    return text[:matches[0].start()] + new + text[matches[0].end():]
+
+
+def _is_name(tokens: List[re.Match]) -> bool:
+    # Capitalized words only: ordinary words are translated, so they cannot be copied over
+    return all(not token.group().isalpha() or token.group()[0].isupper() for token in tokens)
+
+
+class TranslationMemory:
+    """
+    A translation memory that reuses the translations of templated sentences.
+
+    Each stored sentence is masked (see mask_placeholders) and kept with its translation, in
+    which the placeholder values are replaced by the same markers. A sentence that masks to the
+    same text as a stored one, so differs from it only in numbers, e-mail addresses, URLs or
+    {variables}, reuses its translation; any other sentence is left to the Translator.
+
+    With patch_words, near-duplicates are reused too. A MinHash/LSH index over character
+    shingles proposes candidates, which match when the share of words they have in common with
+    the sentence (difflib's ratio) reaches threshold. The words that differ from a fuzzy match
+    must be names (capitalized words), which are patched into the stored translation when they
+    occur in it verbatim; the match is rejected otherwise, so a reused translation never keeps
+    words from a different sentence, nor source-language words.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 3,
+        seed: int = 0,
+        patch_words: bool = False
+    ) -> None:
+        """
+        Initialize an empty memory.
+
+        Args:
+            threshold (float, optional): The minimum word similarity of a fuzzy match.
+            num_perm (int, optional): The number of MinHash permutations.
+            bands (int, optional): The number of LSH bands; num_perm must be a multiple of it.
+            shingle_size (int, optional): The length of the character shingles.
+            seed (int, optional): The seed of the MinHash permutations.
+            patch_words (bool, optional): Also reuse the translations of sentences that differ in
+                a few names, patching the names into the translation.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands.")
+        self.threshold = threshold
+        self.patch_words = patch_words
+        self.shingle_size = shingle_size
+        self.bands = bands
+        rng = np.random.default_rng(seed)
+        # Below 2**31, so a * hash + b stays within 64 bits for 32-bit hashes
+        self._a = rng.integers(1, 1 << 31, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, num_perm, dtype=np.uint64)
+
+        self._lock = threading.Lock()
+        # (to_language, normalized masked source) -> (masked source, placeholder kinds, masked translation)
+        self._entries: Dict[Tuple[str, str], Tuple[str, Tuple[str, ...], str]] = {}
+        self._buckets: Dict[Tuple[str, int, bytes], List[Tuple[str, str]]] = {}
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+        self.rejected = 0  # Fuzzy candidates whose differences could not be patched
+        self.unstorable = 0  # Translations that changed a placeholder value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _band_keys(self, to_language: str, masked: str) -> List[Tuple[str, int, bytes]]:
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in _shingles(masked, self.shingle_size)),
+            dtype=np.uint64,
+        )
+        signature = ((self._a[:, None] * hashes[None, :] + self._b[:, None]) % _MERSENNE_PRIME).min(axis=1)
+        rows = len(signature) // self.bands
+        return [(to_language, band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(self.bands)]
+
+    def add(self, source: str, translation: str, to_language: str) -> bool:
+        """
+        Store the translation of a sentence.
+
+        Args:
+            source (str): The source sentence.
+            translation (str): Its translation.
+            to_language (str): The language of the translation.
+
+        Returns:
+            bool: False when the translation could not be stored because a placeholder value
+            does not appear unchanged in it (e.g. a reformatted number).
+        """
+        masked, placeholders = mask_placeholders(source)
+        masked_translation = translation
+        for index, (_, value) in enumerate(placeholders):
+            masked_translation = _replace_once(masked_translation, value, _marker(index))
+            if masked_translation is None:
+                with self._lock:
+                    self.unstorable += 1
+                return False
+
+        key = (to_language, _normalize(masked))
+        kinds = tuple(kind for kind, _ in placeholders)
+        band_keys = self._band_keys(to_language, masked)
+        with self._lock:
+            if key not in self._entries:
+                for band_key in band_keys:
+                    self._buckets.setdefault(band_key, []).append(key)
+            self._entries[key] = (masked, kinds, masked_translation)
+        return True
+
+    def lookup(self, source: str, to_language: str) -> Optional[str]:
+        """
+        Find a reusable translation of a sentence.
+
+        Args:
+            source (str): The source sentence.
+            to_language (str): The target language.
+
+        Returns:
+            Optional[str]: The translation, with this sentence's placeholder values, or None.
+        """
+        masked, placeholders = mask_placeholders(source)
+        kinds = tuple(kind for kind, _ in placeholders)
+        values = [value for _, value in placeholders]
+
+        with self._lock:
+            entry = self._entries.get((to_language, _normalize(masked)))
+        if entry is not None and entry[1] == kinds:
+            with self._lock:
+                self.exact_hits += 1
+            return fill_placeholders(entry[2], values)
+
+        translation = self._fuzzy_lookup(masked, kinds, to_language) if self.patch_words else None
+        with self._lock:
+            if translation is None:
+                self.misses += 1
+            else:
+                self.fuzzy_hits += 1
+        return fill_placeholders(translation, values) if translation is not None else None
+
+    def _fuzzy_lookup(self, masked: str, kinds: Tuple[str, ...], to_language: str) -> Optional[str]:
+        band_keys = self._band_keys(to_language, masked)
+        with self._lock:
+            if not self._buckets:
+                return None
+            candidates = {key for band_key in band_keys for key in self._buckets.get(band_key, ())}
+            entries = [self._entries[key] for key in candidates]
+
+        new_tokens = list(_TOKEN.finditer(masked))
+        scored = []
+        for stored, stored_kinds, stored_translation in entries:
+            if stored_kinds != kinds:
+                continue
+            old_tokens = list(_TOKEN.finditer(stored))
+            matcher = difflib.SequenceMatcher(
+                None, [t.group() for t in old_tokens], [t.group() for t in new_tokens], autojunk=False
+            )
+            similarity = matcher.ratio()
+            if similarity >= self.threshold:
+                scored.append((similarity, matcher, stored, old_tokens, stored_translation))
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        for _, matcher, stored, old_tokens, stored_translation in scored:
+            translation = self._patch(matcher, stored, old_tokens, masked, new_tokens, stored_translation)
+            if translation is not None:
+                return translation
+            with self._lock:
+                self.rejected += 1
+        return None
+
+    @staticmethod
+    def _patch(
+        matcher: difflib.SequenceMatcher,
+        stored: str,
+        old_tokens: List[re.Match],
+        masked: str,
+        new_tokens: List[re.Match],
+        translation: str
+    ) -> Optional[str]:
+        """
+        Carry the word differences between a stored sentence and a new one over to the stored translation.
+
+        Returns:
+            Optional[str]: The patched translation, or None when a difference cannot be carried over.
+        """
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                continue
+            if tag != "replace":
+                # An added or removed word has no place to go in the translation
+                return None
+            if not _is_name(old_tokens[i1:i2]) or not _is_name(new_tokens[j1:j2]):
+                return None
+            old = stored[old_tokens[i1].start():old_tokens[i2 - 1].end()]
+            new = masked[new_tokens[j1].start():new_tokens[j2 - 1].end()]
+            translation = _replace_once(translation, old, new)
+            if translation is None:
+                return None
+        return translation
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report the lookup counters and the number of stored entries.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "fuzzy_hits": self.fuzzy_hits,
+                "misses": self.misses,
+                "rejected": self.rejected,
+                "unstorable": self.unstorable,
+            }
+
+    def save(self, path: str) -> None:
+        """
+        Write the entries to a JSON lines file.
+        """
+        with self._lock:
+            entries = list(self._entries.items())
+        with open(path, "w", encoding="utf-8") as f:
+            for (to_language, _), (masked, kinds, masked_translation) in entries:
+                f.write(json.dumps({"to": to_language, "source": masked, "kinds": kinds,
+                                    "translation": masked_translation}, ensure_ascii=False) + "\n")
+
+    def load(self, path: str) -> None:
+        """
+        Add the entries of a file written by save.
+        """
+        with open(path, encoding="utf-8") as f:
+            self._add_masked(json.loads(line) for line in f if line.strip())
+
+    def _add_masked(self, records: Iterable[Dict]) -> None:
+        for record in records:
+            key = (record["to"], _normalize(record["source"]))
+            band_keys = self._band_keys(record["to"], record["source"])
+            with self._lock:
+                if key not in self._entries:
+                    for band_key in band_keys:
+                        self._buckets.setdefault(band_key, []).append(key)
+                self._entries[key] = (record["source"], tuple(record["kinds"]), record["translation"])
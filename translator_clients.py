@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    import requests
+    from azure.ai.translation.text import TextTranslationClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 10
+
+
+@lru_cache(maxsize=None)
+def _counting_adapter_class() -> type:
+    """
+    Build the HTTPAdapter subclass that counts the requests it sends and the connections it opens.
+
+    requests and urllib3 are only imported here, when the first session is opened, so that
+    importing this module (and the tool) stays cheap.
+    """
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class _CountingAdapter(HTTPAdapter):
+        """
+        An HTTPAdapter that counts the requests it sends and the connections it opens.
+        """
+
+        def __init__(self, **kwargs: Any) -> None:
+            self.requests_sent = 0
+            self.connections_opened = 0
+            self._counter_lock = threading.Lock()
+            super().__init__(**kwargs)
+
+        def _connection_opened(self) -> None:
+            with self._counter_lock:
+                self.connections_opened += 1
+
+        def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+            super().init_poolmanager(*args, **kwargs)
+            adapter = self
+
+            class _HTTPConnection(HTTPConnection):
+                def connect(self) -> None:
+                    adapter._connection_opened()
+                    super().connect()
+
+            class _HTTPSConnection(HTTPSConnection):
+                def connect(self) -> None:
+                    adapter._connection_opened()
+                    super().connect()
+
+            class _HTTPConnectionPool(HTTPConnectionPool):
+                ConnectionCls = _HTTPConnection
+
+            class _HTTPSConnectionPool(HTTPSConnectionPool):
+                ConnectionCls = _HTTPSConnection
+
+            self.poolmanager.pool_classes_by_scheme = {"http": _HTTPConnectionPool, "https": _HTTPSConnectionPool}
+
+        def send(self, request: Any, **kwargs: Any) -> Any:
+            with self._counter_lock:
+                self.requests_sent += 1
+            return super().send(request, **kwargs)
+
+    return _CountingAdapter
+
+
+class TranslatorClientRegistry:
+    """
+    A process-wide registry of TextTranslationClient instances.
+
+    Clients are keyed by (endpoint, SHA-256 of the key, client options), so every tool that
+    uses the same Translator resource with the same options gets the same client. All clients send their requests through one
+    pooled HTTP session, so connections (and their TLS handshakes) are reused across tools.
+    The Azure SDK and requests are imported when the first client is created.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, keep_alive: bool = True) -> None:
+        """
+        Initialize the registry.
+
+        Args:
+            pool_size (int, optional): The maximum number of pooled connections kept per host. Size it
+                to the number of threads sending requests at once: requests beyond it still get a
+                connection, but it is closed after use instead of returned to the pool.
+            keep_alive (bool, optional): Keep connections open between requests. When False every
+                request asks the service to close its connection.
+        """
+        if pool_size <= 0:
+            raise ValueError("pool_size must be a positive integer.")
+
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self._clients: Dict[Tuple[str, str, Tuple[Tuple[str, str], ...]], TextTranslationClient] = {}
+        self._lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+        self._adapter: Any = None
+        self.client_hits = 0
+        self.client_misses = 0
+
+    def _get_session(self) -> requests.Session:
+        # Caller holds the lock
+        if self._session is None:
+            import requests
+            from urllib3.util.retry import Retry
+
+            session = requests.Session()
+            # Retries are left to the Azure pipeline, as in the SDK's default transport
+            adapter = _counting_adapter_class()(
+                pool_connections=self.pool_size,
+                pool_maxsize=self.pool_size,
+                max_retries=Retry(total=False, redirect=False, raise_on_status=False),
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            if not self.keep_alive:
+                session.headers["Connection"] = "close"
+            self._session = session
+            self._adapter = adapter
+        return self._session
+
+    def get_client(self, endpoint: str, key: str, **client_kwargs: Any) -> TextTranslationClient:
+        """
+        Return the shared client for a Translator resource, creating it on first use.
+
+        Args:
+            endpoint (str): The Translator endpoint.
+            key (str): The Translator API key.
+            **client_kwargs: Extra keyword arguments for TextTranslationClient. Callers that pass
+                different options get different clients, which still share the connection pool.
+
+        Returns:
+            TextTranslationClient: The client for the endpoint, key and options.
+        """
+        options = tuple(sorted((name, repr(value)) for name, value in client_kwargs.items()))
+        registry_key = (endpoint, hashlib.sha256(key.encode("utf-8")).hexdigest(), options)
+        with self._lock:
+            client = self._clients.get(registry_key)
+            if client is not None:
+                self.client_hits += 1
+                return client
+
+            self.client_misses += 1
+            from azure.ai.translation.text import TextTranslationClient
+            from azure.core.credentials import AzureKeyCredential
+            from azure.core.pipeline.transport import RequestsTransport
+
+            transport = RequestsTransport(session=self._get_session(), session_owner=False)
+            client = TextTranslationClient(
+                endpoint=endpoint,
+                credential=AzureKeyCredential(key),
+                transport=transport,
+                **client_kwargs
+            )
+            self._clients[registry_key] = client
+            return client
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report how much the registry and its connection pool have been reused.
+
+        Returns:
+            Dict[str, int]: The number of clients, client lookups served by an existing client
+            (client_hits) or by a new one (client_misses), and, since the HTTP session was opened,
+            the requests sent, connections opened,
+            and requests that reused an already open connection.
+        """
+        with self._lock:
+            adapter = self._adapter
+            requests_sent = adapter.requests_sent if adapter is not None else 0
+            connections_opened = adapter.connections_opened if adapter is not None else 0
+            return {
+                "clients": len(self._clients),
+                "client_hits": self.client_hits,
+                "client_misses": self.client_misses,
+                "requests": requests_sent,
+                "connections_opened": connections_opened,
+                "connections_reused": requests_sent - connections_opened,
+            }
+
+    def close(self) -> None:
+        """
+        Close every client and the shared HTTP session.
+
+        The registry can be used again afterwards; new clients and a new session are created on demand.
+        """
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+                self._adapter = None
+
+    def __enter__(self) -> "TranslatorClientRegistry":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+_default_registry: Optional[TranslatorClientRegistry] = None
+_default_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> TranslatorClientRegistry:
+    """
+    Return the process-wide registry used by AzureTranslateTool unless another one is given.
+    """
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = TranslatorClientRegistry()
+        return _default_registry
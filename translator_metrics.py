@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the latency histogram buckets
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Where a request's time goes: building the request, waiting for the service, and reading the response
+REQUEST_PHASES = ("serialize", "network", "deserialize")
+
+METRIC_PREFIX = "azure_translator"
+
+
+class Histogram:
+    """
+    A Prometheus-style latency histogram with fixed buckets. Not thread-safe on its own.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # The last one counts values above every bucket
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """
+        The (upper bound, number of values at most that bound) pairs, ending with "+Inf".
+        """
+        total = 0
+        result = []
+        for bound, count in zip([*map(repr, self.buckets), "+Inf"], self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile as the upper bound of the bucket it falls in.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            if total >= rank:
+                return bound
+        return float("inf")
+
+
+class TranslatorMetrics:
+    """
+    Thread-safe counters, gauges and latency histograms for Translator requests.
+
+    AzureTranslateTool records every request attempt here: its latency (in total and per
+    phase), characters, errors, retries, throttling and cache lookups, plus the number of
+    requests in flight. Each update is a few additions under one lock, cheap next to a
+    network round trip, so metrics can stay on in production.
+
+    The metrics can be read with snapshot(), scraped in the Prometheus text format with
+    to_prometheus(), or pushed to sinks: callables that receive one event dict per request.
+    """
+
+    def __init__(
+        self,
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+        sinks: Optional[Sequence[Callable[[Dict[str, Any]], None]]] = None
+    ) -> None:
+        """
+        Initialize empty metrics.
+
+        Args:
+            buckets (Sequence[float], optional): The latency histogram bucket bounds, in seconds.
+            sinks (Optional[Sequence[Callable[[Dict[str, Any]], None]]], optional): Callables
+                that receive an event dict for every finished request.
+        """
+        self._lock = threading.Lock()
+        self._buckets = tuple(buckets)
+        self._sinks: List[Callable[[Dict[str, Any]], None]] = list(sinks or [])
+        self.in_flight = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Set every counter and histogram back to zero. The in-flight gauge is kept.
+        """
+        with self._lock:
+            self.requests = 0
+            self.characters = 0
+            self.retries = 0
+            self.throttled = 0
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self.errors: Dict[str, int] = {}
+            self.latency = Histogram(self._buckets)
+            self.phase_latency = {phase: Histogram(self._buckets) for phase in REQUEST_PHASES}
+
+    def add_sink(self, sink: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Send every following request event to sink as well.
+        """
+        with self._lock:
+            # Copy on write, so request_finished can call the sinks outside the lock
+            self._sinks = [*self._sinks, sink]
+
+    def request_started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(
+        self,
+        duration: float,
+        characters: int,
+        phases: Optional[Dict[str, float]] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """
+        Record a finished request attempt.
+
+        Args:
+            duration (float): The seconds the attempt took.
+            characters (int): The characters sent, counted once per target language as they are billed.
+            phases (Optional[Dict[str, float]], optional): Seconds spent in each of REQUEST_PHASES.
+            error (Optional[str], optional): The HTTP status code or exception type if the attempt failed.
+        """
+        phases = phases or {}
+        with self._lock:
+            self.in_flight -= 1
+            self.requests += 1
+            self.latency.observe(duration)
+            for phase, seconds in phases.items():
+                self.phase_latency[phase].observe(seconds)
+            if error is None:
+                self.characters += characters
+            else:
+                self.errors[error] = self.errors.get(error, 0) + 1
+            sinks = self._sinks
+
+        if sinks:
+            event = {"duration": duration, "characters": characters, "phases": phases, "error": error}
+            for sink in sinks:
+                try:
+                    sink(event)
+                except Exception as e:
+                    # A broken sink must not fail translations
+                    logger.warning(f"Metrics sink {sink!r} failed: {e}")
+
+    def record_retry(self, throttled: bool = False) -> None:
+        with self._lock:
+            self.retries += 1
+            if throttled:
+                self.throttled += 1
+
+    def record_cache(self, hits: int, misses: int) -> None:
+        with self._lock:
+            self.cache_hits += hits
+            self.cache_misses += misses
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Report the current values.
+
+        Returns:
+            Dict[str, Any]: The counters, the in-flight gauge, and the count, sum, p50 and p99
+            of the request latency and of each phase.
+        """
+        with self._lock:
+            def summary(histogram: Histogram) -> Dict[str, float]:
+                return {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "p50": histogram.quantile(0.5),
+                    "p99": histogram.quantile(0.99),
+                }
+
+            return {
+                "requests": self.requests,
+                "characters": self.characters,
+                "errors": dict(self.errors),
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+                "in_flight": self.in_flight,
+                "latency": summary(self.latency),
+                "phases": {phase: summary(histogram) for phase, histogram in self.phase_latency.items()},
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format, e.g. for a /metrics endpoint.
+        """
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str) -> str:
+            full_name = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            return full_name
+
+        def histogram_lines(name: str, histogram: Histogram, labels: str = "") -> None:
+            for bound, count in histogram.cumulative():
+                lines.append(f'{name}_bucket{{{labels}le="{bound}"}} {count}')
+            label_set = f"{{{labels.rstrip(',')}}}" if labels else ""
+            lines.append(f"{name}_sum{label_set} {histogram.sum}")
+            lines.append(f"{name}_count{label_set} {histogram.count}")
+
+        with self._lock:
+            for name, help_text, value in (
+                ("requests_total", "Translate request attempts.", self.requests),
+                ("characters_total", "Characters translated, once per target language.", self.characters),
+                ("retries_total", "Retried request attempts.", self.retries),
+                ("throttled_total", "Attempts throttled by the service (429 or 503).", self.throttled),
+                ("cache_hits_total", "Segments served from the translation cache.", self.cache_hits),
+                ("cache_misses_total", "Segments not found in the translation cache.", self.cache_misses),
+            ):
+                lines.append(f"{metric(name, 'counter', help_text)} {value}")
+
+            name = metric("errors_total", "counter", "Failed request attempts by status code or exception type.")
+            for reason, count in sorted(self.errors.items()):
+                lines.append(f'{name}{{reason="{reason}"}} {count}')
+
+            name = metric("requests_in_flight", "gauge", "Requests currently in flight.")
+            lines.append(f"{name} {self.in_flight}")
+
+            name = metric("request_duration_seconds", "histogram", "Translate request latency.")
+            histogram_lines(name, self.latency)
+
+            name = metric("request_phase_seconds", "histogram", "Translate request latency by phase.")
+            for phase, histogram in self.phase_latency.items():
+                histogram_lines(name, histogram, f'phase="{phase}",')
+
+        return "\n".join(lines) + "\n"
+
+
+_default_metrics: Optional[TranslatorMetrics] = None
+_default_metrics_lock = threading.Lock()
+
+
+def get_translator_metrics() -> TranslatorMetrics:
+    """
+    Return the process-wide metrics used by AzureTranslateTool unless another instance is given.
+    """
+    global _default_metrics
+    with _default_metrics_lock:
+        if _default_metrics is None:
+            _default_metrics = TranslatorMetrics()
+        return _default_metrics